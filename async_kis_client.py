@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+KIS API 비동기 클라이언트 (asyncio + aiohttp)
+- KISApiClient와 동일한 메서드/반환 형태 (dict, DataFrame)
+- 하나의 커넥션 풀 공유, 동시 요청 수 제한
+- 동기 클라이언트와 같은 rate_limiter 한도를 공유
+"""
+
+import os
+import asyncio
+import aiohttp
+import pandas as pd
+from typing import Optional, List, Dict, Tuple
+
+from main import KISApiClient
+from kis_http import DEFAULT_TIMEOUTS
+from candle_store import get_candle_store
+from rate_limiter import get_rate_limiter
+from token_manager import TokenManager
+
+
+class AsyncKISApiClient:
+    """KIS API 비동기 호출 담당 - 스캐너/실시간 업데이트/주문을 하나의 이벤트 루프에서 실행"""
+
+    # 파라미터 생성/응답 파싱은 동기 클라이언트와 공유
+    _daily_range_params = staticmethod(KISApiClient._daily_range_params)
+    _parse_daily_history = staticmethod(KISApiClient._parse_daily_history)
+    _parse_stock_price = staticmethod(KISApiClient._parse_stock_price)
+    _ranking_params = staticmethod(KISApiClient._ranking_params)
+    _balance_params = KISApiClient._balance_params
+    _parse_portfolio = staticmethod(KISApiClient._parse_portfolio)
+    _order_body = KISApiClient._order_body
+
+    def __init__(self,
+                 token_manager: TokenManager,
+                 account_no: str,
+                 max_in_flight: int = 8,
+                 pool_size: int = 16):
+        self.token_manager = token_manager
+        self.account_no = account_no
+        self.app_key = os.getenv('KIS_APP_KEY')
+        self.app_secret = os.getenv('KIS_APP_SECRET')
+        self.base_url = "https://openapivts.koreainvestment.com:29443"
+
+        self.rate_limiter = get_rate_limiter(self.base_url)
+        self.candle_store = get_candle_store()
+        self.max_in_flight = max_in_flight
+        self.pool_size = pool_size
+
+        # 세션/세마포어는 이벤트 루프 안에서 생성
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self):
+        self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """공유 세션 반환 (최초 호출 시 생성)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self._session
+
+    async def close(self):
+        """세션 및 커넥션 풀 정리"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get_headers(self, tr_id: str) -> Dict:
+        """API 호출용 헤더 생성"""
+        token = await asyncio.to_thread(self.token_manager.get_token)
+        if not token:
+            raise Exception("토큰 획득 실패")
+
+        return {
+            "authorization": f"Bearer {token}",
+            "appkey": self.app_key,
+            "appsecret": self.app_secret,
+            "tr_id": tr_id,
+            "custtype": "P"
+        }
+
+    async def _request(self, method: str, path: str, headers: Dict,
+                       params: Optional[Dict] = None,
+                       body: Optional[Dict] = None) -> Tuple[int, Optional[Dict]]:
+        """요청 1회 전송 → (HTTP 상태, JSON) 반환"""
+        session = self._get_session()
+        endpoint = path.rstrip('/').rsplit('/', 1)[-1]
+        timeout = aiohttp.ClientTimeout(total=DEFAULT_TIMEOUTS.get(endpoint, 10))
+
+        await self.rate_limiter.acquire_async(headers.get('tr_id'))
+        async with self._semaphore:
+            async with session.request(method, f"{self.base_url}{path}",
+                                       headers=headers, params=params, json=body,
+                                       timeout=timeout) as response:
+                if response.status != 200:
+                    return response.status, None
+                return response.status, await response.json(content_type=None)
+
+    async def get_daily_price_history(self, stock_code: str, days: int = 30,
+                                      live_quote: Optional[Dict] = None) -> Optional[pd.DataFrame]:
+        """일봉 데이터 조회 (RSI/MACD 계산용) - 로컬 저장소에 없는 최근 구간만 API 조회"""
+        return await self.candle_store.get_history_async(
+            stock_code, days, self._fetch_daily_range, live_quote)
+
+    async def _fetch_daily_range(self, stock_code: str, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
+        """일봉 구간 조회 (YYYYMMDD)"""
+        headers = await self._get_headers("FHKST03010100")
+        params = self._daily_range_params(stock_code, start_date, end_date)
+
+        try:
+            status, data = await self._request(
+                'GET', "/uapi/domestic-stock/v1/quotations/inquire-daily-itemchartprice",
+                headers, params=params)
+            if status == 200:
+                if data.get('rt_cd') == '0':
+                    return self._parse_daily_history(data)
+                else:
+                    print(f"❌ 일봉 API 에러 [{stock_code}]: {data.get('msg1', 'Unknown error')}")
+            else:
+                print(f"❌ HTTP {status} 에러 [{stock_code}]")
+        except Exception as e:
+            print(f"❌ 일봉 데이터 조회 예외 ({stock_code}): {e}")
+        return None
+
+    async def get_stock_price(self, stock_code: str) -> Optional[Dict]:
+        """개별 종목 현재가 조회"""
+        headers = await self._get_headers("FHKST01010100")
+        params = {
+            "FID_COND_MRKT_DIV_CODE": "J",
+            "FID_INPUT_ISCD": stock_code
+        }
+
+        for attempt in range(3):
+            try:
+                status, data = await self._request(
+                    'GET', "/uapi/domestic-stock/v1/quotations/inquire-price", headers, params=params)
+                if status == 200:
+                    if data.get('rt_cd') == '0':
+                        return self._parse_stock_price(stock_code, data.get('output', {}))
+                elif status == 500:
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+            except Exception as e:
+                if attempt == 2:
+                    print(f"❌ {stock_code} 조회 최종 실패: {e}")
+                await asyncio.sleep(1)
+        return None
+
+    async def get_stock_prices(self, stock_codes: List[str]) -> List[Optional[Dict]]:
+        """여러 종목 현재가 동시 조회 (입력 순서대로 반환)"""
+        return list(await asyncio.gather(*(self.get_stock_price(code) for code in stock_codes)))
+
+    async def _get_ranking(self, screen_code: str, label: str) -> List[Dict]:
+        """순위 조회 공통 처리 (상위 30개)"""
+        headers = await self._get_headers("FHPST01710000")
+        params = self._ranking_params(screen_code)
+
+        for attempt in range(3):
+            try:
+                status, data = await self._request(
+                    'GET', "/uapi/domestic-stock/v1/quotations/volume-rank", headers, params=params)
+                if status == 200:
+                    if data.get('rt_cd') == '0':
+                        return data.get('output', [])[:30]
+                elif status == 500:
+                    await asyncio.sleep(3)
+                    continue
+            except Exception as e:
+                if attempt == 2:
+                    print(f"❌ {label} 조회 최종 실패: {e}")
+                await asyncio.sleep(2)
+        return []
+
+    async def get_volume_ranking(self) -> List[Dict]:
+        """거래량 상위 종목 조회 (30개)"""
+        return await self._get_ranking("20171", "거래량 순위")
+
+    async def get_price_change_ranking(self) -> List[Dict]:
+        """등락률 상위 종목 조회 (30개)"""
+        return await self._get_ranking("20172", "등락률 순위")
+
+    async def get_portfolio(self) -> Tuple[List[Dict], float, float]:
+        """포트폴리오 및 계좌 정보 조회"""
+        headers = await self._get_headers("VTTC8434R")
+        params = self._balance_params()
+
+        try:
+            status, data = await self._request(
+                'GET', "/uapi/domestic-stock/v1/trading/inquire-balance", headers, params=params)
+            if status == 200 and data.get('rt_cd') == '0':
+                return self._parse_portfolio(data)
+        except Exception as e:
+            print(f"❌ 포트폴리오 조회 실패: {e}")
+        return [], 0, 0
+
+    async def _order(self, tr_id: str, stock_code: str, quantity: int) -> bool:
+        """시장가 주문 공통 처리"""
+        headers = await self._get_headers(tr_id)
+        headers["content-type"] = "application/json; charset=utf-8"
+        body = self._order_body(stock_code, quantity)
+
+        status, data = await self._request(
+            'POST', "/uapi/domestic-stock/v1/trading/order-cash", headers, body=body)
+        return status == 200 and data.get('rt_cd') == '0'
+
+    async def buy_stock(self, stock_code: str, quantity: int) -> bool:
+        """매수 주문 (시장가)"""
+        try:
+            return await self._order("VTTC0802U", stock_code, quantity)
+        except Exception as e:
+            print(f"❌ 매수 주문 실패: {e}")
+        return False
+
+    async def sell_stock(self, stock_code: str, quantity: int) -> bool:
+        """매도 주문 (시장가)"""
+        try:
+            return await self._order("VTTC0801U", stock_code, quantity)
+        except Exception as e:
+            print(f"❌ 매도 주문 실패: {e}")
+        return False
@@ -5,11 +5,11 @@ import firebase_admin
 from firebase_admin import credentials, firestore
 import os
 from dotenv import load_dotenv
-import time
-import schedule
 from datetime import datetime
-import subprocess
-import sys
+from firestore_sync import commit_in_batches
+from job_scheduler import JobScheduler
+from krx_calendar import is_session_open
+from market_data_service import get_market_data_client
 
 load_dotenv()
 
@@ -20,19 +20,60 @@ if not firebase_admin._apps:
 
 db = firestore.client()
 
-def run_sync_script():
-    """Firebase 데이터 동기화 스크립트 실행"""
+def sync_dashboard_data():
+    """대시보드 필드 정리 (누락 필드 기본값, 수익률/평가금액 재계산) - 바뀐 문서만 배치로 기록"""
     try:
         print(f"\n[{datetime.now().strftime('%H:%M:%S')}] 📊 데이터 동기화 시작...")
-        result = subprocess.run(
-            ['python3', 'sync_firebase_data.py'],
-            capture_output=True,
-            text=True
-        )
-        if result.returncode == 0:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ 동기화 완료")
-        else:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ 동기화 실패: {result.stderr}")
+        ops = []
+
+        # 포트폴리오: 현재가가 없으면 매입가, 수익률/평가금액 재계산
+        for doc in db.collection('portfolio').stream():
+            data = doc.to_dict()
+            updated_data = {}
+            buy_price = data.get('buy_price', 0)
+            current_price = data.get('current_price', 0)
+            if current_price == 0 and buy_price > 0:
+                current_price = buy_price
+                updated_data['current_price'] = buy_price
+            if buy_price > 0:
+                profit_rate = round((current_price - buy_price) / buy_price * 100, 2)
+                if data.get('profit_rate') != profit_rate:
+                    updated_data['profit_rate'] = profit_rate
+            quantity = data.get('quantity', 0)
+            if quantity > 0:
+                profit_amount = (current_price - buy_price) * quantity
+                if data.get('profit_amount') != profit_amount:
+                    updated_data['profit_amount'] = profit_amount
+                if data.get('total_value') != current_price * quantity:
+                    updated_data['total_value'] = current_price * quantity
+            for field in ('volume', 'change_rate', 'change_price'):
+                if field not in data:
+                    updated_data[field] = 0
+            if updated_data:
+                ops.append(('update', doc.reference, updated_data))
+
+        # 감시 종목: 누락 필드 기본값
+        scan_ref = db.collection('market_scan').document('latest')
+        scan_doc = scan_ref.get()
+        if scan_doc.exists:
+            stocks = scan_doc.to_dict().get('stocks', [])
+            defaults = {'current_price': 0, 'volume': 0, 'change_rate': 0, 'rsi': 50, 'mfi': 50}
+            changed = False
+            for stock in stocks:
+                for field, value in defaults.items():
+                    if field not in stock:
+                        stock[field] = value
+                        changed = True
+            if changed:
+                ops.append(('update', scan_ref, {'stocks': stocks, 'last_updated': firestore.SERVER_TIMESTAMP}))
+
+        ops.append(('merge', db.collection('bot_status').document('main'), {
+            'running': True,
+            'lastHeartbeat': firestore.SERVER_TIMESTAMP,
+            'message': 'Firebase 데이터 동기화 중'
+        }))
+        commit_in_batches(db, ops)
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ 동기화 완료 (문서 {len(ops)}건 기록)")
     except Exception as e:
         print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ 동기화 오류: {e}")
 
@@ -47,33 +88,95 @@ def update_heartbeat():
     except Exception as e:
         print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ 하트비트 오류: {e}")
 
+def update_prices_from_market_data():
+    """시세 공유 서비스가 떠 있으면 감시 종목 가격을 구독 시세로 갱신 (KIS 직접 호출 없음)"""
+    client = get_market_data_client()
+    if not client.connected:
+        return False
+
+    doc_ref = db.collection('market_scan').document('latest')
+    doc = doc_ref.get()
+    if not doc.exists:
+        return False
+
+    stocks = doc.to_dict().get('stocks', [])
+    codes = [stock['code'] for stock in stocks if stock.get('code')]
+    client.subscribe(codes)
+    quotes = client.get_quotes(codes)
+    if not quotes:
+        return False
+
+    for stock in stocks:
+        quote = quotes.get(stock.get('code'))
+        if quote:
+            stock['current_price'] = quote['current_price']
+            stock['change_rate'] = quote['change_rate']
+            stock['volume'] = quote['volume']
+    doc_ref.update({
+        'stocks': stocks,
+        'last_updated': firestore.SERVER_TIMESTAMP
+    })
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ 공유 시세로 가격 업데이트 ({len(quotes)}/{len(codes)}종목)")
+    return True
+
+_api_client = None
+
+
+def get_api_client():
+    """가격 조회용 KIS 클라이언트 (프로세스 내 1개, 토큰은 TokenManager가 갱신)"""
+    global _api_client
+    if _api_client is None:
+        from token_manager import TokenManager
+        from main import KISApiClient
+
+        account_no = os.getenv('KIS_ACCOUNT_NUMBER')
+        if '-' not in account_no:
+            account_no = f"{account_no}-01"
+        token_manager = TokenManager(os.getenv('KIS_APP_KEY'), os.getenv('KIS_APP_SECRET'))
+        _api_client = KISApiClient(token_manager, account_no, market_data=get_market_data_client())
+    return _api_client
+
+def update_prices_from_api():
+    """감시 종목 현재가를 KIS에서 직접 조회해 갱신 (시세 공유 서비스가 없을 때)"""
+    doc_ref = db.collection('market_scan').document('latest')
+    doc = doc_ref.get()
+    if not doc.exists:
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️ 감시 종목 데이터 없음")
+        return
+
+    stocks = doc.to_dict().get('stocks', [])
+    codes = [stock['code'] for stock in stocks if stock.get('code')]
+    prices = dict(zip(codes, get_api_client().get_stock_prices(codes)))
+
+    updated = 0
+    for stock in stocks:
+        price_info = prices.get(stock.get('code'))
+        if not price_info:
+            continue
+        stock['current_price'] = price_info['current_price']
+        stock['change_rate'] = price_info['change_rate']
+        stock['volume'] = price_info['volume']
+        # RSI, MFI는 기존 값 유지 (없으면 등락률로 대략 추정)
+        stock.setdefault('rsi', 50 + price_info['change_rate'] * 2)
+        stock.setdefault('mfi', 50 + price_info['change_rate'] * 1.5)
+        stock['rsi'] = max(0, min(100, stock['rsi']))
+        stock['mfi'] = max(0, min(100, stock['mfi']))
+        updated += 1
+
+    doc_ref.update({
+        'stocks': stocks,
+        'last_updated': firestore.SERVER_TIMESTAMP
+    })
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ 가격 업데이트 완료 ({updated}/{len(codes)}종목)")
+
 def check_and_update_prices():
-    """토큰이 있으면 가격 업데이트 시도"""
+    """가격 업데이트 (시세 공유 서비스 우선, 없으면 직접 조회)"""
     try:
-        # 토큰 파일 확인
-        if os.path.exists('kis_token.json'):
-            print(f"\n[{datetime.now().strftime('%H:%M:%S')}] 💰 가격 업데이트 시도...")
-            result = subprocess.run(
-                ['python3', 'fix_realtime_data.py'],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            if "액세스 토큰이 없습니다" in result.stdout:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] ⏳ 토큰 재발급 필요")
-                # 토큰 재발급 시도
-                subprocess.run(
-                    ['python3', 'get_token_manual.py'],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-            elif result.returncode == 0:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ 가격 업데이트 완료")
-        else:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️ 토큰 파일 없음")
-    except subprocess.TimeoutExpired:
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] ⏱️ 가격 업데이트 타임아웃")
+        if update_prices_from_market_data():
+            return
+
+        print(f"\n[{datetime.now().strftime('%H:%M:%S')}] 💰 가격 업데이트 시도...")
+        update_prices_from_api()
     except Exception as e:
         print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ 가격 업데이트 오류: {e}")
 
@@ -87,21 +190,20 @@ def main():
     print("  - 매 5분: 실시간 가격 업데이트")
     print("=" * 50)
 
-    # 초기 실행
-    run_sync_script()
-    update_heartbeat()
+    # 시세 공유 서비스 구독 시작 (서비스가 나중에 떠도 자동 연결)
+    get_market_data_client()
 
-    # 스케줄 설정
-    schedule.every(30).seconds.do(update_heartbeat)
-    schedule.every(1).minutes.do(run_sync_script)
-    schedule.every(5).minutes.do(check_and_update_prices)
+    # 주기 작업은 같은 프로세스에서 실행 (클라이언트 재사용), 하트비트/동기화는 시작하자마자 1회
+    scheduler = JobScheduler()
+    scheduler.add_job('heartbeat', update_heartbeat, 30, run_immediately=True)
+    scheduler.add_job('dashboard_sync', sync_dashboard_data, 60, jitter=5, run_immediately=True)
+    scheduler.add_job('price_update', check_and_update_prices, 300, jitter=10, misfire='run_once',
+                      active=is_session_open)  # 장 외 시간에는 가격이 바뀌지 않으므로 조회 생략
 
     print("\n⏰ 스케줄러 실행 중... (Ctrl+C로 종료)")
 
     try:
-        while True:
-            schedule.run_pending()
-            time.sleep(1)
+        scheduler.run_forever()
     except KeyboardInterrupt:
         print("\n\n👋 자동 업데이트 종료")
         # 종료 시 봇 상태 업데이트
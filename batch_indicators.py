@@ -0,0 +1,158 @@
+"""
+다종목 일괄 기술적 지표 계산
+- (종목 × 봉) 2차원 가격 패널을 받아 RSI/MACD/볼린저/MFI를 한 번에 계산
+- TechnicalAnalyzer 정적 메서드와 같은 정의/기본값 (데이터 부족 시 50 또는 0)
+- 짧은 이력은 왼쪽을 NaN으로 채워 오른쪽 정렬
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple
+
+
+PANEL_FIELDS = ('close', 'high', 'low', 'volume')
+
+
+def build_price_panel(histories: Dict[str, pd.DataFrame]) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    """종목별 일봉 DataFrame → (종목코드 목록, 필드별 2차원 배열) 변환
+
+    get_daily_price_history 결과(date 오름차순)를 그대로 받으며, None/빈 데이터는 전부 NaN 행이 된다.
+    """
+    codes = list(histories.keys())
+    width = max((len(df) for df in histories.values() if df is not None), default=0)
+
+    panel = {field: np.full((len(codes), width), np.nan) for field in PANEL_FIELDS}
+    for row, code in enumerate(codes):
+        df = histories[code]
+        if df is None or len(df) == 0:
+            continue
+        for field in PANEL_FIELDS:
+            panel[field][row, width - len(df):] = df[field].to_numpy(dtype=float)
+
+    return codes, panel
+
+
+def _history_lengths(close: np.ndarray) -> np.ndarray:
+    """행별 데이터 길이 (첫 유효값부터 끝까지)"""
+    valid = ~np.isnan(close)
+    has_data = valid.any(axis=1)
+    first_valid = np.argmax(valid, axis=1)
+    return np.where(has_data, close.shape[1] - first_valid, 0)
+
+
+def _ewm_mean(values: np.ndarray, span: int) -> np.ndarray:
+    """pandas ewm(span=span).mean() (adjust=True, ignore_na=False)과 같은 지수이동평균 - 종목 축으로 벡터화"""
+    decay = 1 - 2 / (span + 1)
+    result = np.full(values.shape, np.nan)
+    numerator = np.zeros(values.shape[0])
+    denominator = np.zeros(values.shape[0])
+
+    for t in range(values.shape[1]):
+        column = values[:, t]
+        valid = ~np.isnan(column)
+        numerator = numerator * decay + np.where(valid, column, 0.0)
+        denominator = denominator * decay + valid
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[:, t] = np.where(denominator > 0, numerator / denominator, np.nan)
+
+    return result
+
+
+def calculate_rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """RSI (단순 이동평균 방식, TechnicalAnalyzer.calculate_rsi와 동일)"""
+    lengths = _history_lengths(close)
+    delta = np.diff(close, axis=1)[:, -period:]
+    gain = np.where(delta > 0, delta, 0.0).mean(axis=1)
+    loss = np.where(delta < 0, -delta, 0.0).mean(axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rsi = 100 - (100 / (1 + gain / loss))
+
+    return np.where((lengths >= period + 1) & ~np.isnan(rsi), rsi, 50.0)
+
+
+def calculate_macd(close: np.ndarray) -> Dict[str, np.ndarray]:
+    """MACD (12/26 EMA, 시그널 9 EMA)"""
+    lengths = _history_lengths(close)
+    macd = _ewm_mean(close, 12) - _ewm_mean(close, 26)
+    signal = _ewm_mean(macd, 9)
+
+    enough = lengths >= 26
+    last_macd = macd[:, -1]
+    last_signal = signal[:, -1]
+    histogram = last_macd - last_signal
+
+    return {
+        'macd': np.where(enough & ~np.isnan(last_macd), last_macd, 0.0),
+        'signal': np.where(enough & ~np.isnan(last_signal), last_signal, 0.0),
+        'histogram': np.where(enough & ~np.isnan(histogram), histogram, 0.0)
+    }
+
+
+def calculate_bollinger_bands(close: np.ndarray, period: int = 20) -> Dict[str, np.ndarray]:
+    """볼린저 밴드 (기간 이동평균 ± 2 × 표본표준편차)"""
+    lengths = _history_lengths(close)
+    window = close[:, -period:]
+    middle = window.mean(axis=1)
+    std = window.std(axis=1, ddof=1)
+
+    enough = lengths >= period
+    upper = middle + std * 2
+    lower = middle - std * 2
+
+    return {
+        'upper': np.where(enough & ~np.isnan(upper), upper, 0.0),
+        'middle': np.where(enough & ~np.isnan(middle), middle, 0.0),
+        'lower': np.where(enough & ~np.isnan(lower), lower, 0.0)
+    }
+
+
+def calculate_mfi(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                  volume: np.ndarray, period: int = 14) -> np.ndarray:
+    """MFI (Money Flow Index)"""
+    lengths = _history_lengths(close)
+    typical_price = (high + low + close) / 3
+    money_flow = typical_price * volume
+
+    tp_change = np.diff(typical_price, axis=1, prepend=np.nan)
+    positive_mf = np.where(tp_change > 0, money_flow, 0.0)[:, -period:].sum(axis=1)
+    negative_mf = np.where(tp_change < 0, money_flow, 0.0)[:, -period:].sum(axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mfi = 100 - (100 / (1 + positive_mf / negative_mf))
+
+    return np.where((lengths >= period + 1) & ~np.isnan(mfi), mfi, 50.0)
+
+
+def calculate_all(panel: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """패널 전체 종목의 지표를 한 번에 계산 (키는 analyze_stock_with_indicators 결과와 동일)"""
+    # 가장 긴 창(MACD 26봉 + 1)보다 짧은 패널은 왼쪽을 NaN으로 채움 - 부족한 종목은 기본값으로 처리됨
+    width = panel['close'].shape[1]
+    if width < 27:
+        panel = {field: np.pad(panel[field], ((0, 0), (27 - width, 0)), constant_values=np.nan)
+                 for field in PANEL_FIELDS}
+    close = panel['close']
+
+    macd = calculate_macd(close)
+    bollinger = calculate_bollinger_bands(close)
+
+    return {
+        'rsi': calculate_rsi(close),
+        'mfi': calculate_mfi(panel['high'], panel['low'], close, panel['volume']),
+        'macd': macd['macd'],
+        'macd_signal': macd['signal'],
+        'macd_histogram': macd['histogram'],
+        'bollinger_upper': bollinger['upper'],
+        'bollinger_middle': bollinger['middle'],
+        'bollinger_lower': bollinger['lower']
+    }
+
+
+def calculate_for_histories(histories: Dict[str, pd.DataFrame]) -> Dict[str, Dict[str, float]]:
+    """종목별 일봉 → 종목별 지표 dict (편의 함수)"""
+    codes, panel = build_price_panel(histories)
+    indicators = calculate_all(panel)
+    return {
+        code: {name: float(values[row]) for name, values in indicators.items()}
+        for row, code in enumerate(codes)
+    }
@@ -0,0 +1,246 @@
+"""
+일봉 로컬 저장소 - 지난 봉은 디스크에서, 빠진 최근 봉만 API로 조회
+- 종목별 NumPy 구조체 배열(.npy, 날짜 오름차순)을 메모리 맵으로 읽음
+- 파일 수정 시각 = 마지막 조회 시각: 마지막 장 마감 이후 조회했으면 API 호출 없음 (장 마감/휴장일은 krx_calendar)
+- coverage.json은 여러 프로세스가 함께 갱신 - 잠금(flock) 안에서 디스크 내용을 다시 읽어 병합 후 기록
+- 저장은 마감된 봉만 - 장중 당일 봉은 현재가 시세(live_quote)로 만들거나 당일분만 조회
+"""
+
+import os
+import json
+import fcntl
+import threading
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
+from typing import Optional, Dict, Callable, Awaitable
+
+from krx_calendar import KST, last_closed_session, is_session_open, session_for
+
+
+CANDLE_DTYPE = np.dtype([
+    ('date', '<i4'),  # YYYYMMDD
+    ('close', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('volume', '<f8'),
+])
+
+# (종목코드, 시작일, 종료일) → 일봉 DataFrame (실패 시 None, 데이터 없음은 빈 DataFrame)
+FetchRange = Callable[[str, str, str], Optional[pd.DataFrame]]
+AsyncFetchRange = Callable[[str, str, str], Awaitable[Optional[pd.DataFrame]]]
+
+
+def _date_int(d: date) -> int:
+    return d.year * 10000 + d.month * 100 + d.day
+
+
+class CandleStore:
+    """종목별 일봉 디스크 캐시"""
+
+    def __init__(self, root: str = "data/candles", max_bars: int = 250):
+        self.root = root
+        self.max_bars = max_bars
+        self.coverage_file = os.path.join(root, "coverage.json")
+        self.coverage_lock_file = os.path.join(root, "coverage.json.lock")
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+        # 종목별로 어느 날짜부터 받아 두었는지 (신규 상장 종목처럼 이력이 짧아도 재조회하지 않도록)
+        self._coverage: Dict[str, int] = self._read_coverage()
+
+    def _read_coverage(self) -> Dict[str, int]:
+        if not os.path.exists(self.coverage_file):
+            return {}
+        try:
+            with open(self.coverage_file, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ 일봉 저장소 인덱스 로드 실패: {e}")
+            return {}
+
+    @contextmanager
+    def _file_lock(self):
+        """프로세스 간 coverage.json 갱신 잠금 (coverage.json.lock에 flock)"""
+        with open(self.coverage_lock_file, 'a') as lock_f:
+            fcntl.flock(lock_f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_f.fileno(), fcntl.LOCK_UN)
+
+    def _path(self, stock_code: str) -> str:
+        return os.path.join(self.root, f"{stock_code}.npy")
+
+    def load(self, stock_code: str) -> np.ndarray:
+        """저장된 일봉 (메모리 맵, 없으면 빈 배열)"""
+        path = self._path(stock_code)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        try:
+            return np.load(path, mmap_mode='r')
+        except Exception as e:
+            print(f"⚠️ 일봉 파일 손상 [{stock_code}]: {e}")
+            return np.empty(0, dtype=CANDLE_DTYPE)
+
+    def _save(self, stock_code: str, records: np.ndarray):
+        """임시 파일 기록 후 rename (읽는 쪽 메모리 맵은 이전 파일을 계속 사용)"""
+        path = self._path(stock_code)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, records)
+        os.replace(tmp_path, path)
+
+    def _save_coverage(self):
+        """다른 프로세스가 기록한 내용과 병합 (종목별로 더 이른 시작일) 후 임시 파일 → rename"""
+        with self._file_lock():
+            for stock_code, covered_from in self._read_coverage().items():
+                if covered_from < self._coverage.get(stock_code, covered_from + 1):
+                    self._coverage[stock_code] = covered_from
+            tmp_path = f"{self.coverage_file}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._coverage, f)
+            os.replace(tmp_path, self.coverage_file)
+
+    def missing_start(self, stock_code: str, days: int, now: datetime) -> Optional[str]:
+        """API로 받아야 할 구간의 시작일 (YYYYMMDD, 받을 것이 없으면 None)"""
+        window_start = (now - timedelta(days=days)).date()
+        covered_from = self._coverage.get(stock_code)
+        records = self.load(stock_code)
+
+        if len(records) == 0 or covered_from is None or covered_from > _date_int(window_start):
+            return window_start.strftime("%Y%m%d")
+
+        # 마지막 장 마감 이후에 조회했으면 최신 상태
+        closed_at = session_for(last_closed_session(now)).close.timestamp()
+        if os.path.getmtime(self._path(stock_code)) >= closed_at:
+            return None
+
+        last_date = datetime.strptime(str(int(records['date'][-1])), "%Y%m%d").date()
+        return max(last_date + timedelta(days=1), window_start).strftime("%Y%m%d")
+
+    def append(self, stock_code: str, df: pd.DataFrame, fetched_from: str, now: datetime):
+        """조회 결과 중 마감된 봉만 병합 저장 (같은 날짜는 새 값 우선) - 결과가 비어도 조회 시각은 기록"""
+        closed = _date_int(last_closed_session(now))
+        new = np.empty(len(df), dtype=CANDLE_DTYPE)
+        if len(df):
+            dates = pd.to_datetime(df['date'])
+            new['date'] = (dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day).to_numpy()
+            for field in ('close', 'high', 'low', 'volume'):
+                new[field] = df[field].to_numpy(dtype=float)
+            new = new[new['date'] <= closed]
+
+        with self._lock:
+            existing = np.array(self.load(stock_code))
+            existing = existing[~np.isin(existing['date'], new['date'])]
+            merged = np.concatenate([existing, new])
+            merged = merged[np.argsort(merged['date'], kind='stable')][-self.max_bars:]
+            self._save(stock_code, merged)
+            os.utime(self._path(stock_code), (now.timestamp(), now.timestamp()))
+
+            fetched_from = int(fetched_from)
+            if fetched_from < self._coverage.get(stock_code, fetched_from + 1):
+                self._coverage[stock_code] = fetched_from
+                self._save_coverage()
+
+    def read(self, stock_code: str, days: int, now: datetime) -> pd.DataFrame:
+        """저장된 일봉 중 최근 days일 구간 → get_daily_price_history와 같은 형태의 DataFrame"""
+        records = self.load(stock_code)
+        start = _date_int((now - timedelta(days=days)).date())
+        records = records[records['date'] >= start]
+        return pd.DataFrame({
+            'date': pd.to_datetime(records['date'].astype(str), format="%Y%m%d"),
+            'close': records['close'],
+            'high': records['high'],
+            'low': records['low'],
+            'volume': records['volume'],
+        })
+
+    @staticmethod
+    def _today_rows(df: Optional[pd.DataFrame], now: datetime) -> Optional[pd.DataFrame]:
+        """조회 결과 중 아직 마감되지 않은 당일 봉"""
+        if df is None or len(df) == 0:
+            return None
+        today = df[pd.to_datetime(df['date']).dt.date > last_closed_session(now)]
+        return today if len(today) else None
+
+    @staticmethod
+    def _bar_from_quote(quote: Dict, now: datetime) -> pd.DataFrame:
+        """현재가 시세 → 진행 중인 당일 봉 (고가/저가/거래량이 없으면 현재가/0으로 대체)"""
+        price = float(quote['current_price'])
+        return pd.DataFrame({
+            'date': [pd.Timestamp(now.date())],
+            'close': [price],
+            'high': [max(float(quote.get('high_price') or price), price)],
+            'low': [min(float(quote.get('low_price') or price), price)],
+            'volume': [float(quote.get('volume') or 0)],
+        })
+
+    def _combine(self, stock_code: str, days: int, today: Optional[pd.DataFrame],
+                 now: datetime) -> Optional[pd.DataFrame]:
+        history = self.read(stock_code, days, now)
+        if today is not None:
+            history = pd.concat([history, today[history.columns]], ignore_index=True)
+        return history if len(history) else None
+
+    def get_history(self, stock_code: str, days: int, fetch: FetchRange,
+                    live_quote: Optional[Dict] = None,
+                    now: Optional[datetime] = None) -> Optional[pd.DataFrame]:
+        """최근 days일 일봉 - 빠진 구간만 fetch로 받아 저장하고 나머지는 디스크에서 제공"""
+        now = now or datetime.now(KST)
+        today_str = now.strftime("%Y%m%d")
+        today = None
+
+        start = self.missing_start(stock_code, days, now)
+        if start:
+            df = fetch(stock_code, start, today_str)
+            if df is not None:
+                self.append(stock_code, df, start, now)
+                today = self._today_rows(df, now)
+
+        if today is None and is_session_open(now):
+            if live_quote and live_quote.get('current_price'):
+                today = self._bar_from_quote(live_quote, now)
+            else:
+                today = self._today_rows(fetch(stock_code, today_str, today_str), now)
+
+        return self._combine(stock_code, days, today, now)
+
+    async def get_history_async(self, stock_code: str, days: int, fetch: AsyncFetchRange,
+                                live_quote: Optional[Dict] = None,
+                                now: Optional[datetime] = None) -> Optional[pd.DataFrame]:
+        """get_history의 asyncio 버전"""
+        now = now or datetime.now(KST)
+        today_str = now.strftime("%Y%m%d")
+        today = None
+
+        start = self.missing_start(stock_code, days, now)
+        if start:
+            df = await fetch(stock_code, start, today_str)
+            if df is not None:
+                self.append(stock_code, df, start, now)
+                today = self._today_rows(df, now)
+
+        if today is None and is_session_open(now):
+            if live_quote and live_quote.get('current_price'):
+                today = self._bar_from_quote(live_quote, now)
+            else:
+                today = self._today_rows(await fetch(stock_code, today_str, today_str), now)
+
+        return self._combine(stock_code, days, today, now)
+
+
+_stores: Dict[str, CandleStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_candle_store(root: Optional[str] = None) -> CandleStore:
+    """프로세스 내 공유 저장소 반환 (경로: KIS_CANDLE_DIR, 기본 data/candles)"""
+    root = root or os.getenv('KIS_CANDLE_DIR', 'data/candles')
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None:
+            store = CandleStore(root)
+            _stores[root] = store
+        return store
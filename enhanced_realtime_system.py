@@ -2,16 +2,21 @@
 """개선된 실시간 업데이트 시스템"""
 
 import os
-import json
 import time
-import requests
 import threading
-from datetime import datetime, timedelta
+from datetime import datetime
 import pytz
 from dotenv import load_dotenv
 
 import firebase_admin
 from firebase_admin import credentials, firestore
+from kis_http import KISHttpSession
+from token_manager import TokenManager
+from rate_limiter import get_rate_limiter
+from firestore_sink import FirestoreWriteSink
+from market_data_service import get_market_data_client
+from krx_calendar import is_session_open, sleep_until
+from poll_scheduler import PollScheduler
 
 load_dotenv()
 
@@ -22,6 +27,7 @@ if not firebase_admin._apps:
 
 db = firestore.client()
 kst = pytz.timezone('Asia/Seoul')
+KIS_BASE_URL = "https://openapivts.koreainvestment.com:29443"
 
 class EnhancedRealtimeSystem:
     def __init__(self):
@@ -31,37 +37,55 @@ class EnhancedRealtimeSystem:
         if '-' not in self.account_no:
             self.account_no = f"{self.account_no}-01"
 
+        # 토큰은 TokenManager가 프로세스 간 잠금으로 관리 (파일 직접 읽기/재발급 금지)
+        self.token_manager = TokenManager(os.getenv('KIS_APP_KEY'), os.getenv('KIS_APP_SECRET'))
+
+        # 공유 세션 + 호출 한도 (종목별 고정 sleep 대신 토큰 버킷으로 속도 제어)
+        self.http = KISHttpSession(KIS_BASE_URL, rate_limiter=get_rate_limiter(KIS_BASE_URL))
+
+        # Firestore 쓰기는 모아서 배치 커밋 (가격 조회 루프는 Firestore 응답을 기다리지 않음)
+        self.sink = FirestoreWriteSink(db)
+
+        # 시세 공유 서비스 구독 - 서비스가 떠 있으면 직접 조회하지 않음
+        self.market_data = get_market_data_client()
+
+        # 종목별 조회 주기 (손절/익절 기준은 main.TradingEngine과 동일)
+        self.stop_loss_rate = -3.0
+        self.take_profit_rate = 5.0
+        self.poll_scheduler = PollScheduler(
+            stop_loss_rate=self.stop_loss_rate,
+            take_profit_rate=self.take_profit_rate,
+            budget=float(os.getenv('REALTIME_POLL_BUDGET', '2'))  # 초당 조회 수
+        )
+        self.symbols_refresh = 60  # 포트폴리오/감시종목 목록 다시 읽는 주기 (초)
+        self.status_interval = 10
+        self.holdings = {}   # 코드 → (문서참조, 문서 데이터)
+        self.watchlist = {}
+        self.alerted = set()  # 손절/익절 기준을 넘은 종목 (넘을 때 1번만 출력)
+
     def get_access_token(self):
-        """토큰 가져오기 (자동 갱신)"""
-        try:
-            with open('kis_token.json', 'r') as f:
-                token_data = json.load(f)
-
-            # 토큰 만료 체크
-            exp_time = datetime.fromisoformat(token_data.get('expires_at', '2000-01-01T00:00:00'))
-            if datetime.now() >= exp_time - timedelta(minutes=10):  # 10분 전 갱신
-                print("🔄 토큰 만료 임박, 새로 발급 중...")
-                os.system("python3 get_saved_token.py > /dev/null 2>&1")
-                time.sleep(2)
-                with open('kis_token.json', 'r') as f:
-                    token_data = json.load(f)
-
-            return token_data.get('token')
-        except Exception as e:
-            print(f"❌ 토큰 로드 실패: {e}")
-            return None
+        """토큰 가져오기 (만료 전 자동 갱신은 TokenManager가 처리)"""
+        token = self.token_manager.get_token()
+        if not token:
+            print("❌ 토큰 로드 실패")
+        return token
+
+    def get_stock_price(self, stock_code, max_age=None):
+        """개별 종목 현재가 조회 (시세 공유 서비스 우선, max_age초보다 오래됐으면 직접 조회 - 재시도 로직)"""
+        quote = self.market_data.get_quote(stock_code, max_age)
+        if quote is not None:
+            return quote
 
-    def get_stock_price(self, stock_code):
-        """개별 종목 현재가 조회 (재시도 로직)"""
         token = self.get_access_token()
         if not token:
             return None
 
-        url = "https://openapivts.koreainvestment.com:29443/uapi/domestic-stock/v1/quotations/inquire-price"
+        url = f"{KIS_BASE_URL}/uapi/domestic-stock/v1/quotations/inquire-price"
         headers = {
             "authorization": f"Bearer {token}",
             "appkey": os.getenv('KIS_APP_KEY'),
-            "appsecret": os.getenv('KIS_APP_SECRET')
+            "appsecret": os.getenv('KIS_APP_SECRET'),
+            "tr_id": "FHKST01010100"
         }
         params = {
             "FID_COND_MRKT_DIV_CODE": "J",
@@ -70,7 +94,7 @@ class EnhancedRealtimeSystem:
 
         for attempt in range(3):  # 최대 3회 재시도
             try:
-                response = requests.get(url, headers=headers, params=params, timeout=5)
+                response = self.http.get(url, headers=headers, params=params)
                 if response.status_code == 200:
                     data = response.json()
                     if data.get('rt_cd') == '0':
@@ -101,7 +125,8 @@ class EnhancedRealtimeSystem:
         print(f"\n📊 [{datetime.now(kst).strftime('%H:%M:%S')}] 포트폴리오 업데이트 중...")
 
         try:
-            portfolio_docs = db.collection('portfolio').stream()
+            portfolio_docs = list(db.collection('portfolio').stream())
+            self.market_data.subscribe(doc.id for doc in portfolio_docs)
             updated_count = 0
 
             for doc in portfolio_docs:
@@ -112,31 +137,13 @@ class EnhancedRealtimeSystem:
                 price_data = self.get_stock_price(stock_code)
                 if price_data:
                     current_price = price_data['current_price']
-                    buy_price = data.get('buy_price', current_price)
-                    quantity = data.get('quantity', 0)
-
-                    # 수익률 계산
-                    profit_amount = (current_price - buy_price) * quantity
-                    profit_rate = ((current_price - buy_price) / buy_price) * 100 if buy_price > 0 else 0
-
-                    # Firebase 업데이트
-                    doc.reference.update({
-                        'current_price': current_price,
-                        'profit_amount': profit_amount,
-                        'profit_rate': profit_rate,
-                        'total_value': current_price * quantity,
-                        'change_rate': price_data.get('change_rate', 0),
-                        'last_updated': firestore.SERVER_TIMESTAMP
-                    })
-
+                    profit_rate = self._write_holding_price(doc.reference, data, price_data)
                     updated_count += 1
                     status = "🟢" if profit_rate > 0 else "🔴"
                     print(f"  {status} {data.get('name', stock_code)}: {current_price:,.0f}원 ({profit_rate:+.2f}%)")
                 else:
                     print(f"  ⚠️ {data.get('name', stock_code)}: 가격 조회 실패")
 
-                time.sleep(0.2)  # API 호출 간격
-
             print(f"  ✅ {updated_count}개 종목 업데이트 완료")
 
         except Exception as e:
@@ -147,7 +154,8 @@ class EnhancedRealtimeSystem:
         print(f"\n🔍 [{datetime.now(kst).strftime('%H:%M:%S')}] 감시종목 업데이트 중...")
 
         try:
-            watchlist_docs = db.collection('watchlist').stream()
+            watchlist_docs = list(db.collection('watchlist').stream())
+            self.market_data.subscribe(doc.id for doc in watchlist_docs)
             updated_count = 0
 
             for doc in watchlist_docs:
@@ -157,32 +165,83 @@ class EnhancedRealtimeSystem:
                 # 현재가 조회
                 price_data = self.get_stock_price(stock_code)
                 if price_data:
-                    doc.reference.update({
-                        'current_price': price_data['current_price'],
-                        'change_rate': price_data.get('change_rate', 0),
-                        'volume': price_data.get('volume', 0),
-                        'last_updated': firestore.SERVER_TIMESTAMP
-                    })
-
+                    self._write_watch_price(doc.reference, price_data)
                     updated_count += 1
                     print(f"  📈 {data.get('name', stock_code)}: {price_data['current_price']:,.0f}원 ({price_data.get('change_rate', 0):+.2f}%)")
                 else:
                     print(f"  ⚠️ {data.get('name', stock_code)}: 가격 조회 실패")
 
-                time.sleep(0.2)
-
             print(f"  ✅ {updated_count}개 감시종목 업데이트 완료")
 
         except Exception as e:
             print(f"  ❌ 감시종목 업데이트 실패: {e}")
 
+    def _write_holding_price(self, doc_ref, data, price_data):
+        """보유 종목 현재가/수익률 기록 (sink에 넣기만 하고 배치로 전송), 수익률 반환"""
+        current_price = price_data['current_price']
+        buy_price = data.get('buy_price', current_price)
+        quantity = data.get('quantity', 0)
+
+        # 수익률 계산
+        profit_amount = (current_price - buy_price) * quantity
+        profit_rate = ((current_price - buy_price) / buy_price) * 100 if buy_price > 0 else 0
+
+        self.sink.update(doc_ref, {
+            'current_price': current_price,
+            'profit_amount': profit_amount,
+            'profit_rate': profit_rate,
+            'total_value': current_price * quantity,
+            'change_rate': price_data.get('change_rate', 0),
+            'last_updated': firestore.SERVER_TIMESTAMP
+        })
+        return profit_rate
+
+    def _write_watch_price(self, doc_ref, price_data):
+        self.sink.update(doc_ref, {
+            'current_price': price_data['current_price'],
+            'change_rate': price_data.get('change_rate', 0),
+            'volume': price_data.get('volume', 0),
+            'last_updated': firestore.SERVER_TIMESTAMP
+        })
+
+    def refresh_symbols(self):
+        """포트폴리오/감시종목 목록을 다시 읽어 조회 대상 교체"""
+        self.holdings = {doc.id: (doc.reference, doc.to_dict()) for doc in db.collection('portfolio').stream()}
+        self.watchlist = {doc.id: (doc.reference, doc.to_dict()) for doc in db.collection('watchlist').stream()}
+        self.market_data.subscribe(list(self.holdings) + list(self.watchlist))
+        self.poll_scheduler.set_symbols(
+            {code: data.get('buy_price', 0) for code, (_, data) in self.holdings.items()},
+            self.watchlist
+        )
+
+    def poll_due_symbols(self):
+        """주기가 된 종목만 조회 (위험한 보유 종목일수록 자주), 조회 건수 반환"""
+        codes = self.poll_scheduler.due()
+        for code in codes:
+            price_data = self.get_stock_price(code, max_age=self.poll_scheduler.interval(code))
+            self.poll_scheduler.record(code, price_data['current_price'] if price_data else None)
+            if not price_data:
+                continue
+            if code in self.holdings:
+                doc_ref, data = self.holdings[code]
+                profit_rate = self._write_holding_price(doc_ref, data, price_data)
+                if profit_rate <= self.stop_loss_rate or profit_rate >= self.take_profit_rate:
+                    if code not in self.alerted:
+                        self.alerted.add(code)
+                        print(f"  🚨 {data.get('name', code)}: {price_data['current_price']:,.0f}원 ({profit_rate:+.2f}%) - 손절/익절 기준 도달")
+                else:
+                    self.alerted.discard(code)
+            elif code in self.watchlist:
+                self._write_watch_price(self.watchlist[code][0], price_data)
+        return len(codes)
+
     def update_system_status(self):
         """시스템 상태 업데이트"""
         try:
-            db.collection('system').document('status').set({
+            self.sink.set(db.collection('system').document('status'), {
                 'last_update': firestore.SERVER_TIMESTAMP,
                 'status': 'running',
-                'update_interval': 10,
+                'update_interval': round(self.poll_scheduler.fastest_interval(), 1),
                 'version': '2.0'
             }, merge=True)
         except:
@@ -194,31 +253,46 @@ class EnhancedRealtimeSystem:
         print("🚀 개선된 실시간 업데이트 시스템 시작")
         print("-" * 50)
 
+        # 장 외 시간에 시작했거나 장이 막 끝났으면 종가를 한 번 반영한 뒤 다음 장까지 대기
+        refresh_after_close = True
+        symbols_at = status_at = 0.0
+        polled = 0
+
         while self.running:
             try:
-                start_time = time.time()
+                if not is_session_open():
+                    if refresh_after_close:
+                        print("🔔 장 마감 - 종가 반영")
+                        self.update_portfolio_realtime()
+                        self.update_watchlist_realtime()
+                        self.update_system_status()
+                        refresh_after_close = False
+                    sleep_until('regular')
+                    continue
+                refresh_after_close = True
 
-                # 포트폴리오 업데이트 (매번)
-                self.update_portfolio_realtime()
+                now = time.time()
+                if now - symbols_at >= self.symbols_refresh:
+                    self.refresh_symbols()
+                    symbols_at = now
 
-                # 감시종목 업데이트 (1분마다)
-                if int(time.time()) % 60 < 10:  # 매 분의 첫 10초
-                    self.update_watchlist_realtime()
+                # 주기가 된 종목만 조회 (보유 종목은 손절/익절 기준에 가까울수록, 감시종목은 변동성이 클수록 자주)
+                polled += self.poll_due_symbols()
 
                 # 시스템 상태 업데이트
-                self.update_system_status()
-
-                # 처리 시간 계산
-                elapsed = time.time() - start_time
-                sleep_time = max(0, 10 - elapsed)  # 10초 간격 유지
+                if now - status_at >= self.status_interval:
+                    self.update_system_status()
+                    print(f"📊 [{datetime.now(kst).strftime('%H:%M:%S')}] {self.status_interval}초간 {polled}건 조회 "
+                          f"({len(self.poll_scheduler)}종목, 최단 주기 {self.poll_scheduler.fastest_interval():.1f}초, "
+                          f"예산 {self.poll_scheduler.calls_per_second():.2f}/{self.poll_scheduler.budget:.2f}건/초)")
+                    status_at, polled = now, 0
 
-                if sleep_time > 0:
-                    print(f"⏰ {sleep_time:.1f}초 대기 중...")
-                    time.sleep(sleep_time)
+                time.sleep(min(self.poll_scheduler.seconds_until_next(), 1.0))
 
             except KeyboardInterrupt:
                 print("\n🛑 시스템 종료")
                 self.running = False
+                self.sink.close()
                 break
             except Exception as e:
                 print(f"❌ 메인 루프 오류: {e}")
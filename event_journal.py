@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+매매/이벤트 저널 (SQLite, WAL 모드)
+- 로그 1건 = events 1행: 시각, 레벨, 메시지, 종목코드, 가격, 수량, 사유, 원본 데이터(JSON)
+- 시각/레벨/종목코드 인덱스로 기간·종목별 조회
+- 일자×레벨 건수 테이블을 기록과 같은 트랜잭션에서 갱신 → 요약은 즉시 조회
+"""
+
+import os
+import json
+import sqlite3
+import argparse
+import threading
+from datetime import datetime
+import pytz
+from typing import Optional, List, Dict, Iterable, Tuple, Any
+
+
+kst = pytz.timezone('Asia/Seoul')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    day TEXT NOT NULL,
+    level TEXT NOT NULL,
+    message TEXT NOT NULL,
+    code TEXT,
+    price REAL,
+    quantity INTEGER,
+    reason TEXT,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts);
+CREATE INDEX IF NOT EXISTS idx_events_level_ts ON events(level, ts);
+CREATE INDEX IF NOT EXISTS idx_events_code_ts ON events(code, ts);
+CREATE TABLE IF NOT EXISTS daily_counts (
+    day TEXT NOT NULL,
+    level TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, level)
+);
+"""
+
+
+def _first(data: Dict, *keys) -> Any:
+    for key in keys:
+        if data.get(key) not in (None, ''):
+            return data[key]
+    return None
+
+
+def extract_fields(data: Optional[Dict]) -> Tuple[Optional[str], Optional[float], Optional[int], Optional[str]]:
+    """로그 데이터에서 (종목코드, 가격, 수량, 사유) 추출 - 매매 로그마다 키 이름이 조금씩 다름"""
+    if not data:
+        return None, None, None, None
+
+    code = _first(data, 'code', 'stock_code')
+    price = _first(data, 'price', 'current_price')
+    quantity = _first(data, 'quantity')
+    reason = _first(data, 'reason', 'signal', 'signal_reasons')
+    if isinstance(reason, (list, tuple)):
+        reason = ', '.join(str(r) for r in reason)
+
+    try:
+        price = float(price) if price is not None else None
+    except (TypeError, ValueError):
+        price = None
+    try:
+        quantity = int(quantity) if quantity is not None else None
+    except (TypeError, ValueError):
+        quantity = None
+
+    return (str(code) if code is not None else None), price, quantity, reason
+
+
+class EventJournal:
+    """이벤트 저널 - 스레드마다 별도 연결 (WAL이라 읽기가 기록을 막지 않음)"""
+
+    def __init__(self, path: str = "logs/events.db"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def record_many(self, events: Iterable[Tuple[float, str, str, Optional[Dict]]]):
+        """(epoch 시각, 레벨, 메시지, 데이터) 여러 건을 한 트랜잭션으로 기록"""
+        rows = []
+        counts: Dict[Tuple[str, str], int] = {}
+        for ts, level, message, data in events:
+            day = datetime.fromtimestamp(ts, kst).strftime('%Y%m%d')
+            code, price, quantity, reason = extract_fields(data)
+            rows.append((ts, day, level, message, code, price, quantity, reason,
+                         json.dumps(data, ensure_ascii=False, default=str) if data else None))
+            counts[(day, level)] = counts.get((day, level), 0) + 1
+
+        if not rows:
+            return
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT INTO events (ts, day, level, message, code, price, quantity, reason, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany(
+                "INSERT INTO daily_counts (day, level, count) VALUES (?, ?, ?) "
+                "ON CONFLICT(day, level) DO UPDATE SET count = count + excluded.count",
+                [(day, level, count) for (day, level), count in counts.items()])
+
+    def record(self, level: str, message: str, data: Optional[Dict] = None, ts: Optional[float] = None):
+        """이벤트 1건 기록"""
+        self.record_many([(ts if ts is not None else datetime.now(kst).timestamp(), level, message, data)])
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict:
+        event = dict(row)
+        event['timestamp'] = datetime.fromtimestamp(event['ts'], kst).strftime('[%Y-%m-%d %H:%M:%S KST]')
+        event['data'] = json.loads(event['data']) if event['data'] else None
+        return event
+
+    def query(self,
+              start: Optional[datetime] = None,
+              end: Optional[datetime] = None,
+              level: Optional[str] = None,
+              code: Optional[str] = None,
+              limit: int = 100) -> List[Dict]:
+        """기간/레벨/종목코드로 이벤트 조회 (최신순)"""
+        conditions = []
+        params: List[Any] = []
+        if start is not None:
+            conditions.append("ts >= ?")
+            params.append(start.timestamp())
+        if end is not None:
+            conditions.append("ts < ?")
+            params.append(end.timestamp())
+        if level is not None:
+            conditions.append("level = ?")
+            params.append(level)
+        if code is not None:
+            conditions.append("code = ?")
+            params.append(code)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._connect().execute(
+            f"SELECT * FROM events {where} ORDER BY ts DESC, id DESC LIMIT ?", (*params, limit))
+        return [self._row_to_dict(row) for row in rows]
+
+    def level_counts(self, day: str) -> Dict[str, int]:
+        """해당 일자(YYYYMMDD)의 레벨별 건수"""
+        rows = self._connect().execute("SELECT level, count FROM daily_counts WHERE day = ?", (day,))
+        return {row['level']: row['count'] for row in rows}
+
+    def recent(self, day: str, limit: int = 10) -> List[Dict]:
+        """해당 일자의 최근 이벤트 (오래된 것 → 최신 순)"""
+        rows = self._connect().execute(
+            "SELECT * FROM events WHERE day = ? ORDER BY ts DESC, id DESC LIMIT ?", (day, limit))
+        return [self._row_to_dict(row) for row in rows][::-1]
+
+    def close(self):
+        """현재 스레드의 연결 닫기"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def main():
+    """사후 분석용 조회: python event_journal.py --level TRADE --code 005930 --since 2025-01-01"""
+    parser = argparse.ArgumentParser(description="매매/이벤트 저널 조회")
+    parser.add_argument('--db', default="logs/events.db")
+    parser.add_argument('--level')
+    parser.add_argument('--code')
+    parser.add_argument('--since', help="YYYY-MM-DD (KST)")
+    parser.add_argument('--until', help="YYYY-MM-DD (KST, 해당 일 0시 이전)")
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    parse_day = lambda value: kst.localize(datetime.strptime(value, '%Y-%m-%d')) if value else None
+    journal = EventJournal(args.db)
+    events = journal.query(parse_day(args.since), parse_day(args.until), args.level, args.code, args.limit)
+
+    for event in reversed(events):
+        detail = ' '.join(f"{key}={event[key]}" for key in ('code', 'price', 'quantity', 'reason')
+                          if event[key] is not None)
+        print(f"{event['timestamp']} [{event['level']}] {event['message']} {detail}".rstrip())
+    print(f"📊 {len(events)}건")
+
+
+if __name__ == "__main__":
+    main()
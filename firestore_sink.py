@@ -0,0 +1,116 @@
+"""
+Firestore 쓰기 모음 전송 (write-coalescing sink)
+- update/set(merge)를 문서별로 모아 두고 같은 문서의 반복 갱신은 필드 단위로 병합
+- flush_interval마다 또는 대기 문서가 max_pending개를 넘으면 배치 커밋 (배치당 최대 500건)
+- 호출 쪽은 메모리에 넣기만 하므로 가격 조회 루프가 Firestore 응답을 기다리지 않음
+"""
+
+import atexit
+import threading
+from typing import Dict, List, Optional, Tuple, Any
+
+from firestore_sync import commit_in_batches, MAX_BATCH_OPS
+
+
+class FirestoreWriteSink:
+    """문서별 대기 쓰기를 모아 주기적으로 배치 커밋"""
+
+    def __init__(self, db, flush_interval: float = 2.0, max_pending: int = MAX_BATCH_OPS):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        # 문서 경로 → [동작(update/merge), 문서참조, 병합된 필드]
+        self._pending: Dict[str, List[Any]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+        self.stats = {'queued': 0, 'written': 0, 'commits': 0, 'failed': 0}
+
+        self._worker = threading.Thread(target=self._run, name="firestore-sink", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def _enqueue(self, op: str, ref, data: Dict):
+        with self._lock:
+            entry = self._pending.get(ref.path)
+            if entry is None:
+                self._pending[ref.path] = [op, ref, dict(data)]
+            else:
+                # set(merge)가 한 번이라도 있으면 merge 유지 (문서가 없어도 생성)
+                if op == 'merge':
+                    entry[0] = 'merge'
+                entry[2].update(data)
+            self.stats['queued'] += 1
+            if len(self._pending) >= self.max_pending:
+                self._wake.set()
+
+    def update(self, ref, data: Dict):
+        """doc_ref.update(data) 대기열 추가"""
+        self._enqueue('update', ref, data)
+
+    def set(self, ref, data: Dict, merge: bool = True):
+        """doc_ref.set(data, merge=True) 대기열 추가 (덮어쓰기 set은 지원하지 않음)"""
+        if not merge:
+            raise ValueError("FirestoreWriteSink는 merge=True set만 지원합니다")
+        self._enqueue('merge', ref, data)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """대기 중인 쓰기를 즉시 커밋하고 기록한 문서 수 반환"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            ops: List[Tuple[str, Any, Optional[Dict]]] = [tuple(entry) for entry in pending.values()]
+            written = 0
+            for i in range(0, len(ops), MAX_BATCH_OPS):
+                chunk = ops[i:i + MAX_BATCH_OPS]
+                try:
+                    commit_in_batches(self.db, chunk)
+                    self.stats['commits'] += 1
+                    written += len(chunk)
+                except Exception as e:
+                    # 한 문서라도 실패하면 배치 전체가 실패하므로 (삭제된 문서 update 등) 개별 재시도
+                    print(f"⚠️ Firestore 배치 커밋 실패 - 문서별 재시도: {e}")
+                    written += self._commit_one_by_one(chunk)
+
+            self.stats['written'] += written
+            return written
+
+    def _commit_one_by_one(self, ops: List[Tuple[str, Any, Optional[Dict]]]) -> int:
+        written = 0
+        for op in ops:
+            try:
+                commit_in_batches(self.db, [op])
+                self.stats['commits'] += 1
+                written += 1
+            except Exception as e:
+                self.stats['failed'] += 1
+                print(f"  ❌ {op[1].path} 업데이트 실패: {e}")
+        return written
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Firestore 쓰기 전송 오류: {e}")
+
+    def close(self):
+        """백그라운드 전송 중지 후 남은 쓰기 커밋"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        self._worker.join(timeout=5)
+        self.flush()
@@ -0,0 +1,102 @@
+"""
+Firestore 컬렉션 차분 동기화
+- 마지막으로 기록한 문서 상태를 기억하고, 바뀐 필드만 update / 사라진 필드는 DELETE_FIELD / 사라진 문서만 delete
+- 전체 조회(stream)는 최초 1회와 resync_interval마다만 (외부 변경 반영)
+- 배치당 최대 500건으로 나눠 커밋
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple, Any
+
+from firebase_admin import firestore
+
+
+MAX_BATCH_OPS = 500  # Firestore 배치 쓰기 한도
+
+
+def commit_in_batches(db, ops: List[Tuple[str, Any, Optional[Dict]]]):
+    """(동작, 문서참조, 데이터) 목록을 500건 단위 배치로 커밋 - 동작: set/merge/update/delete"""
+    for i in range(0, len(ops), MAX_BATCH_OPS):
+        batch = db.batch()
+        for op, ref, data in ops[i:i + MAX_BATCH_OPS]:
+            if op == 'set':
+                batch.set(ref, data)
+            elif op == 'merge':
+                batch.set(ref, data, merge=True)
+            elif op == 'update':
+                batch.update(ref, data)
+            else:
+                batch.delete(ref)
+        batch.commit()
+
+
+class FirestoreDiffSync:
+    """컬렉션 하나를 원하는 문서 집합과 같게 유지 (필드 단위 차분 쓰기)"""
+
+    def __init__(self, db, collection: str, resync_interval: float = 3600):
+        self.db = db
+        self.collection = collection
+        self.resync_interval = resync_interval
+
+        self._state: Optional[Dict[str, Dict]] = None  # 문서 ID → 마지막 기록 필드
+        self._seeded_at = 0.0
+
+    def _seed(self):
+        """현재 컬렉션 상태 읽기 (전체 조회)"""
+        self._state = {doc.id: doc.to_dict() or {} for doc in self.db.collection(self.collection).stream()}
+        self._seeded_at = time.time()
+
+    def reset(self):
+        """기억한 상태 폐기 - 다음 sync에서 다시 전체 조회"""
+        self._state = None
+
+    def sync(self, docs: Dict[str, Dict], touch: Optional[Dict] = None) -> Dict[str, int]:
+        """docs(문서 ID → 필드)와 같아지도록 차분만 기록하고 건수 반환
+
+        touch 필드(last_updated 등)는 비교하지 않고, 실제로 쓰는 문서에만 함께 기록한다.
+        이전 상태에 있던 필드가 새 데이터에 없으면 삭제한다 (touch 필드 제외).
+        """
+        if self._state is None or time.time() - self._seeded_at >= self.resync_interval:
+            self._seed()
+
+        touch = touch or {}
+        collection = self.db.collection(self.collection)
+        ops = []
+        counts = {'created': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+
+        for doc_id, data in docs.items():
+            previous = self._state.get(doc_id)
+            if previous is None:
+                ops.append(('set', collection.document(doc_id), {**data, **touch}))
+                counts['created'] += 1
+                continue
+
+            changed = {key: value for key, value in data.items()
+                       if key not in previous or previous[key] != value}
+            changed.update({key: firestore.DELETE_FIELD for key in previous
+                            if key not in data and key not in touch})
+            if changed:
+                ops.append(('update', collection.document(doc_id), {**changed, **touch}))
+                counts['updated'] += 1
+            else:
+                counts['unchanged'] += 1
+
+        vanished = [doc_id for doc_id in self._state if doc_id not in docs]
+        for doc_id in vanished:
+            ops.append(('delete', collection.document(doc_id), None))
+            counts['deleted'] += 1
+
+        try:
+            commit_in_batches(self.db, ops)
+        except Exception:
+            # 일부 배치만 반영됐을 수 있으므로 다음 sync에서 다시 읽음
+            self.reset()
+            raise
+
+        for doc_id, data in docs.items():
+            self._state[doc_id] = dict(data)
+        for doc_id in vanished:
+            del self._state[doc_id]
+
+        counts['writes'] = len(ops)
+        return counts
@@ -10,6 +10,7 @@ import firebase_admin
 from firebase_admin import credentials, firestore
 from market_scanner import MarketScanner
 from logger_system import TradingLogger
+from krx_calendar import market_phase, sleep_until
 import requests
 import json
 
@@ -292,7 +293,7 @@ class ImprovedTradingBot:
             try:
                 # 장시간 체크
                 if not self.is_trading_time():
-                    time.sleep(60)
+                    sleep_until('continuous')
                     continue
 
                 # 포트폴리오 모니터링 (매 10초)
@@ -313,14 +314,8 @@ class ImprovedTradingBot:
                 time.sleep(30)
 
     def is_trading_time(self):
-        """장시간 체크"""
-        now = datetime.now(self.kst_timezone)
-        if now.weekday() >= 5:
-            return False
-        current_time = now.time()
-        market_open = datetime.strptime("09:00", "%H:%M").time()
-        market_close = datetime.strptime("15:20", "%H:%M").time()
-        return market_open <= current_time <= market_close
+        """장시간 체크 (휴장일/개장 지연일 포함, 종가 동시호가 전까지)"""
+        return market_phase(datetime.now(self.kst_timezone)) == 'regular'
 
 if __name__ == "__main__":
     bot = ImprovedTradingBot()
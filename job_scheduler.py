@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+프로세스 내 주기 작업 스케줄러 (asyncio)
+- 작업을 하위 프로세스로 띄우지 않고 같은 프로세스에서 실행
+  → 매번 인터프리터 시작, pandas/firebase_admin import, 토큰 파일 읽기를 반복하지 않음
+  → Firestore / KIS 클라이언트와 토큰 관리자는 작업 사이에 계속 재사용
+- 코루틴 함수는 이벤트 루프에서, 일반 함수는 스레드 풀에서 실행
+- 작업별 옵션:
+  - jitter: 매 실행을 0~jitter초 늦춤 (여러 작업이 같은 순간에 몰리지 않도록, 예정 시각 자체는 밀리지 않음)
+  - active: 예정 시각에 False를 반환하면 이번 회차는 건너뜀 (예: krx_calendar.is_session_open - 장 외 시간 API 호출 없음)
+  - 중복 실행 방지: 이전 실행이 끝나기 전에는 같은 작업을 다시 시작하지 않음
+  - misfire: 실행이 길어지거나 프로세스가 멈춰 예정 시각을 지나쳤을 때
+      'skip'      놓친 회차는 버리고 다음 예정 시각부터 (기본)
+      'run_once'  놓친 회차를 한 번으로 합쳐 바로 실행
+      'catch_up'  놓친 회차를 연달아 실행 (최대 max_catch_up회, 나머지는 버림)
+"""
+
+import time
+import random
+import asyncio
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+
+MISFIRE_POLICIES = ('skip', 'run_once', 'catch_up')
+
+
+class Job:
+    """주기 작업 1개"""
+
+    def __init__(self, name: str, func: Callable, interval: float, jitter: float = 0.0,
+                 misfire: str = 'skip', run_immediately: bool = False, max_catch_up: int = 10,
+                 active: Optional[Callable[[], bool]] = None):
+        if interval <= 0:
+            raise ValueError(f"[{name}] interval은 0보다 커야 합니다")
+        if not 0 <= jitter < interval:
+            raise ValueError(f"[{name}] jitter는 0 이상 interval 미만이어야 합니다")
+        if misfire not in MISFIRE_POLICIES:
+            raise ValueError(f"[{name}] misfire는 {MISFIRE_POLICIES} 중 하나여야 합니다")
+
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.misfire = misfire
+        self.run_immediately = run_immediately
+        self.max_catch_up = max_catch_up
+        self.active = active
+
+        self.running = False
+        self.last_duration = 0.0
+        self.stats = {'runs': 0, 'failures': 0, 'missed': 0, 'inactive': 0}
+
+
+class JobScheduler:
+    """주기 작업 실행기 - add_job()으로 등록 후 run_forever()"""
+
+    def __init__(self, max_workers: int = 4):
+        self.jobs: Dict[str, Job] = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+
+    def add_job(self, name: str, func: Callable, interval: float, **options) -> Job:
+        """작업 등록 (options: jitter, misfire, run_immediately, max_catch_up, active)"""
+        if name in self.jobs:
+            raise ValueError(f"이미 등록된 작업: {name}")
+        job = Job(name, func, interval, **options)
+        self.jobs[name] = job
+        return job
+
+    async def _execute(self, job: Job):
+        job.running = True
+        started = time.monotonic()
+        try:
+            if asyncio.iscoroutinefunction(job.func):
+                await job.func()
+            else:
+                await asyncio.get_running_loop().run_in_executor(self._pool, job.func)
+            job.stats['runs'] += 1
+        except Exception as e:
+            job.stats['failures'] += 1
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ 작업 실패 ({job.name}): {e}")
+        finally:
+            job.running = False
+            job.last_duration = time.monotonic() - started
+
+    def _next_due(self, job: Job, due: float) -> float:
+        """실행이 끝난 뒤 다음 예정 시각 (놓친 회차는 misfire 정책대로)"""
+        due += job.interval
+        now = time.monotonic()
+        if due > now:
+            return due
+
+        missed = int((now - due) // job.interval) + 1
+        if job.misfire == 'skip':
+            job.stats['missed'] += missed
+            return due + missed * job.interval
+        if job.misfire == 'run_once':
+            job.stats['missed'] += missed - 1
+            return now
+        if missed > job.max_catch_up:
+            dropped = missed - job.max_catch_up
+            job.stats['missed'] += dropped
+            due += dropped * job.interval
+        return due
+
+    async def _wait(self, delay: float) -> bool:
+        """delay초 대기, 그 사이 stop()이 호출되면 False"""
+        if delay <= 0:
+            return not self._stop.is_set()
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout=delay)
+            return False
+        except asyncio.TimeoutError:
+            return True
+
+    async def _job_loop(self, job: Job):
+        # 실행을 기다린 뒤 다음 회차를 계산하므로 같은 작업이 겹쳐 실행되지 않음
+        due = time.monotonic() + (0 if job.run_immediately else job.interval)
+        while not self._stop.is_set():
+            delay = due - time.monotonic() + random.uniform(0, job.jitter)
+            if not await self._wait(delay):
+                break
+            if job.active is not None and not job.active():
+                job.stats['inactive'] += 1
+                due = max(due + job.interval, time.monotonic())
+                continue
+            await self._execute(job)
+            due = self._next_due(job, due)
+
+    async def run(self):
+        """등록된 작업 실행 (stop() 호출까지)"""
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        tasks = [asyncio.create_task(self._job_loop(job)) for job in self.jobs.values()]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._pool.shutdown(wait=False)
+
+    def run_forever(self):
+        """현재 스레드에서 실행 (Ctrl+C는 KeyboardInterrupt로 호출한 쪽에 전달)"""
+        asyncio.run(self.run())
+
+    def stop(self):
+        """다른 스레드에서도 호출 가능 - 진행 중인 실행이 끝나면 종료"""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    def summary(self) -> str:
+        return ", ".join(f"{job.name} {job.stats['runs']}회 (실패 {job.stats['failures']}, 생략 {job.stats['missed']})"
+                         for job in self.jobs.values())
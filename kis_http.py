@@ -0,0 +1,81 @@
+"""
+KIS API 공용 HTTP 전송 계층
+- requests.Session 기반 커넥션 풀 + keep-alive
+- 엔드포인트별 타임아웃
+- 요청 전 TR-ID별 호출 한도 확보 (rate_limiter)
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict
+
+from rate_limiter import KISRateLimiter
+
+
+# 엔드포인트(경로 마지막 세그먼트)별 기본 타임아웃 (초)
+DEFAULT_TIMEOUTS = {
+    'inquire-price': 5,
+    'inquire-daily-itemchartprice': 5,
+    'volume-rank': 10,
+    'inquire-balance': 10,
+    'order-cash': 10,
+    'tokenP': 10,
+}
+
+
+class KISHttpSession:
+    """KIS API 호출용 공유 세션 (TCP/TLS 연결 재사용)"""
+
+    def __init__(self,
+                 base_url: str,
+                 pool_connections: int = 2,
+                 pool_maxsize: int = 16,
+                 timeouts: Optional[Dict[str, float]] = None,
+                 default_timeout: float = 10,
+                 rate_limiter: Optional[KISRateLimiter] = None):
+        self.base_url = base_url
+        self.rate_limiter = rate_limiter
+        self.default_timeout = default_timeout
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+
+        # 커넥션 풀 설정 (재시도는 클라이언트 메서드가 직접 처리)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize,
+                              max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Connection': 'keep-alive'})
+
+    def _resolve_url(self, url: str) -> str:
+        """상대 경로면 base_url을 붙임"""
+        if url.startswith('http'):
+            return url
+        return f"{self.base_url}{url}"
+
+    def get_timeout(self, url: str) -> float:
+        """URL의 엔드포인트에 해당하는 타임아웃 반환"""
+        endpoint = url.split('?')[0].rstrip('/').rsplit('/', 1)[-1]
+        return self.timeouts.get(endpoint, self.default_timeout)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """공통 요청 처리 (타임아웃 미지정 시 엔드포인트 기본값 사용)"""
+        url = self._resolve_url(url)
+        kwargs.setdefault('timeout', self.get_timeout(url))
+
+        # 호출 한도 내에서만 전송 (재시도 요청도 한도에 포함)
+        if self.rate_limiter:
+            headers = kwargs.get('headers') or {}
+            self.rate_limiter.acquire(headers.get('tr_id'))
+
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        """세션 및 커넥션 풀 정리"""
+        self.session.close()
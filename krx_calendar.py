@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+KRX 거래 달력 (한국 시간)
+- 정규장 09:00~15:30 (15:20부터 종가 동시호가), 장전 08:30~09:00, 장후 시간외 15:40~18:00
+- 휴장일: 주말 + HOLIDAYS (2025~2026) + KRX_EXTRA_HOLIDAYS 환경변수 (YYYYMMDD 쉼표 구분, 임시 휴장 등)
+- 개장/폐장 시각이 다른 날: SPECIAL_SESSIONS (연초 첫 거래일 10시 개장, 수능일 10시 개장/16시 30분 폐장 등)
+  - 장전/장후 시간도 개장/폐장 시각에 맞춰 함께 이동
+- HOLIDAYS / SPECIAL_SESSIONS는 KRX 공지를 보고 매년 다음 해 분을 추가해야 함
+  - 표에 없는 해(COVERED_YEAR 이후)는 주말만 휴장으로 계산되므로 처음 조회할 때 경고 출력
+- 루프는 장이 닫혀 있으면 고정 간격으로 깨어나지 말고 sleep_until()로 다음 장까지 대기
+"""
+
+import os
+import time
+import threading
+import pytz
+from datetime import datetime, date, time as dtime, timedelta
+from typing import Dict, Optional, Tuple
+
+
+KST = pytz.timezone('Asia/Seoul')
+
+REGULAR_OPEN = dtime(9, 0)
+REGULAR_CLOSE = dtime(15, 30)
+PRE_MARKET_LEAD = timedelta(minutes=30)     # 장전 (시간외 종가 + 동시호가)
+CLOSING_AUCTION = timedelta(minutes=10)     # 종가 동시호가
+AFTER_HOURS_START = timedelta(minutes=10)   # 폐장 후 장후 시간외 시작까지
+AFTER_HOURS_END = timedelta(hours=2, minutes=30)  # 폐장 후 시간외 단일가 종료까지
+
+HOLIDAYS = {
+    # 2025
+    date(2025, 1, 1),                                       # 신정
+    date(2025, 1, 27), date(2025, 1, 28), date(2025, 1, 29), date(2025, 1, 30),  # 임시공휴일 + 설날
+    date(2025, 3, 3),                                       # 삼일절 대체공휴일
+    date(2025, 5, 1),                                       # 근로자의 날
+    date(2025, 5, 5), date(2025, 5, 6),                     # 어린이날·부처님오신날, 대체공휴일
+    date(2025, 6, 3),                                       # 대통령 선거
+    date(2025, 6, 6),                                       # 현충일
+    date(2025, 8, 15),                                      # 광복절
+    date(2025, 10, 3),                                      # 개천절
+    date(2025, 10, 6), date(2025, 10, 7), date(2025, 10, 8),  # 추석 + 대체공휴일
+    date(2025, 10, 9),                                      # 한글날
+    date(2025, 12, 25),                                     # 성탄절
+    date(2025, 12, 31),                                     # 연말 휴장
+    # 2026
+    date(2026, 1, 1),                                       # 신정
+    date(2026, 2, 16), date(2026, 2, 17), date(2026, 2, 18),  # 설날
+    date(2026, 3, 2),                                       # 삼일절 대체공휴일
+    date(2026, 5, 1),                                       # 근로자의 날
+    date(2026, 5, 5),                                       # 어린이날
+    date(2026, 5, 25),                                      # 부처님오신날 대체공휴일
+    date(2026, 6, 3),                                       # 지방 선거
+    date(2026, 8, 17),                                      # 광복절 대체공휴일
+    date(2026, 9, 24), date(2026, 9, 25),                   # 추석
+    date(2026, 10, 5),                                      # 개천절 대체공휴일
+    date(2026, 10, 9),                                      # 한글날
+    date(2026, 12, 25),                                     # 성탄절
+    date(2026, 12, 31),                                     # 연말 휴장
+}
+
+# 날짜 → (개장, 폐장)
+SPECIAL_SESSIONS: Dict[date, Tuple[dtime, dtime]] = {
+    date(2025, 1, 2): (dtime(10, 0), REGULAR_CLOSE),        # 연초 개장일
+    date(2025, 11, 13): (dtime(10, 0), dtime(16, 30)),      # 수능
+    date(2026, 1, 2): (dtime(10, 0), REGULAR_CLOSE),        # 연초 개장일
+    date(2026, 11, 19): (dtime(10, 0), dtime(16, 30)),      # 수능
+}
+
+# 휴장일/특별 개장 표가 채워진 마지막 해 - 매년 다음 해 분을 추가하고 함께 올릴 것
+COVERED_YEAR = 2026
+
+# 창 이름 → (시작, 종료) 구간 (TradingSession 속성 이름)
+WINDOWS = {
+    'regular': ('open', 'close'),
+    'continuous': ('open', 'auction_start'),   # 접속매매 (종가 동시호가 전까지)
+    'pre_market': ('pre_open', 'close'),        # 장전부터 폐장까지
+    'extended': ('pre_open', 'after_close'),    # 장전부터 시간외 단일가 종료까지
+}
+
+
+_extra_holidays_cache: Optional[frozenset] = None
+_extra_holidays_lock = threading.Lock()
+
+
+def _extra_holidays() -> frozenset:
+    """KRX_EXTRA_HOLIDAYS 파싱 (처음 사용할 때 한 번)
+    - import 시점에 읽으면 호출하는 쪽의 load_dotenv() 전이라 .env 값이 빠지므로 지연 파싱
+    - 형식이 잘못된 항목은 경고 후 건너뜀
+    """
+    global _extra_holidays_cache
+    if _extra_holidays_cache is not None:
+        return _extra_holidays_cache
+    with _extra_holidays_lock:
+        if _extra_holidays_cache is None:
+            days = set()
+            for value in os.getenv('KRX_EXTRA_HOLIDAYS', '').split(','):
+                value = value.strip()
+                if not value:
+                    continue
+                try:
+                    days.add(datetime.strptime(value, "%Y%m%d").date())
+                except ValueError:
+                    print(f"⚠️ KRX_EXTRA_HOLIDAYS 항목 무시 (YYYYMMDD 형식 아님): {value}")
+            _extra_holidays_cache = frozenset(days)
+    return _extra_holidays_cache
+
+
+def _kst(day: date, at: dtime) -> datetime:
+    return KST.localize(datetime.combine(day, at))
+
+
+def _now(now: Optional[datetime] = None) -> datetime:
+    if now is None:
+        return datetime.now(KST)
+    return KST.localize(now) if now.tzinfo is None else now.astimezone(KST)
+
+
+class TradingSession:
+    """거래일 하루의 시간대"""
+
+    def __init__(self, day: date, open_time: dtime = REGULAR_OPEN, close_time: dtime = REGULAR_CLOSE):
+        self.day = day
+        self.open = _kst(day, open_time)
+        self.close = _kst(day, close_time)
+        self.pre_open = self.open - PRE_MARKET_LEAD
+        self.auction_start = self.close - CLOSING_AUCTION
+        self.after_open = self.close + AFTER_HOURS_START
+        self.after_close = self.close + AFTER_HOURS_END
+
+    def phase(self, now: datetime) -> str:
+        """'pre_market' / 'regular' / 'closing_auction' / 'after_hours' / 'closed'"""
+        if self.pre_open <= now < self.open:
+            return 'pre_market'
+        if self.open <= now < self.auction_start:
+            return 'regular'
+        if self.auction_start <= now < self.close:
+            return 'closing_auction'
+        if self.after_open <= now < self.after_close:
+            return 'after_hours'
+        return 'closed'
+
+
+_coverage_warned = False
+
+
+def _check_coverage(day: date):
+    global _coverage_warned
+    if day.year > COVERED_YEAR and not _coverage_warned:
+        _coverage_warned = True
+        print(f"⚠️ KRX 휴장일 표가 {COVERED_YEAR}년까지만 있습니다 - {day.year}년은 주말만 휴장으로 계산 "
+              f"(krx_calendar.HOLIDAYS / SPECIAL_SESSIONS 갱신 필요)")
+
+
+def is_trading_day(day: date) -> bool:
+    _check_coverage(day)
+    return day.weekday() < 5 and day not in HOLIDAYS and day not in _extra_holidays()
+
+
+def session_for(day: date) -> Optional[TradingSession]:
+    """거래일이면 그날 시간대, 휴장일이면 None"""
+    if not is_trading_day(day):
+        return None
+    return TradingSession(day, *SPECIAL_SESSIONS.get(day, (REGULAR_OPEN, REGULAR_CLOSE)))
+
+
+def next_trading_day(day: date) -> date:
+    day += timedelta(days=1)
+    while not is_trading_day(day):
+        day += timedelta(days=1)
+    return day
+
+
+def previous_trading_day(day: date) -> date:
+    day -= timedelta(days=1)
+    while not is_trading_day(day):
+        day -= timedelta(days=1)
+    return day
+
+
+def market_phase(now: Optional[datetime] = None) -> str:
+    now = _now(now)
+    session = session_for(now.date())
+    return session.phase(now) if session else 'closed'
+
+
+def is_session_open(now: Optional[datetime] = None) -> bool:
+    """정규장 시간 여부 (종가 동시호가 포함)"""
+    return market_phase(now) in ('regular', 'closing_auction')
+
+
+def last_closed_session(now: Optional[datetime] = None) -> date:
+    """now 기준 마지막으로 마감된 거래일"""
+    now = _now(now)
+    session = session_for(now.date())
+    if session and now >= session.close:
+        return session.day
+    return previous_trading_day(now.date())
+
+
+def next_window(now: Optional[datetime] = None, window: str = 'regular') -> Tuple[datetime, datetime]:
+    """지금 속한(또는 다음) 창의 (시작, 종료)"""
+    now = _now(now)
+    start_attr, end_attr = WINDOWS[window]
+    day = now.date() if is_trading_day(now.date()) else next_trading_day(now.date())
+    while True:
+        session = session_for(day)
+        if now < getattr(session, end_attr):
+            return getattr(session, start_attr), getattr(session, end_attr)
+        day = next_trading_day(day)
+
+
+def seconds_until(window: str = 'regular', now: Optional[datetime] = None) -> float:
+    """창 안이면 0, 아니면 다음 창 시작까지 남은 초"""
+    now = _now(now)
+    start, _ = next_window(now, window)
+    return max(0.0, (start - now).total_seconds())
+
+
+def seconds_until_close(window: str = 'regular', now: Optional[datetime] = None) -> float:
+    """창 안이면 종료까지 남은 초, 창 밖이면 0"""
+    now = _now(now)
+    start, end = next_window(now, window)
+    return (end - now).total_seconds() if start <= now else 0.0
+
+
+def sleep_until(window: str = 'regular', stop_event: Optional[threading.Event] = None,
+                max_chunk: float = 3600.0) -> float:
+    """다음 창 시작까지 대기 (창 안이면 바로 반환), 대기한 초 반환
+    - max_chunk마다 깨어나 다시 계산 (절전/시계 변경 대비), stop_event가 set되면 중단
+    """
+    waited = 0.0
+    remaining = seconds_until(window)
+    if remaining > 0:
+        start, _ = next_window(window=window)
+        print(f"💤 장 외 시간 ({market_phase()}) - 다음 장 {start.strftime('%Y-%m-%d %H:%M')}까지 대기")
+    while remaining > 0:
+        chunk = min(remaining, max_chunk)
+        if stop_event is not None:
+            if stop_event.wait(chunk):
+                break
+        else:
+            time.sleep(chunk)
+        waited += chunk
+        remaining = seconds_until(window)
+    return waited
@@ -1,18 +1,46 @@
 """
 통합 로깅 시스템
 파일과 슬랙, 콘솔에 동시에 로그를 기록하고 전송
+- 호출 스레드는 콘솔 출력 후 큐에 넣기만 함 (파일은 백그라운드 스레드, 슬랙은 SlackNotifier 대기열)
+- 파일 기록 스레드는 파일을 열어 둔 채 쌓인 로그를 한 번에 기록
+- 종료 시(close/atexit) 남은 로그를 모두 기록
+- KST 날짜가 바뀌거나 파일이 max_bytes를 넘으면 새 파일로 교체, 닫힌 파일은 gzip 압축
+  - 여러 프로세스가 같은 날짜 파일에 기록: 열어 둔 파일에는 공유 잠금(flock),
+    다른 프로세스가 파일을 옮기면(inode 변경) 다시 열고, 잠금이 남은 파일(누군가 기록 중)은 압축하지 않음
+- retention_days보다 오래됐거나 전체 용량(max_total_bytes)을 넘는 옛 로그는 삭제
+- 모든 로그를 이벤트 저널(event_journal, SQLite)에도 기록 - 건수 요약/기간·종목별 조회용
 """
 
 import os
+import re
 import sys
+import gzip
+import fcntl
 import json
-from datetime import datetime
+import queue
+import shutil
+import itertools
+from collections import deque
+import atexit
+import threading
+from datetime import datetime, timedelta
 import pytz
-from typing import Optional
+from typing import Optional, List, Tuple, Dict
 from slack_notifier import SlackNotifier
+from event_journal import EventJournal
+
+# (타임스탬프, 레벨, 메시지, 데이터)
+LogRecord = Tuple[str, str, str, Optional[dict]]
+
+LOG_NAME_PATTERN = re.compile(r'^kis_bot_(\d{8})[.]')
 
 class UnifiedLogger:
-    def __init__(self, log_dir: str = "logs", slack_enabled: bool = True):
+    def __init__(self, log_dir: str = "logs", slack_enabled: bool = True,
+                 max_bytes: int = 20 * 1024 * 1024,
+                 retention_days: int = 30,
+                 max_total_bytes: int = 500 * 1024 * 1024,
+                 compress: bool = True,
+                 journal_enabled: bool = True):
         """통합 로거 초기화"""
         # 로그 디렉토리 생성
         self.log_dir = log_dir
@@ -22,10 +50,25 @@ class UnifiedLogger:
         # 한국 시간대
         self.kst = pytz.timezone('Asia/Seoul')
 
-        # 오늘 날짜로 로그 파일 생성
-        today = datetime.now(self.kst).strftime('%Y%m%d')
-        self.log_file = os.path.join(log_dir, f'kis_bot_{today}.log')
-        self.json_log_file = os.path.join(log_dir, f'kis_bot_{today}.json')
+        # 파일 교체/보관 설정
+        self.max_bytes = max_bytes
+        self.retention_days = retention_days
+        self.max_total_bytes = max_total_bytes
+        self.compress = compress
+
+        # 이벤트 저널 (logs/events.db) - 실패해도 파일 로그는 계속 기록
+        self.journal: Optional[EventJournal] = None
+        if journal_enabled:
+            try:
+                self.journal = EventJournal(os.path.join(log_dir, 'events.db'))
+            except Exception as e:
+                print(f"⚠️ 이벤트 저널 초기화 실패: {e}")
+
+        # 오늘 날짜로 로그 파일 생성 (날짜가 바뀌면 기록 스레드가 새 파일로 교체)
+        self._level_counts: Optional[Dict[str, int]] = None
+        self._total_logs = 0
+        self._recent_logs: deque = deque(maxlen=10)
+        self._set_day(datetime.now(self.kst).strftime('%Y%m%d'))
 
         # 슬랙 알림 설정
         self.slack_enabled = slack_enabled
@@ -48,32 +91,281 @@ class UnifiedLogger:
             'SYSTEM': '⚙️'
         }
 
+        # 중요한 레벨만 슬랙에 전송
+        # SYSTEM 레벨 추가 - 봇 시작/종료 알림 받기 위해
+        self.slack_levels = ['SUCCESS', 'WARNING', 'ERROR', 'TRADE', 'MARKET', 'SYSTEM']
+        # 슬랙 대기열이 밀리면 low부터 생략 (매매/오류는 항상 전송)
+        self.slack_priorities = {'ERROR': 'high', 'TRADE': 'high', 'SUCCESS': 'low', 'MARKET': 'low'}
+
+        # 백그라운드 파일 기록 스레드 (슬랙은 SlackNotifier 대기열이 우선순위에 따라 생략/전송)
+        self.batch_size = 256
+        self._file_queue: "queue.Queue[Optional[LogRecord]]" = queue.Queue()
+        self._log_fp = None
+        self._json_fp = None
+        self._file_lock = threading.Lock()
+        self._closed = False
+
+        self._apply_retention()
+
+        self._file_worker = threading.Thread(target=self._file_loop, name="logger-file", daemon=True)
+        self._file_worker.start()
+        atexit.register(self.close)
+
         self.info("통합 로깅 시스템 초기화 완료")
 
     def _get_timestamp(self) -> str:
         """KST 타임스탬프 생성"""
         return datetime.now(self.kst).strftime('[%Y-%m-%d %H:%M:%S KST]')
 
-    def _write_to_file(self, level: str, message: str, data: Optional[dict] = None):
-        """파일에 로그 기록"""
-        timestamp = self._get_timestamp()
+    def _set_day(self, day: str):
+        """기록 대상 날짜 변경"""
+        self._day = day
+        self.log_file = os.path.join(self.log_dir, f'kis_bot_{day}.log')
+        self.json_log_file = os.path.join(self.log_dir, f'kis_bot_{day}.json')
+        self._level_counts = None  # 파일을 열 때 기존 기록으로 초기화
+
+    @staticmethod
+    def _count_levels(json_log_file: str) -> Tuple[Dict[str, int], int]:
+        """JSON 로그의 레벨별 건수 (한 줄씩 읽음 - 재시작 시 당일 파일에 이어 쓸 때 1회)"""
+        level_counts: Dict[str, int] = {}
+        total = 0
+        if os.path.exists(json_log_file):
+            with open(json_log_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    total += 1
+                    try:
+                        level = json.loads(line).get('level', 'UNKNOWN')
+                    except ValueError:
+                        continue
+                    level_counts[level] = level_counts.get(level, 0) + 1
+        return level_counts, total
+
+    def _load_day_state(self):
+        """당일 건수 집계 + 최근 로그 불러오기 (저널이 있으면 저널에서, 없으면 JSON 로그에서)"""
+        self._recent_logs.clear()
+        if self.journal:
+            self._level_counts = self.journal.level_counts(self._day)
+            self._total_logs = sum(self._level_counts.values())
+            for event in self.journal.recent(self._day, self._recent_logs.maxlen):
+                self._recent_logs.append({key: event[key] for key in ('timestamp', 'level', 'message', 'data')})
+            return
+
+        self._level_counts, self._total_logs = self._count_levels(self.json_log_file)
+        if os.path.exists(self.json_log_file):
+            for line in self._read_tail_lines(self.json_log_file, self._recent_logs.maxlen):
+                try:
+                    self._recent_logs.append(json.loads(line))
+                except ValueError:
+                    continue
 
-        # 텍스트 로그 파일
-        with open(self.log_file, 'a', encoding='utf-8') as f:
+    def _open_files(self):
+        """로그 파일 열기 (기록 스레드에서 계속 열어 둠)"""
+        if self._log_fp is None:
+            if self._level_counts is None:
+                self._load_day_state()
+            self._log_fp = self._open_locked(self.log_file)
+            self._json_fp = self._open_locked(self.json_log_file)
+
+    @staticmethod
+    def _open_locked(path: str):
+        """공유 잠금을 건 채로 열기 - 잠금이 걸린 파일은 다른 프로세스가 압축/삭제하지 않음"""
+        while True:
+            fp = open(path, 'a', encoding='utf-8')
+            fcntl.flock(fp.fileno(), fcntl.LOCK_SH)
+            try:
+                if os.stat(path).st_ino == os.fstat(fp.fileno()).st_ino:
+                    return fp
+            except FileNotFoundError:
+                pass
+            # 잠금을 기다리는 사이 다른 프로세스가 옮기거나 압축함 → 새 파일로 다시 열기
+            fp.close()
+
+    def _files_moved(self) -> bool:
+        """열어 둔 파일을 다른 프로세스가 옮겼는지 (경로의 inode와 비교)"""
+        for fp, path in ((self._log_fp, self.log_file), (self._json_fp, self.json_log_file)):
+            if fp is None:
+                continue
+            try:
+                if os.stat(path).st_ino != os.fstat(fp.fileno()).st_ino:
+                    return True
+            except FileNotFoundError:
+                return True
+        return False
+
+    def _close_files(self):
+        for fp in (self._log_fp, self._json_fp):
+            if fp:
+                fp.close()
+        self._log_fp = None
+        self._json_fp = None
+
+    @staticmethod
+    def _record_day(timestamp: str) -> str:
+        """'[2025-01-02 09:00:00 KST]' → '20250102'"""
+        return timestamp[1:11].replace('-', '')
+
+    def _record_epoch(self, timestamp: str) -> float:
+        """'[2025-01-02 09:00:00 KST]' → epoch 초"""
+        return self.kst.localize(datetime.strptime(timestamp, '[%Y-%m-%d %H:%M:%S KST]')).timestamp()
+
+    def _write_to_file(self, records: List[LogRecord]):
+        """파일에 로그 기록 (여러 건을 모아 한 번에 쓰고 flush, 날짜/크기 기준 파일 교체)"""
+        with self._file_lock:
+            for day, group in itertools.groupby(records, key=lambda r: self._record_day(r[0])):
+                if day != self._day:
+                    self._rotate_day(day)
+                elif self._files_moved():
+                    self._close_files()  # 다른 프로세스가 교체함 → 새 당일 파일로 다시 열기
+                self._write_records(list(group))
+                if max(os.fstat(self._log_fp.fileno()).st_size,
+                       os.fstat(self._json_fp.fileno()).st_size) >= self.max_bytes:
+                    self._roll_over()
+
+    def _write_records(self, records: List[LogRecord]):
+        self._open_files()
+        text_lines = []
+        json_lines = []
+        for timestamp, level, message, data in records:
+            # 텍스트 로그 파일
             log_entry = f"{timestamp} [{level}] {message}"
             if data:
-                log_entry += f" | DATA: {json.dumps(data, ensure_ascii=False)}"
-            f.write(log_entry + '\n')
+                log_entry += f" | DATA: {json.dumps(data, ensure_ascii=False, default=str)}"
+            text_lines.append(log_entry + '\n')
 
-        # JSON 로그 파일
-        with open(self.json_log_file, 'a', encoding='utf-8') as f:
+            # JSON 로그 파일
             json_entry = {
                 'timestamp': timestamp,
                 'level': level,
                 'message': message,
                 'data': data
             }
-            f.write(json.dumps(json_entry, ensure_ascii=False) + '\n')
+            json_lines.append(json.dumps(json_entry, ensure_ascii=False, default=str) + '\n')
+
+            self._recent_logs.append(json_entry)
+            self._level_counts[level] = self._level_counts.get(level, 0) + 1
+        self._total_logs += len(records)
+
+        self._log_fp.writelines(text_lines)
+        self._json_fp.writelines(json_lines)
+        self._log_fp.flush()
+        self._json_fp.flush()
+
+        if self.journal:
+            try:
+                self.journal.record_many(
+                    (self._record_epoch(timestamp), level, message, data)
+                    for timestamp, level, message, data in records)
+            except Exception as e:
+                print(f"이벤트 저널 기록 실패: {e}")
+
+    def _rotate_day(self, day: str):
+        """KST 날짜가 바뀌면 새 날짜 파일로 교체"""
+        self._close_files()
+        self._set_day(day)
+        self._finish_closed()
+
+    def _roll_over(self):
+        """당일 파일이 max_bytes를 넘으면 kis_bot_YYYYMMDD.N.log/json으로 옮기고 새 파일 시작
+        - 교체는 프로세스 간 잠금(.rotate.lock) 안에서 한 번만 - 다른 프로세스가 먼저 옮겼으면 다시 열기만 함
+        - 다른 프로세스는 다음 기록 때 inode 변경을 보고 새 파일을 열고, 그 전까지 쓴 내용은 옮겨진 파일에 남음
+        """
+        with open(os.path.join(self.log_dir, '.rotate.lock'), 'a') as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            if not self._files_moved():
+                index = 1
+                while any(os.path.exists(os.path.join(self.log_dir, f'kis_bot_{self._day}.{index}.{ext}'))
+                          for ext in ('log', 'json', 'log.gz', 'json.gz')):
+                    index += 1
+                for path, ext in ((self.log_file, 'log'), (self.json_log_file, 'json')):
+                    os.replace(path, os.path.join(self.log_dir, f'kis_bot_{self._day}.{index}.{ext}'))
+            self._close_files()
+        self._open_files()
+        self._finish_closed()
+
+    def _finish_closed(self):
+        """닫힌 파일 압축 후 보관 정책 적용 (다른 프로세스가 아직 열어 둔 파일은 다음 교체 때 압축)"""
+        if self.compress:
+            active = {os.path.basename(self.log_file), os.path.basename(self.json_log_file)}
+            for name in sorted(os.listdir(self.log_dir)):
+                if LOG_NAME_PATTERN.match(name) and name.endswith(('.log', '.json')) and name not in active:
+                    self._compress(os.path.join(self.log_dir, name))
+        self._apply_retention()
+
+    @staticmethod
+    def _compress(path: str):
+        """gzip 압축 후 원본 삭제 - 배타 잠금을 못 잡으면(다른 프로세스가 기록 중) 건너뜀"""
+        try:
+            with open(path, 'rb') as src:
+                try:
+                    fcntl.flock(src.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return
+                # 같은 이름의 .gz가 이미 있으면 뒤에 이어 붙임 (gzip은 이어 붙인 멤버를 한 파일로 읽음)
+                with gzip.open(f"{path}.gz", 'ab') as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"로그 압축 실패 ({path}): {e}")
+
+    def _apply_retention(self):
+        """오래된 로그 삭제 (보관 일수 초과 → 전체 용량 초과 시 오래된 순)"""
+        active = {os.path.basename(self.log_file), os.path.basename(self.json_log_file)}
+        cutoff = (datetime.now(self.kst) - timedelta(days=self.retention_days)).strftime('%Y%m%d')
+
+        files = []
+        for name in os.listdir(self.log_dir):
+            match = LOG_NAME_PATTERN.match(name)
+            if not match or name in active:
+                continue
+            path = os.path.join(self.log_dir, name)
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            if match.group(1) < cutoff:
+                self._remove_log(path)
+            else:
+                files.append((match.group(1), name, path, size))
+
+        total = sum(f[3] for f in files)
+        for _, _, path, size in sorted(files):
+            if total <= self.max_total_bytes:
+                break
+            self._remove_log(path)
+            total -= size
+
+    @staticmethod
+    def _remove_log(path: str):
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"로그 삭제 실패 ({path}): {e}")
+
+    def _file_loop(self):
+        """파일 기록 스레드 - 큐에 쌓인 로그를 batch_size개까지 모아 기록"""
+        while True:
+            record = self._file_queue.get()
+            records = [record]
+            while len(records) < self.batch_size:
+                try:
+                    records.append(self._file_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in records
+            records = [r for r in records if r is not None]
+            try:
+                if records:
+                    self._write_to_file(records)
+            except Exception as e:
+                print(f"로그 파일 기록 실패: {e}")
+            finally:
+                for _ in range(len(records) + (1 if stop else 0)):
+                    self._file_queue.task_done()
+            if stop:
+                return
 
     def _send_to_slack(self, level: str, message: str, data: Optional[dict] = None):
         """슬랙에 중요 로그 전송"""
@@ -81,9 +373,7 @@ class UnifiedLogger:
             return
 
         # 중요한 레벨만 슬랙에 전송
-        # SYSTEM 레벨 추가 - 봇 시작/종료 알림 받기 위해
-        important_levels = ['SUCCESS', 'WARNING', 'ERROR', 'TRADE', 'MARKET', 'SYSTEM']
-        if level not in important_levels:
+        if level not in self.slack_levels:
             return
 
         try:
@@ -98,7 +388,8 @@ class UnifiedLogger:
                 title=f"{level} Alert",
                 message=message,
                 color="danger" if level == "ERROR" else "warning" if level == "WARNING" else "good",
-                fields=[{"title": "Data", "value": json.dumps(data, ensure_ascii=False), "short": False}] if data else None
+                fields=[{"title": "Data", "value": json.dumps(data, ensure_ascii=False), "short": False}] if data else None,
+                priority=self.slack_priorities.get(level, "normal")
             )
         except Exception as e:
             print(f"슬랙 전송 실패: {e}")
@@ -115,15 +406,54 @@ class UnifiedLogger:
         print(console_msg)
 
     def log(self, level: str, message: str, data: Optional[dict] = None):
-        """통합 로그 기록"""
-        # 콘솔 출력
+        """통합 로그 기록 - 콘솔 출력 후 파일/슬랙은 큐에 넣고 바로 반환"""
+        # 콘솔 출력 (일반 print 출력과 순서가 섞이지 않도록 호출 스레드에서)
         self._print_to_console(level, message, data)
 
+        # 호출 쪽에서 dict를 이후에 바꿔도 기록 내용이 변하지 않도록 복사
+        record = (self._get_timestamp(), level, message, dict(data) if data else data)
+
+        if self._closed:
+            # 종료 후 로그는 바로 기록
+            self._write_to_file([record])
+            return
+
         # 파일 기록
-        self._write_to_file(level, message, data)
+        self._file_queue.put(record)
+
+        # 슬랙 전송 (SlackNotifier 대기열에 넣고 바로 반환 - 밀리면 low부터 생략, 매매/오류는 항상 전송)
+        if level in self.slack_levels:
+            self._send_to_slack(level, message, record[3])
 
-        # 슬랙 전송
-        self._send_to_slack(level, message, data)
+    def flush(self):
+        """대기 중인 파일 기록이 끝날 때까지 대기"""
+        if not self._closed:
+            self._file_queue.join()
+
+    def close(self, timeout: float = 10):
+        """기록 스레드 종료 - 남은 로그를 모두 기록하고 파일 닫기"""
+        if self._closed:
+            return
+        self._closed = True
+        self._file_queue.put(None)
+        self._file_worker.join(timeout)
+
+        # 종료 신호 직전에 들어온 로그까지 기록
+        leftover = []
+        while True:
+            try:
+                record = self._file_queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is not None:
+                leftover.append(record)
+        if leftover:
+            self._write_to_file(leftover)
+
+        if self.slack_enabled and self.slack:
+            self.slack.close(timeout)
+        with self._file_lock:
+            self._close_files()
 
     # 편의 메서드들
     def debug(self, message: str, data: Optional[dict] = None):
@@ -154,29 +484,46 @@ class UnifiedLogger:
         """현재 로그 파일 경로 반환"""
         return self.log_file
 
+    @staticmethod
+    def _read_tail_lines(path: str, count: int, block_size: int = 8192) -> List[str]:
+        """파일 끝에서부터 읽어 마지막 count줄 반환 (파일 전체를 읽지 않음)"""
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b''
+            while position > 0 and data.count(b'\n') <= count:
+                read_size = min(block_size, position)
+                position -= read_size
+                f.seek(position)
+                data = f.read(read_size) + data
+        lines = data.decode('utf-8', errors='replace').splitlines()
+        return lines[-count:]
+
     def get_logs_summary(self) -> dict:
-        """로그 요약 정보 반환"""
+        """로그 요약 정보 반환
+        - 저널이 있으면 조회 시점에 저널에서 (일자별 집계 + 인덱스 조회, 다른 프로세스가 기록한 로그 포함)
+        - 저널이 없으면 기록하면서 유지한 이 프로세스의 건수/최근 로그 (파일 전체를 다시 읽지 않음)
+        """
+        self.flush()
         try:
-            with open(self.json_log_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-
-            level_counts = {}
-            recent_logs = []
-
-            for line in lines:
-                try:
-                    entry = json.loads(line.strip())
-                    level = entry.get('level', 'UNKNOWN')
-                    level_counts[level] = level_counts.get(level, 0) + 1
-                    recent_logs.append(entry)
-                except:
-                    continue
-
-            return {
-                'total_logs': len(lines),
-                'level_counts': level_counts,
-                'recent_logs': recent_logs[-10:],  # 최근 10개
-                'log_file': self.log_file
-            }
+            if self.journal:
+                day = self._day
+                level_counts = self.journal.level_counts(day)
+                return {
+                    'total_logs': sum(level_counts.values()),
+                    'level_counts': level_counts,
+                    'recent_logs': [{key: event[key] for key in ('timestamp', 'level', 'message', 'data')}
+                                    for event in self.journal.recent(day, self._recent_logs.maxlen)],  # 최근 10개
+                    'log_file': self.log_file
+                }
+            with self._file_lock:
+                if self._level_counts is None:
+                    self._load_day_state()
+                return {
+                    'total_logs': self._total_logs,
+                    'level_counts': dict(self._level_counts),
+                    'recent_logs': list(self._recent_logs),  # 최근 10개
+                    'log_file': self.log_file
+                }
         except Exception as e:
-            return {'error': str(e)}
\ No newline at end of file
+            return {'error': str(e)}
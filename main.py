@@ -6,10 +6,10 @@ KIS 자동매매 봇 - 완전체 버전
 
 import os
 import time
-import requests
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import pytz
 from dotenv import load_dotenv
 from typing import Optional, List, Dict, Tuple
@@ -20,6 +20,14 @@ from firebase_admin import credentials, firestore
 from token_manager import TokenManager
 from logger_system import UnifiedLogger
 from stock_master import StockMaster
+from kis_http import KISHttpSession
+from rate_limiter import get_rate_limiter
+from candle_store import get_candle_store
+from firestore_sync import FirestoreDiffSync
+from market_data_service import get_market_data_client
+from quote_table import get_quote_table
+from krx_calendar import sleep_until, seconds_until_close
+import batch_indicators
 
 load_dotenv()
 
@@ -27,13 +35,24 @@ load_dotenv()
 class KISApiClient:
     """KIS API 호출 담당 (Model) - 일봉 데이터 조회 추가"""
 
-    def __init__(self, token_manager: TokenManager, account_no: str):
+    def __init__(self, token_manager: TokenManager, account_no: str, market_data=None):
         self.token_manager = token_manager
         self.account_no = account_no
         self.app_key = os.getenv('KIS_APP_KEY')
         self.app_secret = os.getenv('KIS_APP_SECRET')
         self.base_url = "https://openapivts.koreainvestment.com:29443"
 
+        # 공유 HTTP 세션 (커넥션 풀 + keep-alive, 엔드포인트별 타임아웃)
+        # TR-ID 종류별 토큰 버킷으로 호출 속도 제어 - 호출부에서 sleep 불필요
+        self.rate_limiter = get_rate_limiter(self.base_url)
+        self.http = KISHttpSession(self.base_url, rate_limiter=self.rate_limiter)
+
+        # 일봉 로컬 저장소 - 지난 봉은 디스크에서, 빠진 구간만 API 조회
+        self.candle_store = get_candle_store()
+
+        # 시세 공유 서비스 구독자 (market_data_service) - 받은 시세가 있으면 API 호출 생략
+        self.market_data = market_data
+
     def _get_headers(self, tr_id: str) -> Dict:
         """API 호출용 헤더 생성"""
         token = self.token_manager.get_token()
@@ -48,16 +67,10 @@ class KISApiClient:
             "custtype": "P"
         }
 
-    def get_daily_price_history(self, stock_code: str, days: int = 30) -> Optional[pd.DataFrame]:
-        """일봉 데이터 조회 (RSI/MACD 계산용) - 에러 상세 출력 추가"""
-        url = f"{self.base_url}/uapi/domestic-stock/v1/quotations/inquire-daily-itemchartprice"
-        headers = self._get_headers("FHKST03010100")
-
-        # 날짜 범위 설정
-        end_date = datetime.now().strftime("%Y%m%d")
-        start_date = (datetime.now() - timedelta(days=days)).strftime("%Y%m%d")
-
-        params = {
+    @staticmethod
+    def _daily_range_params(stock_code: str, start_date: str, end_date: str) -> Dict:
+        """일봉 조회 파라미터 (YYYYMMDD 구간)"""
+        return {
             "FID_COND_MRKT_DIV_CODE": "J",
             "FID_INPUT_ISCD": stock_code,
             "FID_INPUT_DATE_1": start_date,
@@ -66,20 +79,122 @@ class KISApiClient:
             "FID_ORG_ADJ_PRC": "0"
         }
 
+    @staticmethod
+    def _parse_daily_history(data: Dict) -> pd.DataFrame:
+        """일봉 응답(output2) → DataFrame 변환 (빈 행 제외, 데이터가 없으면 빈 DataFrame)"""
+        rows = [row for row in data.get('output2') or [] if row.get('stck_bsop_date')]
+        if not rows:
+            return pd.DataFrame(columns=['date', 'close', 'high', 'low', 'volume'])
+        df = pd.DataFrame(rows)
+        df['date'] = pd.to_datetime(df['stck_bsop_date'])
+        df['close'] = df['stck_clpr'].astype(float)
+        df['high'] = df['stck_hgpr'].astype(float)
+        df['low'] = df['stck_lwpr'].astype(float)
+        df['volume'] = df['acml_vol'].astype(float)
+        df = df.sort_values('date')
+        return df[['date', 'close', 'high', 'low', 'volume']]
+
+    @staticmethod
+    def _parse_stock_price(stock_code: str, output: Dict) -> Dict:
+        """현재가 응답(output) → 시세 dict 변환"""
+        return {
+            'code': stock_code,
+            'name': output.get('hts_kor_isnm', stock_code),
+            'current_price': float(output.get('stck_prpr', 0)),
+            'change_rate': float(output.get('prdy_ctrt', 0)),
+            'volume': int(output.get('acml_vol', 0)),
+            'high_price': float(output.get('stck_hgpr', 0)),
+            'low_price': float(output.get('stck_lwpr', 0))
+        }
+
+    @staticmethod
+    def _ranking_params(screen_code: str) -> Dict:
+        """순위 조회 파라미터 (20171: 거래량, 20172: 등락률)"""
+        return {
+            "FID_COND_MRKT_DIV_CODE": "J",
+            "FID_COND_SCR_DIV_CODE": screen_code,
+            "FID_INPUT_ISCD": "0000",
+            "FID_DIV_CLS_CODE": "0",
+            "FID_BLNG_CLS_CODE": "0",
+            "FID_TRGT_CLS_CODE": "111111111",
+            "FID_TRGT_EXLS_CLS_CODE": "0000000000",
+            "FID_INPUT_PRICE_1": "",
+            "FID_INPUT_PRICE_2": "",
+            "FID_VOL_CNT": ""
+        }
+
+    def _balance_params(self) -> Dict:
+        """잔고 조회 파라미터"""
+        return {
+            "CANO": self.account_no.split('-')[0],
+            "ACNT_PRDT_CD": self.account_no.split('-')[1],
+            "AFHR_FLPR_YN": "N",
+            "OFL_YN": "N",
+            "INQR_DVSN": "02",
+            "UNPR_DVSN": "01",
+            "FUND_STTL_ICLD_YN": "N",
+            "FNCG_AMT_AUTO_RDPT_YN": "N",
+            "PRCS_DVSN": "00",
+            "CTX_AREA_FK100": "",
+            "CTX_AREA_NK100": ""
+        }
+
+    @staticmethod
+    def _parse_portfolio(data: Dict) -> Tuple[List[Dict], float, float]:
+        """잔고 응답 → (보유종목, 현금, 총자산) 변환"""
+        holdings = []
+        for item in data.get('output1', []):
+            if int(float(item.get('hldg_qty', 0))) > 0:
+                holdings.append({
+                    'stock_code': item.get('pdno'),
+                    'stock_name': item.get('prdt_name'),
+                    'quantity': int(float(item.get('hldg_qty', 0))),
+                    'buy_price': float(item.get('pchs_avg_pric', 0)),
+                    'current_price': float(item.get('prpr', 0)),
+                    'profit_loss': float(item.get('evlu_pfls_amt', 0)),
+                    'profit_rate': float(item.get('evlu_pfls_rt', 0)),
+                    'as_of': time.time()  # 잔고 조회 시각 (더 최신 시세로 갱신할 때 비교)
+                })
+
+        # 계좌 정보 추출
+        output2 = data.get('output2', [{}])[0]
+        cash = float(output2.get('dnca_tot_amt', 0))
+        total_assets = float(output2.get('tot_evlu_amt', 0))
+
+        return holdings, cash, total_assets
+
+    def _order_body(self, stock_code: str, quantity: int) -> Dict:
+        """시장가 주문 바디"""
+        return {
+            "CANO": self.account_no.split('-')[0],
+            "ACNT_PRDT_CD": self.account_no.split('-')[1],
+            "PDNO": stock_code,
+            "ORD_DVSN": "01",  # 시장가
+            "ORD_QTY": str(quantity),
+            "ORD_UNPR": "0"
+        }
+
+    def get_daily_price_history(self, stock_code: str, days: int = 30,
+                                live_quote: Optional[Dict] = None) -> Optional[pd.DataFrame]:
+        """일봉 데이터 조회 (RSI/MACD 계산용) - 로컬 저장소에 없는 최근 구간만 API 조회
+
+        장중에는 live_quote(get_stock_price 결과 등 current_price 포함 dict)로 당일 봉을 만들어 붙이고,
+        없으면 당일분만 조회한다.
+        """
+        return self.candle_store.get_history(stock_code, days, self._fetch_daily_range, live_quote)
+
+    def _fetch_daily_range(self, stock_code: str, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
+        """일봉 구간 조회 (YYYYMMDD) - 에러 상세 출력 추가"""
+        url = f"{self.base_url}/uapi/domestic-stock/v1/quotations/inquire-daily-itemchartprice"
+        headers = self._get_headers("FHKST03010100")
+        params = self._daily_range_params(stock_code, start_date, end_date)
+
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=5)
+            response = self.http.get(url, headers=headers, params=params)
             if response.status_code == 200:
                 data = response.json()
-                if data.get('rt_cd') == '0' and data.get('output2'):
-                    # DataFrame 변환
-                    df = pd.DataFrame(data['output2'])
-                    df['date'] = pd.to_datetime(df['stck_bsop_date'])
-                    df['close'] = df['stck_clpr'].astype(float)
-                    df['high'] = df['stck_hgpr'].astype(float)
-                    df['low'] = df['stck_lwpr'].astype(float)
-                    df['volume'] = df['acml_vol'].astype(float)
-                    df = df.sort_values('date')
-                    return df[['date', 'close', 'high', 'low', 'volume']]
+                if data.get('rt_cd') == '0':
+                    return self._parse_daily_history(data)
                 else:
                     # API 에러 코드 상세 출력
                     print(f"❌ 일봉 API 에러 [{stock_code}]: {data.get('msg1', 'Unknown error')}")
@@ -90,7 +205,12 @@ class KISApiClient:
         return None
 
     def get_stock_price(self, stock_code: str) -> Optional[Dict]:
-        """개별 종목 현재가 조회"""
+        """개별 종목 현재가 조회 (시세 공유 서비스에 최신 시세가 있으면 그대로 사용)"""
+        if self.market_data is not None:
+            quote = self.market_data.get_quote(stock_code)
+            if quote is not None:
+                return quote
+
         url = f"{self.base_url}/uapi/domestic-stock/v1/quotations/inquire-price"
         headers = self._get_headers("FHKST01010100")
         params = {
@@ -100,18 +220,11 @@ class KISApiClient:
 
         for attempt in range(3):
             try:
-                response = requests.get(url, headers=headers, params=params, timeout=5)
+                response = self.http.get(url, headers=headers, params=params)
                 if response.status_code == 200:
                     data = response.json()
                     if data.get('rt_cd') == '0':
-                        output = data.get('output', {})
-                        return {
-                            'code': stock_code,
-                            'name': output.get('hts_kor_isnm', stock_code),
-                            'current_price': float(output.get('stck_prpr', 0)),
-                            'change_rate': float(output.get('prdy_ctrt', 0)),
-                            'volume': int(output.get('acml_vol', 0))
-                        }
+                        return self._parse_stock_price(stock_code, data.get('output', {}))
                 elif response.status_code == 500:
                     time.sleep(2 ** attempt)
                     continue
@@ -121,26 +234,22 @@ class KISApiClient:
                 time.sleep(1)
         return None
 
+    def get_stock_prices(self, stock_codes: List[str], max_workers: int = 8) -> List[Optional[Dict]]:
+        """여러 종목 현재가 병렬 조회 (입력 순서대로 반환, 호출 속도는 rate_limiter가 제한)"""
+        if not stock_codes:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(stock_codes))) as executor:
+            return list(executor.map(self.get_stock_price, stock_codes))
+
     def get_volume_ranking(self) -> List[Dict]:
         """거래량 상위 종목 조회 (확장: 30개)"""
         url = f"{self.base_url}/uapi/domestic-stock/v1/quotations/volume-rank"
         headers = self._get_headers("FHPST01710000")
-        params = {
-            "FID_COND_MRKT_DIV_CODE": "J",
-            "FID_COND_SCR_DIV_CODE": "20171",
-            "FID_INPUT_ISCD": "0000",
-            "FID_DIV_CLS_CODE": "0",
-            "FID_BLNG_CLS_CODE": "0",
-            "FID_TRGT_CLS_CODE": "111111111",
-            "FID_TRGT_EXLS_CLS_CODE": "0000000000",
-            "FID_INPUT_PRICE_1": "",
-            "FID_INPUT_PRICE_2": "",
-            "FID_VOL_CNT": ""
-        }
+        params = self._ranking_params("20171")
 
         for attempt in range(3):
             try:
-                response = requests.get(url, headers=headers, params=params, timeout=10)
+                response = self.http.get(url, headers=headers, params=params)
                 if response.status_code == 200:
                     data = response.json()
                     if data.get('rt_cd') == '0':
@@ -158,22 +267,11 @@ class KISApiClient:
         """등락률 상위 종목 조회 (신규)"""
         url = f"{self.base_url}/uapi/domestic-stock/v1/quotations/volume-rank"
         headers = self._get_headers("FHPST01710000")
-        params = {
-            "FID_COND_MRKT_DIV_CODE": "J",
-            "FID_COND_SCR_DIV_CODE": "20172",  # 등락률 순위
-            "FID_INPUT_ISCD": "0000",
-            "FID_DIV_CLS_CODE": "0",
-            "FID_BLNG_CLS_CODE": "0",
-            "FID_TRGT_CLS_CODE": "111111111",
-            "FID_TRGT_EXLS_CLS_CODE": "0000000000",
-            "FID_INPUT_PRICE_1": "",
-            "FID_INPUT_PRICE_2": "",
-            "FID_VOL_CNT": ""
-        }
+        params = self._ranking_params("20172")  # 등락률 순위
 
         for attempt in range(3):
             try:
-                response = requests.get(url, headers=headers, params=params, timeout=10)
+                response = self.http.get(url, headers=headers, params=params)
                 if response.status_code == 200:
                     data = response.json()
                     if data.get('rt_cd') == '0':
@@ -191,44 +289,14 @@ class KISApiClient:
         """포트폴리오 및 계좌 정보 조회"""
         url = f"{self.base_url}/uapi/domestic-stock/v1/trading/inquire-balance"
         headers = self._get_headers("VTTC8434R")
-        params = {
-            "CANO": self.account_no.split('-')[0],
-            "ACNT_PRDT_CD": self.account_no.split('-')[1],
-            "AFHR_FLPR_YN": "N",
-            "OFL_YN": "N",
-            "INQR_DVSN": "02",
-            "UNPR_DVSN": "01",
-            "FUND_STTL_ICLD_YN": "N",
-            "FNCG_AMT_AUTO_RDPT_YN": "N",
-            "PRCS_DVSN": "00",
-            "CTX_AREA_FK100": "",
-            "CTX_AREA_NK100": ""
-        }
+        params = self._balance_params()
 
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
+            response = self.http.get(url, headers=headers, params=params)
             if response.status_code == 200:
                 data = response.json()
                 if data.get('rt_cd') == '0':
-                    holdings = []
-                    for item in data.get('output1', []):
-                        if int(float(item.get('hldg_qty', 0))) > 0:
-                            holdings.append({
-                                'stock_code': item.get('pdno'),
-                                'stock_name': item.get('prdt_name'),
-                                'quantity': int(float(item.get('hldg_qty', 0))),
-                                'buy_price': float(item.get('pchs_avg_pric', 0)),
-                                'current_price': float(item.get('prpr', 0)),
-                                'profit_loss': float(item.get('evlu_pfls_amt', 0)),
-                                'profit_rate': float(item.get('evlu_pfls_rt', 0))
-                            })
-
-                    # 계좌 정보 추출
-                    output2 = data.get('output2', [{}])[0]
-                    cash = float(output2.get('dnca_tot_amt', 0))
-                    total_assets = float(output2.get('tot_evlu_amt', 0))
-
-                    return holdings, cash, total_assets
+                    return self._parse_portfolio(data)
         except Exception as e:
             print(f"❌ 포트폴리오 조회 실패: {e}")
         return [], 0, 0
@@ -238,18 +306,10 @@ class KISApiClient:
         url = f"{self.base_url}/uapi/domestic-stock/v1/trading/order-cash"
         headers = self._get_headers("VTTC0802U")
         headers["content-type"] = "application/json; charset=utf-8"
-
-        body = {
-            "CANO": self.account_no.split('-')[0],
-            "ACNT_PRDT_CD": self.account_no.split('-')[1],
-            "PDNO": stock_code,
-            "ORD_DVSN": "01",  # 시장가
-            "ORD_QTY": str(quantity),
-            "ORD_UNPR": "0"
-        }
+        body = self._order_body(stock_code, quantity)
 
         try:
-            response = requests.post(url, headers=headers, json=body, timeout=10)
+            response = self.http.post(url, headers=headers, json=body)
             if response.status_code == 200:
                 data = response.json()
                 return data.get('rt_cd') == '0'
@@ -262,18 +322,10 @@ class KISApiClient:
         url = f"{self.base_url}/uapi/domestic-stock/v1/trading/order-cash"
         headers = self._get_headers("VTTC0801U")
         headers["content-type"] = "application/json; charset=utf-8"
-
-        body = {
-            "CANO": self.account_no.split('-')[0],
-            "ACNT_PRDT_CD": self.account_no.split('-')[1],
-            "PDNO": stock_code,
-            "ORD_DVSN": "01",  # 시장가
-            "ORD_QTY": str(quantity),
-            "ORD_UNPR": "0"
-        }
+        body = self._order_body(stock_code, quantity)
 
         try:
-            response = requests.post(url, headers=headers, json=body, timeout=10)
+            response = self.http.post(url, headers=headers, json=body)
             if response.status_code == 200:
                 data = response.json()
                 return data.get('rt_cd') == '0'
@@ -350,21 +402,16 @@ class TechnicalAnalyzer:
         if df is None or len(df) < period + 1:
             return 50.0
 
-        typical_price = (df['high'] + df['low'] + df['close']) / 3
-        money_flow = typical_price * df['volume']
-
-        # 상승/하락 판단
-        positive_flow = pd.Series(0, index=df.index)
-        negative_flow = pd.Series(0, index=df.index)
+        typical_price = ((df['high'] + df['low'] + df['close']) / 3).to_numpy(dtype=float)
+        money_flow = typical_price * df['volume'].to_numpy(dtype=float)
 
-        for i in range(1, len(df)):
-            if typical_price.iloc[i] > typical_price.iloc[i-1]:
-                positive_flow.iloc[i] = money_flow.iloc[i]
-            elif typical_price.iloc[i] < typical_price.iloc[i-1]:
-                negative_flow.iloc[i] = money_flow.iloc[i]
+        # 상승/하락 판단 (전일 대비 typical price 변화 부호로 마스킹, 첫 봉은 비교 대상 없음)
+        tp_change = np.diff(typical_price, prepend=np.nan)
+        positive_flow = np.where(tp_change > 0, money_flow, 0.0)
+        negative_flow = np.where(tp_change < 0, money_flow, 0.0)
 
-        positive_mf = positive_flow.rolling(window=period).sum()
-        negative_mf = negative_flow.rolling(window=period).sum()
+        positive_mf = pd.Series(positive_flow).rolling(window=period).sum()
+        negative_mf = pd.Series(negative_flow).rolling(window=period).sum()
 
         mfi_ratio = positive_mf / negative_mf
         mfi = 100 - (100 / (1 + mfi_ratio))
@@ -386,6 +433,10 @@ class TradingEngine:
             firebase_admin.initialize_app(cred)
         self.db = firestore.client()
 
+        # 포트폴리오/감시종목 차분 동기화 (바뀐 필드만 기록, 사라진 종목만 삭제)
+        self.portfolio_sync = FirestoreDiffSync(self.db, 'portfolio')
+        self.watchlist_sync = FirestoreDiffSync(self.db, 'watchlist')
+
         # 계좌 정보
         account_no = os.getenv('KIS_ACCOUNT_NUMBER')
         if '-' not in account_no:
@@ -396,10 +447,15 @@ class TradingEngine:
         app_secret = os.getenv('KIS_APP_SECRET')
 
         self.token_manager = TokenManager(app_key, app_secret)
-        self.api_client = KISApiClient(self.token_manager, account_no)
+        self.api_client = KISApiClient(self.token_manager, account_no, market_data=get_market_data_client())
+        self.quote_table = get_quote_table()  # 매도 조건 체크 시 최신 시세 (시세 공유 서비스가 기록)
+        self.quote_max_age = 30
         self.analyzer = TechnicalAnalyzer()
         self.stock_master = StockMaster()  # 종목명 마스터 추가
 
+        # 후보 현재가 병렬 조회 워커 수
+        self.price_workers = 8
+
         # 트레이딩 설정
         self.buy_amount = 500000  # 종목당 50만원
         self.stop_loss_rate = -3.0  # 손절 -3%
@@ -410,19 +466,10 @@ class TradingEngine:
         self.rsi_overbought = 70  # 과매수
 
     def sync_portfolio_to_firebase(self, portfolio: List[Dict]):
-        """포트폴리오를 Firebase에 동기화"""
+        """포트폴리오를 Firebase에 동기화 (변경분만 기록)"""
         try:
-            batch = self.db.batch()
-
-            # 기존 포트폴리오 삭제
-            existing_docs = self.db.collection('portfolio').stream()
-            for doc in existing_docs:
-                batch.delete(doc.reference)
-
-            # 새 포트폴리오 추가
-            for item in portfolio:
-                doc_ref = self.db.collection('portfolio').document(item['stock_code'])
-                data = {
+            docs = {
+                item['stock_code']: {
                     'code': item['stock_code'],
                     'name': item['stock_name'],
                     'quantity': item['quantity'],
@@ -430,18 +477,18 @@ class TradingEngine:
                     'current_price': item['current_price'],
                     'profit_rate': item['profit_rate'],
                     'profit_amount': item.get('profit_loss', 0),
-                    'total_value': item['current_price'] * item['quantity'],
-                    'last_updated': firestore.SERVER_TIMESTAMP
+                    'total_value': item['current_price'] * item['quantity']
                 }
-                batch.set(doc_ref, data)
+                for item in portfolio
+            }
 
-            batch.commit()
-            print("✅ 포트폴리오 Firebase 동기화 완료")
+            counts = self.portfolio_sync.sync(docs, touch={'last_updated': firestore.SERVER_TIMESTAMP})
+            print(f"✅ 포트폴리오 Firebase 동기화 완료 {self._format_sync_counts(counts)}")
         except Exception as e:
             print(f"⚠️ Firebase 포트폴리오 동기화 실패: {e}")
 
     def sync_watchlist_to_firebase(self, watchlist: List[Dict]):
-        """감시종목을 Firebase에 동기화 (RSI/MFI 포함)"""
+        """감시종목을 Firebase에 동기화 (RSI/MFI 포함, 변경분만 기록)"""
         try:
             # market_scan/latest 업데이트
             doc_ref = self.db.collection('market_scan').document('latest')
@@ -452,24 +499,18 @@ class TradingEngine:
             })
 
             # watchlist 컬렉션 업데이트
-            batch = self.db.batch()
-
-            existing_docs = self.db.collection('watchlist').stream()
-            for doc in existing_docs:
-                batch.delete(doc.reference)
-
-            for item in watchlist:
-                doc_ref = self.db.collection('watchlist').document(item['code'])
-                batch.set(doc_ref, {
-                    **item,
-                    'last_updated': firestore.SERVER_TIMESTAMP
-                })
-
-            batch.commit()
-            print(f"✅ 감시종목 {len(watchlist)}개 Firebase 동기화 완료 (RSI 포함)")
+            docs = {item['code']: item for item in watchlist}
+            counts = self.watchlist_sync.sync(docs, touch={'last_updated': firestore.SERVER_TIMESTAMP})
+            print(f"✅ 감시종목 {len(watchlist)}개 Firebase 동기화 완료 (RSI 포함) {self._format_sync_counts(counts)}")
         except Exception as e:
             print(f"⚠️ Firebase 감시종목 동기화 실패: {e}")
 
+    @staticmethod
+    def _format_sync_counts(counts: Dict[str, int]) -> str:
+        """차분 동기화 결과 요약 문자열"""
+        return (f"(쓰기 {counts['writes']}건: 추가 {counts['created']}, 수정 {counts['updated']}, "
+                f"삭제 {counts['deleted']}, 유지 {counts['unchanged']})")
+
     def sync_account_to_firebase(self, cash_balance: float, total_assets: float):
         """계좌 정보를 Firebase에 동기화"""
         try:
@@ -486,13 +527,27 @@ class TradingEngine:
     def analyze_stock_with_indicators(self, stock_code: str, stock_info: Dict) -> Dict:
         """종목에 대한 기술적 지표 계산"""
         # 일봉 데이터 조회
-        df = self.api_client.get_daily_price_history(stock_code)
+        df = self.api_client.get_daily_price_history(stock_code, live_quote=stock_info)
 
         # 기술적 지표 계산
-        rsi = self.analyzer.calculate_rsi(df)
-        mfi = self.analyzer.calculate_mfi(df)
         macd = self.analyzer.calculate_macd(df)
         bollinger = self.analyzer.calculate_bollinger_bands(df)
+        indicators = {
+            'rsi': self.analyzer.calculate_rsi(df),
+            'mfi': self.analyzer.calculate_mfi(df),
+            'macd': macd['macd'],
+            'macd_signal': macd['signal'],
+            'macd_histogram': macd['histogram'],
+            'bollinger_upper': bollinger['upper'],
+            'bollinger_middle': bollinger['middle'],
+            'bollinger_lower': bollinger['lower']
+        }
+
+        return self.evaluate_buy_signal(stock_info, indicators)
+
+    def evaluate_buy_signal(self, stock_info: Dict, indicators: Dict) -> Dict:
+        """계산된 지표로 매수 신호 판단 (단일 종목/일괄 계산 공용)"""
+        rsi = indicators['rsi']
 
         # 매수 신호 판단
         buy_signal = False
@@ -504,12 +559,12 @@ class TradingEngine:
             signal_reasons.append(f"RSI 과매도({rsi:.1f})")
 
         # MACD 골든크로스
-        if macd['histogram'] > 0 and macd['macd'] > macd['signal']:
+        if indicators['macd_histogram'] > 0 and indicators['macd'] > indicators['macd_signal']:
             buy_signal = True
             signal_reasons.append("MACD 골든크로스")
 
         # 볼린저 밴드 하단 돌파
-        if stock_info['current_price'] < bollinger['lower']:
+        if stock_info['current_price'] < indicators['bollinger_lower']:
             buy_signal = True
             signal_reasons.append("볼린저 하단 돌파")
 
@@ -521,14 +576,7 @@ class TradingEngine:
 
         return {
             **stock_info,
-            'rsi': rsi,
-            'mfi': mfi,
-            'macd': macd['macd'],
-            'macd_signal': macd['signal'],
-            'macd_histogram': macd['histogram'],
-            'bollinger_upper': bollinger['upper'],
-            'bollinger_middle': bollinger['middle'],
-            'bollinger_lower': bollinger['lower'],
+            **indicators,
             'buy_signal': buy_signal,
             'signal_reasons': ', '.join(signal_reasons) if signal_reasons else '없음'
         }
@@ -574,9 +622,10 @@ class TradingEngine:
         print("  🔨 2단계: 기본 필터링 (가격/거래량)")
         filtered_candidates = []
 
-        for code, info in candidates.items():
-            # 현재가 조회
-            price_data = self.api_client.get_stock_price(code)
+        # 현재가 병렬 조회 (후보 순서 유지)
+        price_results = self.api_client.get_stock_prices(list(candidates.keys()), self.price_workers)
+
+        for (code, info), price_data in zip(candidates.items(), price_results):
             if not price_data:
                 continue
 
@@ -594,21 +643,24 @@ class TradingEngine:
                 **price_data
             })
 
-            # API 부하 방지
-            time.sleep(0.1)
-
         print(f"  ✅ 2차 필터 통과: {len(filtered_candidates)}개 종목")
 
         # 3단계: 기술적 지표 분석 (RSI/MACD 등)
         print("  📈 3단계: 기술적 지표 분석 (RSI/MACD/MFI)")
         opportunities = []
 
-        # 최대 20개 종목만 상세 분석 (API 부하 고려)
-        for i, candidate in enumerate(filtered_candidates[:20], 1):
-            print(f"    [{i}/{min(20, len(filtered_candidates))}] {candidate['name']} 분석 중...")
+        # 최대 20개 종목만 상세 분석 (API 호출 속도는 rate_limiter가 제어)
+        targets = filtered_candidates[:20]
+        # 일봉은 로컬 저장소에서 - 장중 당일 봉은 2단계에서 받은 현재가로 구성 (추가 API 호출 없음)
+        histories = {c['code']: self.api_client.get_daily_price_history(c['code'], live_quote=c) for c in targets}
+
+        # 기술적 지표 일괄 계산 (전 종목 한 번에)
+        indicators = batch_indicators.calculate_for_histories(histories)
 
-            # 기술적 지표 계산
-            analyzed_data = self.analyze_stock_with_indicators(candidate['code'], candidate)
+        for i, candidate in enumerate(targets, 1):
+            print(f"    [{i}/{len(targets)}] {candidate['name']} 분석 중...")
+
+            analyzed_data = self.evaluate_buy_signal(candidate, indicators[candidate['code']])
 
             # 모든 분석 데이터 추가 (매수 신호 여부와 관계없이)
             analyzed_data['from_source'] = candidate['from']
@@ -619,8 +671,6 @@ class TradingEngine:
             else:
                 print(f"      ⚪ 신호 없음 (RSI: {analyzed_data['rsi']:.1f})")
 
-            time.sleep(0.2)  # API 부하 방지
-
         # 매수 신호가 있는 종목 우선 정렬
         opportunities.sort(key=lambda x: (x['buy_signal'], x.get('rsi', 50)), reverse=False)
 
@@ -637,10 +687,11 @@ class TradingEngine:
 
         for holding in portfolio:
             stock_code = holding['stock_code']
+            self._refresh_from_quote_table(holding)
             profit_rate = holding['profit_rate']
 
-            # 일봉 데이터로 RSI 계산
-            df = self.api_client.get_daily_price_history(stock_code)
+            # 일봉 데이터로 RSI 계산 (당일 봉은 잔고 조회의 현재가 사용)
+            df = self.api_client.get_daily_price_history(stock_code, live_quote=holding)
             rsi = self.analyzer.calculate_rsi(df)
 
             print(f"  📈 {holding['stock_name']}: 수익률 {profit_rate:+.2f}%, RSI {rsi:.1f}")
@@ -669,6 +720,18 @@ class TradingEngine:
 
         return sell_list
 
+    def _refresh_from_quote_table(self, holding: Dict):
+        """공유 시세 테이블에 잔고 조회 이후 시세가 있으면 현재가/수익률 갱신 (API 호출 없음)"""
+        quote = self.quote_table.get(holding['stock_code'], max_age=self.quote_max_age)
+        if quote is None or quote['ts'] <= holding.get('as_of', 0):
+            return
+        if holding['buy_price'] <= 0 or quote['current_price'] <= 0:
+            return
+        holding['current_price'] = quote['current_price']
+        holding['profit_rate'] = (quote['current_price'] / holding['buy_price'] - 1) * 100
+        holding['profit_loss'] = (quote['current_price'] - holding['buy_price']) * holding['quantity']
+        holding['as_of'] = quote['ts']
+
     def execute_trades(self):
         """매매 실행 및 Firebase 동기화"""
         now = datetime.now(self.kst)
@@ -696,7 +759,6 @@ class TradingEngine:
                     self.logger.trade(f"매도 완료: {item['stock_name']}", item)
                 else:
                     print(f"  ❌ 매도 실패")
-                time.sleep(1)
 
             # 3. 매수 기회 탐색 및 Firebase 동기화
             buy_opportunities = self.find_buy_opportunities()
@@ -748,7 +810,6 @@ class TradingEngine:
                     })
                 else:
                     print(f"  ❌ 매수 실패")
-                time.sleep(1)
 
         print(f"\n✅ 매매 사이클 완료")
 
@@ -763,14 +824,17 @@ class TradingEngine:
         cycle_count = 0
         while True:
             try:
+                # 장 외 시간에는 다음 정규장까지 대기 (야간/주말/휴장일 API 호출 없음)
+                sleep_until('regular')
+
                 cycle_count += 1
                 print(f"\n🔄 사이클 #{cycle_count}")
 
                 self.execute_trades()
 
-                # 5분 대기
+                # 5분 대기 (장 마감이 먼저면 마감까지만)
                 print("⏰ 5분 대기 중...")
-                time.sleep(300)
+                time.sleep(min(300, seconds_until_close('regular')))
 
             except KeyboardInterrupt:
                 print("\n🛑 자동매매 봇 종료")
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+시세 공유 서비스 (Unix 소켓 pub/sub)
+- 서비스 프로세스 하나가 KIS 호출 한도를 독점하고, 포트폴리오 + 감시종목 + 구독 요청 종목의 합집합만 주기마다 1번씩 조회
+- 조회 결과는 연결된 모든 구독자에게 한 줄 JSON으로 전송 → 분당 호출 수가 프로세스 수가 아니라 종목 수에 비례
+- 구독자(MarketDataClient)는 백그라운드 스레드가 최신 시세를 메모리에 유지, 조회는 메모리에서만
+  - 서비스가 없거나 시세가 오래됐으면 None → 호출하는 쪽이 기존처럼 직접 조회
+- 같은 시세를 공유 메모리 시세 테이블(quote_table)에도 기록 → 구독하지 않은 종목도 소켓/JSON 없이 바로 읽음
+
+프로토콜 (줄 단위 JSON):
+    구독자 → 서비스  {"op": "subscribe", "codes": [...]} / {"op": "unsubscribe", "codes": [...]}
+    서비스 → 구독자  {"type": "quotes", "ts": epoch, "quotes": {code: {current_price, change_rate, volume, ..., "ts"}}}
+
+실행: python market_data_service.py  (소켓 경로: KIS_MARKET_SOCKET, 조회 주기: KIS_MARKET_INTERVAL)
+"""
+
+import os
+import json
+import time
+import socket
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from quote_table import QuoteTable, QuoteTableReader, get_quote_table
+from krx_calendar import is_session_open, sleep_until
+
+
+DEFAULT_SOCKET = "/tmp/kis_market_data.sock"
+
+
+def default_socket_path() -> str:
+    return os.getenv('KIS_MARKET_SOCKET', DEFAULT_SOCKET)
+
+
+def _encode(message: Dict) -> bytes:
+    return (json.dumps(message, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+class _Subscriber:
+    """서비스 쪽 구독자 연결 1개"""
+
+    def __init__(self, conn: socket.socket):
+        self.conn = conn
+        self.codes: Set[str] = set()
+        self.lock = threading.Lock()
+        self.alive = True
+
+    def send(self, data: bytes) -> bool:
+        with self.lock:
+            try:
+                self.conn.sendall(data)
+                return True
+            except OSError:
+                self.alive = False
+                return False
+
+
+class MarketDataService:
+    """시세 조회/배포 서비스"""
+
+    def __init__(self,
+                 fetch_quotes: Callable[[List[str]], Dict[str, Dict]],
+                 universe: Optional[Callable[[], Iterable[str]]] = None,
+                 socket_path: Optional[str] = None,
+                 interval: float = 10.0,
+                 universe_refresh: float = 60.0,
+                 send_timeout: float = 2.0,
+                 quote_table: Optional[QuoteTable] = None):
+        """
+        Args:
+            fetch_quotes: 종목코드 목록 → {코드: 시세} (KIS 호출, 호출 한도는 여기서만 사용)
+            universe: 항상 조회할 종목코드 (포트폴리오 + 감시종목), universe_refresh초마다 다시 읽음
+            send_timeout: 이 시간 안에 받지 못하는 구독자는 끊음 (느린 구독자가 배포를 막지 않도록)
+            quote_table: 조회 결과를 기록할 공유 시세 테이블 (QuoteTable.create(), 기록은 이 서비스만)
+        """
+        self.fetch_quotes = fetch_quotes
+        self.universe = universe
+        self.socket_path = socket_path or default_socket_path()
+        self.interval = interval
+        self.universe_refresh = universe_refresh
+        self.send_timeout = send_timeout
+        self.quote_table = quote_table
+
+        self.latest: Dict[str, Dict] = {}
+        self.stats = {'cycles': 0, 'api_codes': 0, 'published': 0}
+        self._universe_codes: Set[str] = set()
+        self._universe_at = 0.0
+        self._subscribers: List[_Subscriber] = []
+        self._lock = threading.Lock()
+        self._server: Optional[socket.socket] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """소켓 열고 연결 수락 스레드 시작"""
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)  # 이전 실행이 남긴 소켓 파일
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.socket_path)
+        self._server.listen(16)
+        threading.Thread(target=self._accept_loop, name="market-data-accept", daemon=True).start()
+        print(f"📡 시세 공유 서비스 시작: {self.socket_path}")
+
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            conn.settimeout(self.send_timeout)
+            subscriber = _Subscriber(conn)
+            with self._lock:
+                self._subscribers.append(subscriber)
+            threading.Thread(target=self._read_loop, args=(subscriber,), name="market-data-sub", daemon=True).start()
+
+    def _read_loop(self, subscriber: _Subscriber):
+        """구독자 요청 처리 - 구독 즉시 가지고 있는 최신 시세 전송"""
+        buffer = b''
+        while subscriber.alive and not self._stop.is_set():
+            try:
+                chunk = subscriber.conn.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if not chunk:
+                break
+            buffer += chunk
+            while b'\n' in buffer:
+                line, buffer = buffer.split(b'\n', 1)
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    continue
+                codes = {str(code) for code in request.get('codes', [])}
+                if request.get('op') == 'subscribe':
+                    subscriber.codes |= codes
+                    known = {code: self.latest[code] for code in codes if code in self.latest}
+                    if known:
+                        subscriber.send(_encode({'type': 'quotes', 'ts': time.time(), 'quotes': known}))
+                elif request.get('op') == 'unsubscribe':
+                    subscriber.codes -= codes
+        self._drop(subscriber)
+
+    def _drop(self, subscriber: _Subscriber):
+        subscriber.alive = False
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+        try:
+            subscriber.conn.close()
+        except OSError:
+            pass
+
+    def wanted_codes(self) -> List[str]:
+        """이번 주기에 조회할 종목 (항상 조회 종목 + 구독자 요청 종목, 중복 제거)"""
+        now = time.time()
+        if self.universe and now - self._universe_at >= self.universe_refresh:
+            try:
+                self._universe_codes = {str(code) for code in self.universe()}
+                self._universe_at = now
+            except Exception as e:
+                print(f"⚠️ 조회 대상 종목 갱신 실패: {e}")
+        codes = set(self._universe_codes)
+        with self._lock:
+            for subscriber in self._subscribers:
+                codes |= subscriber.codes
+        return sorted(codes)
+
+    def poll_once(self) -> int:
+        """종목별 1회 조회 후 전체 구독자에게 배포, 조회한 종목 수 반환"""
+        codes = self.wanted_codes()
+        if not codes:
+            return 0
+
+        quotes = self.fetch_quotes(codes) or {}
+        now = time.time()
+        for quote in quotes.values():
+            quote['ts'] = now
+        self.latest.update(quotes)
+        if self.quote_table is not None:
+            self.quote_table.put_many(quotes, now)
+
+        self.stats['cycles'] += 1
+        self.stats['api_codes'] += len(codes)
+        if quotes:
+            self.publish(quotes)
+        return len(codes)
+
+    def publish(self, quotes: Dict[str, Dict]):
+        data = _encode({'type': 'quotes', 'ts': time.time(), 'quotes': quotes})
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            if subscriber.send(data):
+                self.stats['published'] += 1
+            else:
+                self._drop(subscriber)
+
+    def run_forever(self):
+        """조회 주기 루프 (조회 시간을 빼고 interval 간격 유지, 장 외 시간에는 종가 1회 조회 후 다음 장까지 대기)"""
+        self.start()
+        refresh_after_close = True
+        try:
+            while not self._stop.is_set():
+                if not is_session_open():
+                    if refresh_after_close:
+                        try:
+                            self.poll_once()
+                        except Exception as e:
+                            print(f"❌ 시세 조회 실패: {e}")
+                        refresh_after_close = False
+                    sleep_until('regular', stop_event=self._stop)
+                    continue
+                refresh_after_close = True
+
+                started = time.time()
+                try:
+                    count = self.poll_once()
+                    with self._lock:
+                        subscribers = len(self._subscribers)
+                    print(f"📡 [{datetime.now().strftime('%H:%M:%S')}] 시세 {count}종목 조회 → 구독자 {subscribers}곳 배포")
+                except Exception as e:
+                    print(f"❌ 시세 조회 실패: {e}")
+                self._stop.wait(max(0, self.interval - (time.time() - started)))
+        except KeyboardInterrupt:
+            print("\n🛑 시세 공유 서비스 종료")
+        finally:
+            self.stop()
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            try:
+                self._server.close()
+            except OSError:
+                pass
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+        if self.quote_table is not None:
+            self.quote_table.close()
+            self.quote_table = None
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            self._drop(subscriber)
+
+
+class MarketDataClient:
+    """구독자 - 최신 시세를 메모리에 유지 (연결/재연결은 백그라운드 스레드)"""
+
+    def __init__(self, socket_path: Optional[str] = None, max_age: float = 30.0, reconnect_interval: float = 5.0,
+                 quote_table: Optional[QuoteTableReader] = None):
+        self.socket_path = socket_path or default_socket_path()
+        self.max_age = max_age
+        self.reconnect_interval = reconnect_interval
+        self.quote_table = quote_table  # 공유 시세 테이블을 먼저 확인 (없으면 소켓으로 받은 시세만)
+
+        self.quotes: Dict[str, Dict] = {}
+        self._codes: Set[str] = set()
+        self._conn: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="market-data-client", daemon=True)
+        self._thread.start()
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    def subscribe(self, codes: Iterable[str]):
+        """종목 구독 (서비스가 항상 조회하는 종목 외에 추가로 필요한 종목)"""
+        new = {str(code) for code in codes} - self._codes
+        if new:
+            self._codes |= new
+            self._send({'op': 'subscribe', 'codes': sorted(new)})
+
+    def unsubscribe(self, codes: Iterable[str]):
+        gone = {str(code) for code in codes} & self._codes
+        if gone:
+            self._codes -= gone
+            self._send({'op': 'unsubscribe', 'codes': sorted(gone)})
+
+    def get_quote(self, code: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """최신 시세 사본 (없거나 max_age초보다 오래됐으면 None)"""
+        max_age = max_age if max_age is not None else self.max_age
+        quote = self.quotes.get(code)
+        if self.quote_table is not None:
+            row = self.quote_table.get(code, max_age)
+            if row is not None and (quote is None or row['ts'] >= quote.get('ts', 0)):
+                row.pop('ts')
+                row['name'] = quote.get('name', code) if quote else code  # 테이블에는 종목명이 없음
+                return row
+        if quote is None:
+            return None
+        if time.time() - quote.get('ts', 0) > max_age:
+            return None
+        return {key: value for key, value in quote.items() if key != 'ts'}
+
+    def get_quotes(self, codes: Iterable[str], max_age: Optional[float] = None) -> Dict[str, Dict]:
+        """여러 종목 최신 시세 (신선한 것만)"""
+        result = {}
+        for code in codes:
+            quote = self.get_quote(code, max_age)
+            if quote is not None:
+                result[code] = quote
+        return result
+
+    def _send(self, message: Dict):
+        with self._lock:
+            if self._conn is None:
+                return  # 연결되면 전체 구독 목록을 다시 보냄
+            try:
+                self._conn.sendall(_encode(message))
+            except OSError:
+                pass
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not os.path.exists(self.socket_path):
+                self._stop.wait(self.reconnect_interval)
+                continue
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                conn.connect(self.socket_path)
+                with self._lock:
+                    self._conn = conn
+                if self._codes:
+                    self._send({'op': 'subscribe', 'codes': sorted(self._codes)})
+                self._read(conn)
+            except OSError:
+                pass
+            finally:
+                with self._lock:
+                    self._conn = None
+                conn.close()
+            self._stop.wait(self.reconnect_interval)
+
+    def _read(self, conn: socket.socket):
+        buffer = b''
+        while not self._stop.is_set():
+            chunk = conn.recv(1 << 20)
+            if not chunk:
+                return
+            buffer += chunk
+            while b'\n' in buffer:
+                line, buffer = buffer.split(b'\n', 1)
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if message.get('type') == 'quotes':
+                    self.quotes.update(message.get('quotes', {}))
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        self._thread.join(timeout=2)
+
+
+_clients: Dict[str, MarketDataClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_market_data_client(socket_path: Optional[str] = None) -> MarketDataClient:
+    """프로세스 내 공유 구독자 반환 (서비스가 없어도 생성 가능 - 나중에 뜨면 자동 연결)"""
+    socket_path = socket_path or default_socket_path()
+    with _clients_lock:
+        client = _clients.get(socket_path)
+        if client is None:
+            client = MarketDataClient(socket_path, quote_table=get_quote_table())
+            _clients[socket_path] = client
+        return client
+
+
+def firestore_universe(db) -> Callable[[], List[str]]:
+    """포트폴리오 + 감시종목 문서 ID를 조회 대상으로"""
+    def load() -> List[str]:
+        codes = [doc.id for doc in db.collection('portfolio').stream()]
+        codes += [doc.id for doc in db.collection('watchlist').stream()]
+        return codes
+    return load
+
+
+def main():
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+    from dotenv import load_dotenv
+    from token_manager import TokenManager
+    from main import KISApiClient
+
+    load_dotenv()
+    if not firebase_admin._apps:
+        cred = credentials.Certificate(os.getenv('FIREBASE_ADMIN_KEY_PATH'))
+        firebase_admin.initialize_app(cred)
+    db = firestore.client()
+
+    account_no = os.getenv('KIS_ACCOUNT_NUMBER')
+    if '-' not in account_no:
+        account_no = f"{account_no}-01"
+    token_manager = TokenManager(os.getenv('KIS_APP_KEY'), os.getenv('KIS_APP_SECRET'))
+    api_client = KISApiClient(token_manager, account_no)  # 구독자가 아니므로 market_data 없이 직접 조회
+
+    def fetch_quotes(codes: List[str]) -> Dict[str, Dict]:
+        return {code: quote for code, quote in zip(codes, api_client.get_stock_prices(codes)) if quote}
+
+    service = MarketDataService(
+        fetch_quotes,
+        universe=firestore_universe(db),
+        interval=float(os.getenv('KIS_MARKET_INTERVAL', '10')),
+        quote_table=QuoteTable.create()
+    )
+    service.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+종목 마스터 바이너리 스냅샷 (stock_master.bin)
+- 시작 시 JSON 전체를 파싱하지 않고 파일을 mmap만 함 → 조회 시 필요한 페이지만 읽힘
+- 같은 파일을 여러 프로세스(매매/실시간/스케줄러)가 열면 OS 페이지 캐시를 공유 (프로세스별 dict 없음)
+
+파일 구조 (리틀 엔디언):
+    헤더    magic(4) 'KSM1' | count(u32) | table_size(u32, 2의 거듭제곱) | reserved(u32)
+    슬롯    table_size × [code(8바이트, 빈 칸은 0) | name_offset(u32) | name_length(u16) | reserved(u16)]
+    이름    UTF-8 이름들을 이어 붙인 영역 (name_offset은 이 영역 시작 기준)
+
+조회: FNV-1a 해시 → 선형 탐사, 빈 슬롯을 만나면 없음
+"""
+
+import os
+import json
+import mmap
+import struct
+from typing import Dict, Iterator, Optional, Tuple
+
+
+MAGIC = b'KSM1'
+HEADER = struct.Struct('<4sIII')
+SLOT = struct.Struct('<8sIHH')
+CODE_WIDTH = 8
+
+
+def fnv1a_hash(code: bytes) -> int:
+    """FNV-1a 32비트"""
+    h = 0x811c9dc5
+    for byte in code:
+        h = ((h ^ byte) * 0x01000193) & 0xffffffff
+    return h
+
+
+def write_snapshot(path: str, names: Dict[str, str]):
+    """{코드: 이름} → 바이너리 스냅샷 (임시 파일 기록 후 rename)"""
+    entries = []
+    for code, name in names.items():
+        key = str(code).encode('ascii')
+        if not name or len(key) > CODE_WIDTH:
+            continue
+        entries.append((key, name.encode('utf-8')))
+
+    table_size = 1
+    while table_size < max(len(entries) * 2, 8):  # 적재율 50% 이하
+        table_size *= 2
+
+    slots = bytearray(SLOT.size * table_size)
+    blob = bytearray()
+    for key, name in entries:
+        index = fnv1a_hash(key) & (table_size - 1)
+        while slots[index * SLOT.size] != 0:
+            index = (index + 1) & (table_size - 1)
+        SLOT.pack_into(slots, index * SLOT.size, key, len(blob), len(name), 0)
+        blob += name
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(entries), table_size, 0))
+        f.write(slots)
+        f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class MasterSnapshot:
+    """읽기 전용 mmap 스냅샷"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count, self.table_size, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or self.table_size & (self.table_size - 1):
+            self._mm.close()
+            raise ValueError(f"종목 마스터 스냅샷 형식 오류: {path}")
+        self._mask = self.table_size - 1
+        self._blob_start = HEADER.size + SLOT.size * self.table_size
+
+    def get(self, code: str) -> Optional[str]:
+        """종목코드 → 이름 (없으면 None)"""
+        try:
+            key = code.encode('ascii')
+        except UnicodeEncodeError:
+            return None
+        if len(key) > CODE_WIDTH:
+            return None
+        padded = key.ljust(CODE_WIDTH, b'\0')
+
+        index = fnv1a_hash(key) & self._mask
+        for _ in range(self.table_size):
+            slot_code, offset, length, _ = SLOT.unpack_from(self._mm, HEADER.size + index * SLOT.size)
+            if slot_code[0] == 0:
+                return None
+            if slot_code == padded:
+                start = self._blob_start + offset
+                return self._mm[start:start + length].decode('utf-8')
+            index = (index + 1) & self._mask
+        return None
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        for index in range(self.table_size):
+            slot_code, offset, length, _ = SLOT.unpack_from(self._mm, HEADER.size + index * SLOT.size)
+            if slot_code[0] != 0:
+                start = self._blob_start + offset
+                yield slot_code.rstrip(b'\0').decode('ascii'), self._mm[start:start + length].decode('utf-8')
+
+    def __contains__(self, code) -> bool:
+        return self.get(code) is not None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        self._mm.close()
+
+
+def open_snapshot(path: str, legacy_json: Optional[str] = None) -> Optional[MasterSnapshot]:
+    """스냅샷 열기 - 없거나 JSON 마스터보다 오래됐으면 JSON에서 1회 변환 (둘 다 없으면 None)"""
+    if legacy_json and os.path.exists(legacy_json):
+        if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(legacy_json):
+            try:
+                with open(legacy_json, 'r', encoding='utf-8') as f:
+                    names = json.load(f)
+                write_snapshot(path, names)
+                os.utime(path, (os.path.getatime(legacy_json), os.path.getmtime(legacy_json)))
+                print(f"📦 종목 마스터 변환: {legacy_json} → {path} ({len(names)}개)")
+            except (OSError, ValueError) as e:
+                print(f"⚠️ 종목 마스터 변환 실패: {e}")
+
+    if not os.path.exists(path):
+        return None
+    try:
+        return MasterSnapshot(path)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"⚠️ 종목 마스터 스냅샷 열기 실패: {e}")
+        return None
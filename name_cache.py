@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+종목명 로컬 캐시 (스냅샷 + 추가 전용 로그)
+- stock_names_cache.json: 스냅샷 (기존과 같은 {코드: 이름} JSON)
+- stock_names_cache.json.log: 스냅샷 이후 추가된 이름, 한 줄에 1건 (JSON Lines)
+- 새 이름은 로그 끝에 덧붙이기만 함 → 이름 N개 저장 비용이 O(N) (매번 전체 파일 재작성 없음)
+- 로그가 compact_threshold줄을 넘으면 스냅샷으로 합침 (임시 파일 기록 후 rename → 중간에 죽어도 깨지지 않음)
+- 로드 시 스냅샷 → 로그 순으로 재생, 중간에 끊긴 마지막 줄은 무시
+- 여러 프로세스가 같은 파일을 쓰므로 덧붙이기/합치기는 flock으로 직렬화
+"""
+
+import os
+import json
+import fcntl
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+
+class NameCache:
+    """종목명 로컬 캐시 - names는 {코드: 이름} dict (읽기 전용으로 사용)"""
+
+    def __init__(self, path: str = "stock_names_cache.json", compact_threshold: int = 1000):
+        self.path = path
+        self.log_path = f"{path}.log"
+        self.compact_threshold = compact_threshold
+        self.names: Dict[str, str] = {}
+        self._log_lines = 0
+        self._lock = threading.Lock()
+        self.reload()
+
+    @contextmanager
+    def _file_lock(self):
+        """프로세스 간 잠금 (로그 파일에 flock)"""
+        with open(self.log_path, 'a') as lock_f:
+            fcntl.flock(lock_f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_f.fileno(), fcntl.LOCK_UN)
+
+    def _read_files(self):
+        """(스냅샷 + 로그 재생 결과, 로그 줄 수)"""
+        names: Dict[str, str] = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    names.update(json.load(f))
+            except (OSError, ValueError):
+                print(f"⚠️ 종목명 캐시 스냅샷 손상, 로그만 사용: {self.path}")
+
+        lines = 0
+        if os.path.exists(self.log_path):
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # 기록 도중 끊긴 줄
+                    names[entry['code']] = entry['name']
+                    lines += 1
+        return names, lines
+
+    def reload(self) -> Dict[str, str]:
+        """스냅샷 + 로그 다시 읽기"""
+        names, lines = self._read_files()
+        with self._lock:
+            # 같은 dict를 갱신 (names를 참조하는 쪽이 계속 최신 내용을 보도록)
+            self.names.clear()
+            self.names.update(names)
+            self._log_lines = lines
+        return self.names
+
+    def get(self, code: str):
+        return self.names.get(code)
+
+    def __contains__(self, code) -> bool:
+        return code in self.names
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def put(self, code: str, name: str):
+        """이름 1개 저장"""
+        self.put_many({code: name})
+
+    def put_many(self, names: Dict[str, str]):
+        """바뀐 이름만 로그 끝에 한 번에 덧붙임 (fsync 1회)"""
+        with self._lock:
+            new = {code: name for code, name in names.items() if name and self.names.get(code) != name}
+            if not new:
+                return
+            data = ''.join(json.dumps({'code': code, 'name': name}, ensure_ascii=False) + '\n'
+                           for code, name in new.items()).encode('utf-8')
+            with self._file_lock():
+                with open(self.log_path, 'a+b') as f:
+                    # 이전 기록이 줄 중간에서 끊겼으면 새 줄에서 시작
+                    if f.seek(0, os.SEEK_END) > 0:
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b'\n':
+                            data = b'\n' + data
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+            self.names.update(new)
+            self._log_lines += len(new)
+            need_compact = self._log_lines >= self.compact_threshold
+
+        if need_compact:
+            self.compact()
+
+    def compact(self):
+        """스냅샷 + 로그를 새 스냅샷 하나로 합치고 로그 비우기"""
+        with self._lock, self._file_lock():
+            # 다른 프로세스가 덧붙인 줄까지 포함하도록 잠근 상태에서 다시 읽음
+            names, _ = self._read_files()
+
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(names, f, ensure_ascii=False, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            # rename 후에 로그를 비움 - 그 사이에 죽어도 재생 결과는 같음
+            with open(self.log_path, 'w', encoding='utf-8'):
+                pass
+
+            self.names.update(names)
+            self._log_lines = 0
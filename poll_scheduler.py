@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+종목별 조회 주기 조절 (위험도 우선)
+- 보유 종목: 손절/익절 기준까지 남은 거리와 최근 변동성으로 주기 결정
+  - 기준까지 거리 d(%p), 분산 속도 v(%²/초)일 때 가격이 기준에 닿는 대략적인 시간 = d² / v
+  - 그 시간 안에 checks_before_threshold번은 확인하도록 주기 = d² / v / checks_before_threshold
+  - 이미 기준을 넘었으면 min_interval
+- 감시 종목: 변동성이 클수록 자주 (watch_min_interval ~ watch_max_interval)
+- 변동성: 조회할 때마다 (수익률² / 경과초)의 지수 가중 평균 (반감기 half_life초)
+- 호출 예산(budget, 초당 조회 수): 모든 종목에 최대 주기만큼은 보장하고, 남는 예산을 급한 종목부터 배분
+  → 조용한 종목은 최대 주기까지 늘어나고 위험한 종목은 원하는 주기(1초 미만 포함)를 받음
+"""
+
+import time
+from typing import Dict, Iterable, List, Optional
+
+
+# 하루 변동 2% (정규장 6시간 30분 = 23400초) 기준 분산 속도 - 조회 이력이 없을 때 사용
+DEFAULT_VARIANCE_RATE = 2.0 ** 2 / 23400
+
+
+class _Symbol:
+    def __init__(self, code: str, held: bool, buy_price: float = 0.0):
+        self.code = code
+        self.held = held
+        self.buy_price = buy_price
+        self.price: Optional[float] = None
+        self.polled_at: Optional[float] = None
+        self.variance_rate = DEFAULT_VARIANCE_RATE
+        self.desired = 0.0     # 원하는 주기
+        self.interval = 0.0    # 예산 배분 후 주기
+
+
+class PollScheduler:
+    """종목별 다음 조회 시각 관리 - due()로 조회할 종목을 받고 record()로 결과 기록"""
+
+    def __init__(self,
+                 stop_loss_rate: float = -3.0,
+                 take_profit_rate: float = 5.0,
+                 budget: float = 2.0,
+                 min_interval: float = 0.5,
+                 held_max_interval: float = 30.0,
+                 watch_min_interval: float = 10.0,
+                 watch_max_interval: float = 120.0,
+                 checks_before_threshold: float = 100.0,
+                 half_life: float = 120.0):
+        self.stop_loss_rate = stop_loss_rate
+        self.take_profit_rate = take_profit_rate
+        self.budget = budget
+        self.min_interval = min_interval
+        self.held_max_interval = held_max_interval
+        self.watch_min_interval = watch_min_interval
+        self.watch_max_interval = watch_max_interval
+        self.checks_before_threshold = checks_before_threshold
+        self.half_life = half_life
+        self._symbols: Dict[str, _Symbol] = {}
+
+    def set_symbols(self, held: Dict[str, float], watch: Iterable[str]):
+        """조회 대상 교체 - held: {코드: 매입가}, watch: 감시 종목 (보유 종목과 겹치면 보유로 취급)
+        새 종목은 바로 조회 대상, 빠진 종목은 제거, 기존 종목은 변동성 이력 유지
+        """
+        wanted = {code: _Symbol(code, True, float(buy_price or 0)) for code, buy_price in held.items()}
+        for code in watch:
+            wanted.setdefault(code, _Symbol(code, False))
+
+        symbols = {}
+        for code, new in wanted.items():
+            symbol = self._symbols.get(code)
+            if symbol is None:
+                symbol = new
+            else:
+                symbol.held, symbol.buy_price = new.held, new.buy_price
+            symbol.desired = self._desired_interval(symbol)
+            symbols[code] = symbol
+        self._symbols = symbols
+        self._rebalance()
+
+    def _desired_interval(self, symbol: _Symbol) -> float:
+        if not symbol.held:
+            interval = self.watch_max_interval * DEFAULT_VARIANCE_RATE / symbol.variance_rate
+            return min(max(interval, self.watch_min_interval), self.watch_max_interval)
+
+        if symbol.price is None or symbol.buy_price <= 0:
+            return self.held_max_interval
+        profit_rate = (symbol.price / symbol.buy_price - 1) * 100
+        distance = min(profit_rate - self.stop_loss_rate, self.take_profit_rate - profit_rate)
+        if distance <= 0:
+            return self.min_interval
+        interval = distance ** 2 / symbol.variance_rate / self.checks_before_threshold
+        return min(max(interval, self.min_interval), self.held_max_interval)
+
+    def _max_interval(self, symbol: _Symbol) -> float:
+        return self.held_max_interval if symbol.held else self.watch_max_interval
+
+    def _rebalance(self):
+        """예산 배분 - 최대 주기분은 모두에게, 남는 예산은 원하는 주기가 짧은 종목부터"""
+        symbols = sorted(self._symbols.values(), key=lambda s: s.desired)
+        base = sum(1 / self._max_interval(s) for s in symbols)
+        if base >= self.budget:
+            scale = base / self.budget if self.budget > 0 else 1.0
+            for symbol in symbols:
+                symbol.interval = self._max_interval(symbol) * scale
+            return
+
+        remaining = self.budget - base
+        for symbol in symbols:
+            floor_rate = 1 / self._max_interval(symbol)
+            extra = min(1 / symbol.desired - floor_rate, remaining)
+            remaining -= extra
+            symbol.interval = 1 / (floor_rate + extra)
+
+    def record(self, code: str, price: Optional[float], now: Optional[float] = None):
+        """조회 결과 기록 (실패는 price=None) → 변동성/주기 갱신"""
+        symbol = self._symbols.get(code)
+        if symbol is None:
+            return
+        now = now if now is not None else time.monotonic()
+        if price:
+            if symbol.price and symbol.polled_at is not None and now > symbol.polled_at:
+                elapsed = now - symbol.polled_at
+                sample = ((price / symbol.price - 1) * 100) ** 2 / elapsed
+                alpha = 1 - 0.5 ** (elapsed / self.half_life)
+                symbol.variance_rate += alpha * (sample - symbol.variance_rate)
+                symbol.variance_rate = max(symbol.variance_rate, DEFAULT_VARIANCE_RATE / 100)
+            symbol.price = price
+        symbol.polled_at = now
+        symbol.desired = self._desired_interval(symbol)
+        self._rebalance()
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """지금 조회할 종목 (주기 대비 많이 늦은 종목부터)"""
+        now = now if now is not None else time.monotonic()
+        overdue = []
+        for symbol in self._symbols.values():
+            if symbol.polled_at is None:
+                overdue.append((float('inf'), symbol.code))
+            elif now - symbol.polled_at >= symbol.interval:
+                overdue.append(((now - symbol.polled_at) / symbol.interval, symbol.code))
+        overdue.sort(reverse=True)
+        return [code for _, code in overdue]
+
+    def seconds_until_next(self, now: Optional[float] = None) -> float:
+        now = now if now is not None else time.monotonic()
+        waits = [0.0 if s.polled_at is None else s.polled_at + s.interval - now for s in self._symbols.values()]
+        return max(0.0, min(waits)) if waits else self.held_max_interval
+
+    def interval(self, code: str) -> float:
+        symbol = self._symbols.get(code)
+        return symbol.interval if symbol else self.watch_max_interval
+
+    def fastest_interval(self) -> float:
+        return min((s.interval for s in self._symbols.values()), default=self.held_max_interval)
+
+    def calls_per_second(self) -> float:
+        return sum(1 / s.interval for s in self._symbols.values())
+
+    def __len__(self) -> int:
+        return len(self._symbols)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+최신 시세 공유 테이블 (mmap 파일, 프로세스 간 공유)
+- 종목별 고정 크기 행: 현재가, 등락률, 거래량, 고가, 저가, 기록 시각
+- 기록은 한 프로세스만 (시세 공유 서비스), 읽기는 여러 프로세스가 API 호출/소켓 없이 직접
+- 행마다 seqlock: 기록 전후로 seq를 1씩 올림 (홀수 = 기록 중)
+  읽는 쪽은 seq가 짝수이고 읽기 전후 값이 같을 때만 채택 → 반쯤 쓰인 행을 보지 않음
+
+파일 구조 (리틀 엔디언):
+    헤더  magic(4) 'KQT1' | capacity(u32, 2의 거듭제곱) | count(u32) | reserved(u32)
+    행    capacity × [seq(u64) | code(8) | price(f64) | change_rate(f64) | volume(i64) | high(f64) | low(f64) | ts(f64)]
+종목코드 → 행 위치는 FNV-1a 해시 + 선형 탐사 (행의 code는 한 번 정해지면 바뀌지 않음)
+
+경로: KIS_QUOTE_TABLE (기본 /dev/shm/kis_quote_table, /dev/shm이 없으면 /tmp)
+"""
+
+import os
+import mmap
+import time
+import struct
+import threading
+from typing import Dict, Iterable, Optional
+
+from master_snapshot import fnv1a_hash
+
+
+MAGIC = b'KQT1'
+HEADER = struct.Struct('<4sIII')
+ROW = struct.Struct('<Q8sddqddd')
+SEQ = struct.Struct('<Q')
+DATA = struct.Struct('<8sddqddd')  # seq 뒤 부분
+CODE_WIDTH = 8
+
+
+def default_table_path() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else "/tmp"
+    return os.getenv('KIS_QUOTE_TABLE', os.path.join(base, "kis_quote_table"))
+
+
+class QuoteTable:
+    """시세 테이블 - create()는 기록용, open()은 읽기 전용"""
+
+    def __init__(self, path: str, mm: mmap.mmap, writable: bool):
+        self.path = path
+        self._mm = mm
+        self.writable = writable
+        magic, self.capacity, _, _ = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or self.capacity & (self.capacity - 1):
+            raise ValueError(f"시세 테이블 형식 오류: {path}")
+        self._mask = self.capacity - 1
+        self._inode = os.stat(path).st_ino
+        self._slots: Dict[str, int] = {}  # 종목코드 → 행 번호 (찾은 뒤에는 탐사 생략)
+        if writable:
+            # 이어 쓰는 경우 이미 자리 잡은 종목을 다시 등록 (count 유지)
+            for slot in range(self.capacity):
+                code = DATA.unpack_from(mm, self._offset(slot) + SEQ.size)[0]
+                if code[0] != 0:
+                    self._slots[code.rstrip(b'\0').decode('ascii')] = slot
+
+    @classmethod
+    def create(cls, path: Optional[str] = None, capacity: int = 4096) -> 'QuoteTable':
+        """기록용으로 열기 - 같은 크기의 기존 테이블은 그대로 이어 씀 (읽는 쪽 mmap 유지)"""
+        path = path or default_table_path()
+        size = HEADER.size + ROW.size * capacity
+        if capacity & (capacity - 1):
+            raise ValueError("capacity는 2의 거듭제곱이어야 합니다")
+
+        reuse = False
+        if os.path.exists(path) and os.path.getsize(path) == size:
+            with open(path, 'rb') as f:
+                magic, existing, _, _ = HEADER.unpack(f.read(HEADER.size))
+            reuse = magic == MAGIC and existing == capacity
+
+        if not reuse:
+            # 새 파일을 만든 뒤 rename - 기존 파일을 연 쪽은 inode가 바뀐 것을 보고 다시 엶
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, capacity, 0, 0))
+                f.truncate(size)
+            os.replace(tmp_path, path)
+
+        with open(path, 'r+b') as f:
+            mm = mmap.mmap(f.fileno(), size)
+        return cls(path, mm, writable=True)
+
+    @classmethod
+    def open(cls, path: Optional[str] = None) -> Optional['QuoteTable']:
+        """읽기 전용으로 열기 (없거나 형식이 다르면 None)"""
+        path = path or default_table_path()
+        try:
+            with open(path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return cls(path, mm, writable=False)
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def _offset(self, slot: int) -> int:
+        return HEADER.size + slot * ROW.size
+
+    def _find(self, key: bytes, claim: bool = False) -> Optional[int]:
+        padded = key.ljust(CODE_WIDTH, b'\0')
+        slot = fnv1a_hash(key) & self._mask
+        for _ in range(self.capacity):
+            code = self._mm[self._offset(slot) + SEQ.size:self._offset(slot) + SEQ.size + CODE_WIDTH]
+            if code == padded:
+                return slot
+            if code[0] == 0:
+                return slot if claim else None
+            slot = (slot + 1) & self._mask
+        return None
+
+    def _slot(self, code: str, claim: bool = False) -> Optional[int]:
+        slot = self._slots.get(code)
+        if slot is None:
+            try:
+                key = code.encode('ascii')
+            except UnicodeEncodeError:
+                return None
+            if len(key) > CODE_WIDTH:
+                return None
+            slot = self._find(key, claim)
+            if slot is not None and (claim or not self.writable):
+                self._slots[code] = slot
+                if claim:
+                    HEADER.pack_into(self._mm, 0, MAGIC, self.capacity, len(self._slots), 0)
+        return slot
+
+    def put(self, code: str, price: float, change_rate: float = 0.0, volume: int = 0,
+            high: float = 0.0, low: float = 0.0, ts: Optional[float] = None) -> bool:
+        """시세 1건 기록 (기록 프로세스 전용)"""
+        slot = self._slot(code, claim=True)
+        if slot is None:
+            print(f"⚠️ 시세 테이블 공간 부족: {code}")
+            return False
+        offset = self._offset(slot)
+        seq = SEQ.unpack_from(self._mm, offset)[0]
+        SEQ.pack_into(self._mm, offset, seq + 1)  # 홀수: 기록 중
+        DATA.pack_into(self._mm, offset + SEQ.size, code.encode('ascii'), float(price), float(change_rate),
+                       int(volume), float(high), float(low), ts if ts is not None else time.time())
+        SEQ.pack_into(self._mm, offset, seq + 2)
+        return True
+
+    def put_many(self, quotes: Dict[str, Dict], ts: Optional[float] = None):
+        """{코드: 시세 dict} 기록 (main.KISApiClient._parse_stock_price 형식)"""
+        ts = ts if ts is not None else time.time()
+        for code, quote in quotes.items():
+            self.put(code, quote.get('current_price', 0), quote.get('change_rate', 0), quote.get('volume', 0),
+                     quote.get('high_price', 0), quote.get('low_price', 0), ts)
+
+    def get(self, code: str, max_age: Optional[float] = None, retries: int = 100) -> Optional[Dict]:
+        """최신 시세 (없거나 max_age초보다 오래됐으면 None)"""
+        slot = self._slot(code)
+        if slot is None:
+            return None
+        offset = self._offset(slot)
+        for _ in range(retries):
+            before = SEQ.unpack_from(self._mm, offset)[0]
+            if before & 1:
+                continue  # 기록 중
+            _, price, change_rate, volume, high, low, ts = DATA.unpack_from(self._mm, offset + SEQ.size)
+            if SEQ.unpack_from(self._mm, offset)[0] == before:
+                if max_age is not None and time.time() - ts > max_age:
+                    return None
+                return {
+                    'code': code,
+                    'current_price': price,
+                    'change_rate': change_rate,
+                    'volume': volume,
+                    'high_price': high,
+                    'low_price': low,
+                    'ts': ts
+                }
+        return None
+
+    def get_many(self, codes: Iterable[str], max_age: Optional[float] = None) -> Dict[str, Dict]:
+        result = {}
+        for code in codes:
+            quote = self.get(code, max_age)
+            if quote is not None:
+                result[code] = quote
+        return result
+
+    def __len__(self) -> int:
+        return HEADER.unpack_from(self._mm, 0)[2]
+
+    def is_stale_file(self) -> bool:
+        """기록 프로세스가 테이블을 새로 만들었는지 (읽는 쪽이 다시 열어야 하는지)"""
+        try:
+            return os.stat(self.path).st_ino != self._inode
+        except OSError:
+            return True
+
+    def close(self):
+        self._mm.close()
+
+
+class QuoteTableReader:
+    """읽기 전용 테이블 - 파일이 없거나 새로 만들어졌으면 check_interval마다 다시 열기 시도"""
+
+    def __init__(self, path: Optional[str] = None, check_interval: float = 5.0):
+        self.path = path or default_table_path()
+        self.check_interval = check_interval
+        self._table: Optional[QuoteTable] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def table(self) -> Optional[QuoteTable]:
+        now = time.time()
+        if now - self._checked_at >= self.check_interval:
+            with self._lock:
+                self._checked_at = now
+                if self._table is None or self._table.is_stale_file():
+                    self._table = QuoteTable.open(self.path)
+        return self._table
+
+    def get(self, code: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        table = self.table()
+        return table.get(code, max_age) if table is not None else None
+
+    def get_many(self, codes: Iterable[str], max_age: Optional[float] = None) -> Dict[str, Dict]:
+        table = self.table()
+        return table.get_many(codes, max_age) if table is not None else {}
+
+
+_readers: Dict[str, QuoteTableReader] = {}
+_readers_lock = threading.Lock()
+
+
+def get_quote_table(path: Optional[str] = None) -> QuoteTableReader:
+    """프로세스 내 공유 읽기 전용 테이블 반환"""
+    path = path or default_table_path()
+    with _readers_lock:
+        reader = _readers.get(path)
+        if reader is None:
+            reader = QuoteTableReader(path)
+            _readers[path] = reader
+        return reader
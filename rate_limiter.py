@@ -0,0 +1,115 @@
+"""
+KIS API 호출 유량 제어 - 토큰 버킷
+- TR-ID 종류(시세 조회 / 주문)별 버킷
+- 고정 time.sleep 대신 허용량만큼 즉시 호출
+- KIS 버킷은 용량 1 (버스트 없음) - 용량 C면 가득 찬 버킷이 1초 안에 C + 초당 한도만큼 통과시켜 한도 초과
+  → 어느 1초 구간에서도 시세 + 주문 호출 합이 앱키당 한도(PUBLISHED_LIMITS 합계) 이하
+"""
+
+import os
+import time
+import asyncio
+import threading
+from typing import Callable, Optional, Dict
+
+
+# 한국투자증권 공지 기준 앱키당 초당 호출 한도
+# 실전투자 20건/초, 모의투자 5건/초 - 주문용 몫을 떼어 두고 나머지를 시세 조회에 배분
+PUBLISHED_LIMITS = {
+    'real': {'quotation': 18, 'order': 2},
+    'vts': {'quotation': 4, 'order': 1},
+}
+
+
+class TokenBucket:
+    """스레드 안전 토큰 버킷"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated_at = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """토큰 획득 시도 - 성공하면 0, 실패하면 필요한 대기 시간(초) 반환"""
+        with self.lock:
+            now = self.clock()
+            self._refill(now)
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens: float = 1):
+        """토큰을 얻을 때까지 필요한 만큼만 대기"""
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1):
+        """acquire의 asyncio 버전 (이벤트 루프를 막지 않고 대기)"""
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+class KISRateLimiter:
+    """TR-ID 종류별 토큰 버킷 묶음"""
+
+    def __init__(self, quotation_per_sec: float, order_per_sec: float,
+                 clock: Callable[[], float] = time.monotonic):
+        # 용량 1: 호출 간격이 1/초당 한도 이상 → 1초 구간마다 최대 초당 한도만큼
+        self.buckets: Dict[str, TokenBucket] = {
+            'quotation': TokenBucket(quotation_per_sec, capacity=1, clock=clock),
+            'order': TokenBucket(order_per_sec, capacity=1, clock=clock),
+        }
+
+    @staticmethod
+    def classify(tr_id: Optional[str]) -> str:
+        """TR-ID로 버킷 종류 판별 (주문 TR은 'U'로 끝남: VTTC0802U 등)"""
+        if tr_id and tr_id.endswith('U'):
+            return 'order'
+        return 'quotation'
+
+    def bucket_for(self, tr_id: Optional[str]) -> TokenBucket:
+        return self.buckets[self.classify(tr_id)]
+
+    def acquire(self, tr_id: Optional[str] = None):
+        """해당 TR-ID 종류의 호출 허용량 확보"""
+        self.bucket_for(tr_id).acquire()
+
+    async def acquire_async(self, tr_id: Optional[str] = None):
+        """acquire의 asyncio 버전"""
+        await self.bucket_for(tr_id).acquire_async()
+
+
+_limiters: Dict[str, KISRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(base_url: str) -> KISRateLimiter:
+    """프로세스 내 공유 리미터 반환 (같은 서버로 가는 클라이언트는 한도를 공유)"""
+    with _limiters_lock:
+        limiter = _limiters.get(base_url)
+        if limiter is None:
+            env = 'vts' if 'openapivts' in base_url else 'real'
+            limits = PUBLISHED_LIMITS[env]
+            limiter = KISRateLimiter(
+                quotation_per_sec=float(os.getenv('KIS_RATE_LIMIT_QUOTATION', limits['quotation'])),
+                order_per_sec=float(os.getenv('KIS_RATE_LIMIT_ORDER', limits['order']))
+            )
+            _limiters[base_url] = limiter
+        return limiter
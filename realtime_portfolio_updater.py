@@ -2,13 +2,16 @@
 """실시간 포트폴리오 가격 업데이트 (안정적 버전)"""
 
 import os
-import json
 import time
 import requests
 from datetime import datetime
 from dotenv import load_dotenv
 import firebase_admin
 from firebase_admin import credentials, firestore
+from token_manager import TokenManager
+from firestore_sink import FirestoreWriteSink
+from stock_name_index import get_stock_name_index
+from krx_calendar import is_session_open, sleep_until
 
 load_dotenv()
 
@@ -25,23 +28,20 @@ class RealtimePortfolioUpdater:
         if '-' not in self.account_no:
             self.account_no = f"{self.account_no}-01"
 
-        # 종목명 매핑
-        self.stock_names = {
-            "090710": "휴림로봇",
-            "220260": "켐트로스",
-            "317830": "에스피시스템스",
-            "319400": "현대무벡스"
-        }
+        self.token_manager = TokenManager(os.getenv('KIS_APP_KEY'), os.getenv('KIS_APP_SECRET'))
+
+        # Firestore 쓰기는 모아서 배치 커밋
+        self.sink = FirestoreWriteSink(db)
+
+        # 종목명 매핑 (프로세스 공용 인덱스)
+        self.stock_names = get_stock_name_index()
 
     def get_access_token(self):
         """토큰 가져오기"""
-        try:
-            with open('kis_token.json', 'r') as f:
-                token_data = json.load(f)
-                return token_data.get('token')
-        except:
-            print("❌ 토큰 파일을 찾을 수 없습니다")
-            return None
+        token = self.token_manager.get_token()
+        if not token:
+            print("❌ 토큰을 가져올 수 없습니다")
+        return token
 
     def get_portfolio_balance(self):
         """안정적인 포트폴리오 잔고 조회"""
@@ -105,26 +105,23 @@ class RealtimePortfolioUpdater:
             quantity = int(float(stock.get('hldg_qty', 0)))
             if quantity > 0:
                 code = stock.get('pdno')
-                name = self.stock_names.get(code, code)
+                name = self.stock_names.get_name(code)
                 buy_avg = float(stock.get('pchs_avg_pric', 0))
                 current = float(stock.get('prpr', 0))
                 profit_amt = float(stock.get('evlu_pfls_amt', 0))
                 profit_rate = float(stock.get('evlu_pfls_rt', 0))
 
-                # Firebase 업데이트 (기존 필드 유지하면서 현재 가격만 업데이트)
-                try:
-                    doc_ref = db.collection('portfolio').document(code)
-                    doc_ref.update({
-                        'current_price': current,
-                        'profit_amount': profit_amt,
-                        'profit_rate': profit_rate,
-                        'total_value': current * quantity,
-                        'last_updated': firestore.SERVER_TIMESTAMP
-                    })
-                    updated_count += 1
-                    print(f"  ✅ {name}: {current:,.0f}원 ({profit_rate:+.2f}%)")
-                except Exception as e:
-                    print(f"  ❌ {name} 업데이트 실패: {e}")
+                # Firebase 업데이트 (기존 필드 유지하면서 현재 가격만 업데이트, sink가 배치로 전송)
+                doc_ref = db.collection('portfolio').document(code)
+                self.sink.update(doc_ref, {
+                    'current_price': current,
+                    'profit_amount': profit_amt,
+                    'profit_rate': profit_rate,
+                    'total_value': current * quantity,
+                    'last_updated': firestore.SERVER_TIMESTAMP
+                })
+                updated_count += 1
+                print(f"  ✅ {name}: {current:,.0f}원 ({profit_rate:+.2f}%)")
 
         # 계좌 요약 업데이트
         try:
@@ -132,7 +129,7 @@ class RealtimePortfolioUpdater:
             total_value = float(output2.get('tot_evlu_amt', 0))
             total_profit = float(output2.get('evlu_pfls_smtl_amt', 0))
 
-            db.collection('account').document('summary').update({
+            self.sink.update(db.collection('account').document('summary'), {
                 'total_cash': total_cash,
                 'total_value': total_value,
                 'total_profit': total_profit,
@@ -149,8 +146,19 @@ class RealtimePortfolioUpdater:
         """지속적인 업데이트 실행"""
         print(f"🚀 실시간 포트폴리오 업데이터 시작 (간격: {interval_seconds}초)")
 
+        # 장 외 시간에는 종가를 한 번 반영한 뒤 다음 장까지 대기
+        refresh_after_close = True
+
         while True:
             try:
+                if not is_session_open():
+                    if refresh_after_close:
+                        self.update_firebase_portfolio()
+                        refresh_after_close = False
+                    sleep_until('regular')
+                    continue
+                refresh_after_close = True
+
                 success = self.update_firebase_portfolio()
                 if success:
                     print("✅ 업데이트 완료")
@@ -162,6 +170,7 @@ class RealtimePortfolioUpdater:
 
             except KeyboardInterrupt:
                 print("\n🛑 업데이터 종료")
+                self.sink.close()
                 break
             except Exception as e:
                 print(f"❌ 오류 발생: {e}")
@@ -1,16 +1,27 @@
 """
 KIS Auto Trader Slack 알림 시스템
+- send_message는 채널별 대기열(outbox)에 넣고 바로 반환 - 전송은 백그라운드 스레드
+- coalesce_window 동안 모인 같은 채널 메시지는 첨부(attachment) 여러 개를 담은 1건으로 전송
+- 429 응답은 Retry-After만큼 대기 후 재전송, 대기열이 밀리면 낮은 우선순위 메시지는 생략 건수로 요약
+- 종료 시(close/atexit) 남은 메시지 전송
 """
 
 import os
 import json
+import time
+import atexit
+import threading
 import requests
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 
 
 class SlackNotifier:
-    def __init__(self):
+    # 한 번에 보낼 첨부 최대 개수 (Slack 권장 한도 내)
+    MAX_ATTACHMENTS = 20
+    MAX_RETRIES = 3
+
+    def __init__(self, coalesce_window: float = 2.0, max_backlog: int = 200):
         """Slack 알림 시스템 초기화"""
         self.webhook_url = os.getenv('SLACK_WEBHOOK_URL')
         self.bot_token = os.getenv('SLACK_BOT_TOKEN')
@@ -30,11 +41,26 @@ class SlackNotifier:
             'summary': '#kis-bot-summary'
         }
 
+        # 전송 대기열 (채널 → 메시지 목록), 대기열 초과로 생략한 건수
+        self.coalesce_window = coalesce_window
+        self.max_backlog = max_backlog
+        self.session = requests.Session()
+        self._outbox: Dict[Optional[str], List[Dict]] = {}
+        self._dropped: Dict[Optional[str], int] = {}
+        self._sending = 0
+        self._cond = threading.Condition()
+        self._closing = False
+        self._flush_requested = False  # flush() 호출 시 coalesce_window를 기다리지 않고 바로 전송
+        self._worker: Optional[threading.Thread] = None
+
         if not self.enabled:
             print("⚠️ Slack 토큰이 설정되지 않았습니다. Slack 알림이 비활성화됩니다.")
         else:
             method = "Bot Token" if self.use_bot_token else "Webhook"
             print(f"✅ Slack 알림 시스템 활성화됨 ({method})")
+            self._worker = threading.Thread(target=self._run, name="slack-outbox", daemon=True)
+            self._worker.start()
+            atexit.register(self.close)
 
     def send_message(self,
                     title: str,
@@ -43,9 +69,10 @@ class SlackNotifier:
                     emoji: str = ":robot_face:",
                     fields: Optional[list] = None,
                     channel: str = None,
-                    use_fallback: bool = True) -> bool:
+                    use_fallback: bool = True,
+                    priority: str = "normal") -> bool:
         """
-        Slack으로 메시지 전송
+        Slack 메시지 전송 예약 (대기열에 넣고 바로 반환)
 
         Args:
             title: 메시지 제목
@@ -54,88 +81,215 @@ class SlackNotifier:
             emoji: 아이콘 이모지
             fields: 추가 필드 정보
             channel: 채널 (기본값 사용시 None)
+            use_fallback: 채널 전송 실패 시 기본 채널로 재전송
+            priority: high / normal / low - 대기열이 밀리면 low부터 생략
+
+        Returns:
+            대기열에 넣었으면 True (비활성화 또는 생략 시 False)
         """
-        if not self.enabled:
+        if not self.enabled or self._closing:
             return False
 
-        try:
-            target_channel = channel or self.channel
+        item = {
+            'title': title,
+            'message': message,
+            'color': color,
+            'emoji': emoji,
+            'fields': fields or [],
+            'use_fallback': use_fallback,
+            'priority': priority,
+            'ts': int(datetime.now().timestamp())
+        }
 
-            if self.use_bot_token:
-                # Bot Token 방식 (chat.postMessage API)
-                payload = {
-                    "channel": target_channel,
-                    "text": f"*{title}*\n{message}",
-                    "attachments": [{
-                        "color": color,
-                        "fields": fields or []
-                    }]
-                }
-
-                headers = {
-                    'Authorization': f'Bearer {self.bot_token}',
-                    'Content-Type': 'application/json'
-                }
-
-                response = requests.post(
-                    'https://slack.com/api/chat.postMessage',
-                    data=json.dumps(payload),
-                    headers=headers,
-                    timeout=10
-                )
+        with self._cond:
+            if self._backlog() >= self.max_backlog:
+                self._shed_low_priority()
+                if priority == 'low' and self._backlog() >= self.max_backlog:
+                    self._dropped[channel] = self._dropped.get(channel, 0) + 1
+                    return False
+            self._outbox.setdefault(channel, []).append(item)
+            self._cond.notify()
+        return True
+
+    def _backlog(self) -> int:
+        return sum(len(items) for items in self._outbox.values())
+
+    def _shed_low_priority(self):
+        """대기열의 low 우선순위 메시지를 생략 건수로 바꿈 (잠금 상태에서 호출)"""
+        for channel, items in self._outbox.items():
+            kept = [item for item in items if item['priority'] != 'low']
+            if len(kept) != len(items):
+                self._dropped[channel] = self._dropped.get(channel, 0) + len(items) - len(kept)
+                self._outbox[channel] = kept
+
+    def _run(self):
+        """전송 스레드 - 첫 메시지 후 coalesce_window 동안 모아서 채널별로 전송"""
+        while True:
+            with self._cond:
+                while not self._outbox and not self._dropped and not self._closing:
+                    self._cond.wait()
+                if self._closing and not self._outbox and not self._dropped:
+                    return
+                closing = self._closing
+
+            if not closing:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._closing or self._flush_requested,
+                                        timeout=self.coalesce_window)
+
+            with self._cond:
+                outbox, self._outbox = self._outbox, {}
+                dropped, self._dropped = self._dropped, {}
+                self._flush_requested = False
+                self._sending += 1
+
+            try:
+                for channel in list(outbox) + [c for c in dropped if c not in outbox]:
+                    self._deliver(channel, outbox.get(channel, []), dropped.get(channel, 0))
+            except Exception as e:
+                print(f"❌ Slack 알림 전송 중 오류: {e}")
+            finally:
+                with self._cond:
+                    self._sending -= 1
+                    self._cond.notify_all()
+
+    def _deliver(self, channel: Optional[str], items: List[Dict], dropped: int = 0):
+        """채널 하나의 메시지를 첨부 MAX_ATTACHMENTS개씩 묶어 전송"""
+        chunks = [items[i:i + self.MAX_ATTACHMENTS] for i in range(0, len(items), self.MAX_ATTACHMENTS)] or [[]]
+        for index, chunk in enumerate(chunks):
+            # 생략 요약은 마지막 묶음에 첨부
+            self._deliver_chunk(channel, chunk, dropped if index == len(chunks) - 1 else 0)
+
+    def _deliver_chunk(self, channel: Optional[str], items: List[Dict], dropped: int):
+        target_channel = channel or self.channel
+        payload = self._build_payload(target_channel, items, dropped)
+        label = items[0]['title'] if len(items) == 1 else f"{len(items)}건 묶음"
+
+        ok, error = self._post(payload)
+        if ok:
+            print(f"✅ Slack 알림 전송 성공: {label}")
+            return
+
+        print(f"❌ Slack 알림 전송 실패 ({label}): {error}")
+        # 채널 분리 실패시 기본 채널로 폴백
+        fallback = [item for item in items if item['use_fallback']]
+        if channel and channel != self.channel and (fallback or dropped):
+            print(f"🔄 기본 채널로 재전송 시도: {self.channel}")
+            ok, error = self._post(self._build_payload(self.channel, fallback, dropped))
+            if not ok:
+                print(f"❌ 기본 채널 재전송 실패: {error}")
+
+    def _build_payload(self, target_channel: str, items: List[Dict], dropped: int) -> Dict:
+        """메시지 목록 → Slack 요청 바디 (1건이면 기존과 같은 형태)"""
+        if self.use_bot_token:
+            if len(items) == 1:
+                item = items[0]
+                text = f"*{item['title']}*\n{item['message']}"
+                attachments = [{"color": item['color'], "fields": item['fields']}]
             else:
-                # Webhook 방식
-                payload = {
-                    "channel": target_channel,
-                    "username": self.username,
-                    "icon_emoji": emoji,
-                    "attachments": [{
-                        "color": color,
-                        "title": title,
-                        "text": message,
-                        "footer": "KIS Auto Trader",
-                        "ts": int(datetime.now().timestamp()),
-                        "fields": fields or []
-                    }]
-                }
-
-                response = requests.post(
-                    self.webhook_url,
-                    data=json.dumps(payload),
-                    headers={'Content-Type': 'application/json'},
-                    timeout=10
-                )
+                text = f"*알림 {len(items)}건*" if items else "*알림 생략*"
+                attachments = [{
+                    "color": item['color'],
+                    "title": item['title'],
+                    "text": item['message'],
+                    "ts": item['ts'],
+                    "fields": item['fields']
+                } for item in items]
+            payload = {"channel": target_channel, "text": text, "attachments": attachments}
+        else:
+            attachments = [{
+                "color": item['color'],
+                "title": item['title'],
+                "text": item['message'],
+                "footer": "KIS Auto Trader",
+                "ts": item['ts'],
+                "fields": item['fields']
+            } for item in items]
+            payload = {
+                "channel": target_channel,
+                "username": self.username,
+                "icon_emoji": items[0]['emoji'] if items else ":robot_face:",
+                "attachments": attachments
+            }
+
+        if dropped:
+            payload["attachments"].append({
+                "color": "warning",
+                "text": f"⚠️ 알림이 밀려 낮은 우선순위 메시지 {dropped}건을 생략했습니다."
+            })
+        return payload
+
+    def _post(self, payload: Dict) -> Tuple[bool, str]:
+        """전송 1건 - 429면 Retry-After만큼 기다렸다가 재시도 (전송 스레드에서만 대기)"""
+        for _ in range(self.MAX_RETRIES):
+            try:
+                if self.use_bot_token:
+                    # Bot Token 방식 (chat.postMessage API)
+                    response = self.session.post(
+                        'https://slack.com/api/chat.postMessage',
+                        data=json.dumps(payload),
+                        headers={
+                            'Authorization': f'Bearer {self.bot_token}',
+                            'Content-Type': 'application/json'
+                        },
+                        timeout=10
+                    )
+                else:
+                    # Webhook 방식
+                    response = self.session.post(
+                        self.webhook_url,
+                        data=json.dumps(payload),
+                        headers={'Content-Type': 'application/json'},
+                        timeout=10
+                    )
+            except Exception as e:
+                return False, str(e)
+
+            if response.status_code == 429:
+                retry_after = float(response.headers.get('Retry-After', 1))
+                print(f"⏳ Slack 전송 한도 초과 - {retry_after:.0f}초 후 재시도")
+                time.sleep(retry_after)
+                continue
 
             if self.use_bot_token:
                 # Bot Token 응답 처리
                 result = response.json()
                 if result.get('ok'):
-                    print(f"✅ Slack 알림 전송 성공: {title}")
-                    return True
-                else:
-                    error_msg = result.get('error', 'Unknown error')
-                    print(f"❌ Slack Bot API 실패: {error_msg}")
-                    # 채널 분리 실패시 기본 채널로 폴백
-                    if use_fallback and channel and channel != self.channel:
-                        print(f"🔄 기본 채널로 재전송 시도: {self.channel}")
-                        return self.send_message(title, message, color, emoji, fields, None, False)
-                    return False
-            else:
-                # Webhook 응답 처리
-                if response.status_code == 200:
-                    print(f"✅ Slack 알림 전송 성공: {title}")
-                    return True
-                else:
-                    print(f"❌ Slack 알림 전송 실패: {response.status_code}")
-                    # 채널 분리 실패시 기본 채널로 폴백
-                    if use_fallback and channel and channel != self.channel:
-                        print(f"🔄 기본 채널로 재전송 시도: {self.channel}")
-                        return self.send_message(title, message, color, emoji, fields, None, False)
+                    return True, ""
+                return False, result.get('error', 'Unknown error')
+
+            # Webhook 응답 처리
+            if response.status_code == 200:
+                return True, ""
+            return False, f"HTTP {response.status_code}"
+
+        return False, "rate_limited"
+
+    def flush(self, timeout: float = 30) -> bool:
+        """대기열이 빌 때까지 대기 (coalesce_window 대기 없이 바로 전송)"""
+        if not self._worker:
+            return True
+        deadline = time.time() + timeout
+        with self._cond:
+            while self._outbox or self._dropped or self._sending:
+                remaining = deadline - time.time()
+                if remaining <= 0:
                     return False
-
-        except Exception as e:
-            print(f"❌ Slack 알림 전송 중 오류: {e}")
-            return False
+                # 전송 중에 새로 들어온 메시지도 바로 보내도록 매번 다시 요청
+                self._flush_requested = True
+                self._cond.notify_all()
+                self._cond.wait(min(remaining, 0.1))
+        return True
+
+    def close(self, timeout: float = 30):
+        """전송 스레드 종료 - 남은 메시지를 모두 보낸 뒤 반환"""
+        if not self._worker or self._closing:
+            return
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._worker.join(timeout)
+        self.session.close()
 
     def notify_bot_start(self):
         """봇 시작 알림"""
@@ -193,7 +347,8 @@ class SlackNotifier:
             color=action_color,
             emoji=action_emoji,
             fields=fields,
-            channel=self.channels.get('trading')
+            channel=self.channels.get('trading'),
+            priority="high"
         )
 
     def notify_trade_signal(self, signal_type: str, stock_code: str, indicators: Dict[str, Any]):
@@ -261,7 +416,8 @@ class SlackNotifier:
             color="danger",
             emoji=":exclamation:",
             fields=fields,
-            channel=self.channels.get('errors')
+            channel=self.channels.get('errors'),
+            priority="high"
         )
 
     def notify_deploy_success(self, commit_message: str = "", author: str = ""):
@@ -364,7 +520,8 @@ class SlackNotifier:
             color="good",
             emoji=":mag:",
             fields=fields,
-            channel=self.channels.get('trading')
+            channel=self.channels.get('trading'),
+            priority="low"
         )
 
     def notify_market_closed(self):
@@ -398,5 +555,6 @@ class SlackNotifier:
             message=message,
             color=color_map.get(alert_type, "good"),
             emoji=emoji_map.get(alert_type, ":bell:"),
-            channel=target_channel
+            channel=target_channel,
+            priority={"critical": "high", "info": "low"}.get(alert_type, "normal")
         )
\ No newline at end of file
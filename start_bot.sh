@@ -10,15 +10,15 @@ pkill -f "flutter run" 2>/dev/null
 sleep 1
 
 # 2. 토큰 확보 (최대 5번 시도)
+# 유효한 토큰은 재사용 - 삭제 후 재발급하면 다른 프로세스까지 1분 발급 제한(EGW00133)에 걸림
 echo "🔑 토큰 확보 중..."
-rm -f kis_token.json 2>/dev/null
+TOKEN_OK=0
 
 for i in {1..5}; do
     echo "  시도 $i/5..."
-    python3 get_saved_token.py
-
-    if [ -f "kis_token.json" ]; then
+    if python3 get_saved_token.py; then
         echo "  ✅ 토큰 확보 성공!"
+        TOKEN_OK=1
         break
     else
         echo "  ❌ 실패, 60초 대기..."
@@ -27,7 +27,7 @@ for i in {1..5}; do
 done
 
 # 토큰 확보 실패시 종료
-if [ ! -f "kis_token.json" ]; then
+if [ "$TOKEN_OK" != "1" ]; then
     echo "❌ 토큰 확보 실패. 종료합니다."
     exit 1
 fi
@@ -1,24 +1,37 @@
 #!/usr/bin/env python3
-"""스케줄러 기반 자동 트레이딩 시스템"""
+"""스케줄러 기반 자동 트레이딩 시스템 (작업은 모두 이 프로세스 안에서 실행)"""
 
 import os
-import time
-import schedule
 from datetime import datetime
-import pytz
 from dotenv import load_dotenv
+from job_scheduler import JobScheduler
+from krx_calendar import is_session_open, market_phase, next_window
 
 load_dotenv()
 
+# 작업 사이에 재사용하는 클라이언트 (첫 실행 때 1번만 생성)
+_portfolio_updater = None
+_trading_engine = None
+
+
 def update_portfolio_prices():
     """포트폴리오 가격 업데이트"""
+    global _portfolio_updater
     print(f"\n[{datetime.now().strftime('%H:%M:%S')}] 포트폴리오 가격 업데이트...")
-    os.system("python3 realtime_portfolio_updater.py > /dev/null 2>&1 &")
+    if _portfolio_updater is None:
+        from realtime_portfolio_updater import RealtimePortfolioUpdater
+        _portfolio_updater = RealtimePortfolioUpdater()
+    _portfolio_updater.update_firebase_portfolio()
 
 def scan_market():
     """시장 스캔 및 감시종목 업데이트"""
+    global _trading_engine
     print(f"\n[{datetime.now().strftime('%H:%M:%S')}] 시장 스캔 시작...")
-    os.system("python3 market_scanner.py > /dev/null 2>&1 &")
+    if _trading_engine is None:
+        from main import TradingEngine
+        _trading_engine = TradingEngine()
+    opportunities = _trading_engine.find_buy_opportunities()
+    _trading_engine.sync_watchlist_to_firebase(opportunities or [])
 
 def check_trading_signals():
     """매매 신호 체크"""
@@ -31,10 +44,12 @@ def main():
     print("⏰ KIS 자동 스케줄러 시작")
     print("=" * 50)
 
-    # 스케줄 설정
-    schedule.every(30).seconds.do(update_portfolio_prices)  # 30초마다 가격 업데이트
-    schedule.every(5).minutes.do(scan_market)  # 5분마다 시장 스캔
-    schedule.every(1).minutes.do(check_trading_signals)  # 1분마다 매매 신호 체크
+    # 스케줄 설정 (이전 실행이 끝나지 않았으면 겹쳐 실행하지 않음)
+    scheduler = JobScheduler()
+    # 장 외 시간(야간/주말/휴장일)에는 건너뜀
+    scheduler.add_job('portfolio', update_portfolio_prices, 30, jitter=2, active=is_session_open)  # 30초마다 가격 업데이트
+    scheduler.add_job('market_scan', scan_market, 300, jitter=15, misfire='run_once', active=is_session_open)  # 5분마다 시장 스캔
+    scheduler.add_job('signals', check_trading_signals, 60, active=is_session_open)  # 1분마다 매매 신호 체크
 
     print("📅 스케줄 설정 완료:")
     print("  - 포트폴리오 업데이트: 30초마다")
@@ -42,22 +57,18 @@ def main():
     print("  - 매매 신호: 1분마다")
     print("\n실행 중... (Ctrl+C로 종료)")
 
-    while True:
-        try:
-            schedule.run_pending()
-            time.sleep(1)
-        except KeyboardInterrupt:
-            print("\n\n🛑 스케줄러 종료")
-            break
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        print("\n\n🛑 스케줄러 종료")
+    finally:
+        if _portfolio_updater is not None:
+            _portfolio_updater.sink.close()
 
 if __name__ == "__main__":
-    kst = pytz.timezone('Asia/Seoul')
-    now = datetime.now(kst)
-
-    # 장시간 체크
-    if now.weekday() >= 5:  # 주말
-        print("⚠️ 주말에는 거래가 없습니다.")
-    elif now.hour < 9 or now.hour >= 16:  # 장시간 외
-        print("⚠️ 현재는 장시간이 아닙니다. (09:00-15:30)")
+    # 장시간 체크 (휴장일/개장 지연일은 krx_calendar)
+    if not is_session_open():
+        start, _ = next_window()
+        print(f"⚠️ 현재는 장시간이 아닙니다 ({market_phase()}). 다음 장: {start.strftime('%Y-%m-%d %H:%M')}")
 
-    main()
\ No newline at end of file
+    main()
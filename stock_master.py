@@ -3,14 +3,17 @@
 종목 마스터 정보 관리
 - 전체 종목 코드/이름 매핑 테이블 구축
 - 종목명 100% 보장
+- 마스터는 바이너리 스냅샷(stock_master.bin)으로 저장하고 mmap으로 조회 (master_snapshot)
+  - 생성 시 파일 전체를 읽지 않음, 여러 프로세스가 같은 페이지 캐시를 공유
 """
 
 import os
-import json
 import requests
 from datetime import datetime
 from typing import Dict, Optional
 from dotenv import load_dotenv
+from token_manager import TokenManager
+from stock_name_index import get_stock_name_index
 
 load_dotenv()
 
@@ -18,8 +21,9 @@ class StockMaster:
     """종목 마스터 정보 관리자"""
 
     def __init__(self):
-        self.master_file = "stock_master.json"
-        self.stock_dict = {}
+        self.index = get_stock_name_index()  # 프로세스 공용 종목명 인덱스 (마스터 스냅샷 보유)
+        self.master_file = self.index.master_file
+        self.stock_dict = {}  # 다운로드/기본 종목 구성용 (조회는 스냅샷)
         self.load_master()
 
     def load_master(self):
@@ -28,9 +32,10 @@ class StockMaster:
             # 저장된 파일이 있고, 7일 이내면 재사용
             file_time = os.path.getmtime(self.master_file)
             if (datetime.now().timestamp() - file_time) < 7 * 24 * 3600:
-                with open(self.master_file, 'r', encoding='utf-8') as f:
-                    self.stock_dict = json.load(f)
-                    print(f"📚 종목 마스터 로드 완료: {len(self.stock_dict)}개")
+                # 인덱스가 이미 mmap한 스냅샷 공유 (다른 프로세스가 갱신했으면 다시 mmap)
+                master = self.index.reload_master()
+                if master is not None:
+                    print(f"📚 종목 마스터 로드 완료: {len(master)}개")
                     return
 
         # 새로 다운로드
@@ -66,23 +71,17 @@ class StockMaster:
             self._load_default_master()
             return
 
-        # 파일로 저장
-        with open(self.master_file, 'w', encoding='utf-8') as f:
-            json.dump(self.stock_dict, f, ensure_ascii=False, indent=2)
+        # 스냅샷 파일로 저장 (다른 프로세스는 다음 로드 때 새 파일을 mmap)
+        self.index.set_master(self.stock_dict)
 
         print(f"✅ 종목 마스터 저장 완료: {len(self.stock_dict)}개")
 
     def _get_token(self, app_key: str, app_secret: str) -> Optional[str]:
-        """토큰 획득"""
+        """토큰 획득 (TokenManager 공유 토큰 사용)"""
         try:
-            # 기존 토큰 파일 확인
-            if os.path.exists('kis_token.json'):
-                with open('kis_token.json', 'r') as f:
-                    token_data = json.load(f)
-                    return token_data.get('token')
-        except:
-            pass
-        return None
+            return TokenManager(app_key, app_secret, auto_refresh=False).get_token()
+        except Exception:
+            return None
 
     def _get_market_stocks(self, token: str, app_key: str, app_secret: str, market: str) -> list:
         """특정 시장의 전체 종목 조회"""
@@ -136,13 +135,15 @@ class StockMaster:
             "033780": "KT&G",
             "015760": "한국전력"
         }
+        self.index.update(self.stock_dict)
         print(f"⚠️ 기본 종목만 로드: {len(self.stock_dict)}개")
 
     def get_name(self, code: str) -> str:
         """종목 코드로 종목명 조회"""
         # 6자리로 패딩
         code = code.zfill(6)
-        return self.stock_dict.get(code, code)  # 없으면 코드 그대로 반환
+        # 마스터 스냅샷 → 공용 인덱스 (없으면 코드 그대로 반환, 이름은 백그라운드에서 조회)
+        return self.index.get_name(code)
 
     def refresh(self):
         """마스터 정보 강제 새로고침"""
@@ -66,12 +66,15 @@ STOCK_NAME_MAP = {
 }
 
 def get_stock_name(stock_code):
-    """종목 코드로 종목명 조회"""
-    return STOCK_NAME_MAP.get(stock_code, stock_code)
+    """종목 코드로 종목명 조회 (공용 인덱스 - 이 목록 + 캐시/마스터, 없으면 코드 그대로)"""
+    from stock_name_index import get_stock_name_index
+    return get_stock_name_index().get_name(stock_code)
 
 def add_stock_name(stock_code, stock_name):
     """새로운 종목명 추가"""
+    from stock_name_index import get_stock_name_index
     STOCK_NAME_MAP[stock_code] = stock_name
+    get_stock_name_index().add(stock_code, stock_name)
 
 def update_stock_names_in_firebase():
     """Firebase의 모든 종목에 종목명 업데이트"""
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+종목명 인덱스 (프로세스 공용)
+- 종목코드 → 종목명을 메모리 dict 하나로 O(1) 조회
+- 시작 시 1회 로드: 하드코딩 목록(stock_name_database) + 로컬 캐시(name_cache)
+- 종목 마스터는 바이너리 스냅샷(stock_master.bin)을 mmap으로 공유 - 읽어 들이지 않고 조회 때마다 해시 탐색 (마스터 우선)
+- 메모리에 없는 종목은 백그라운드에서 Firestore(stock_names) → 네이버 금융 순으로 조회
+  - 호출 스레드는 기다리지 않음 (기다려야 하면 resolve / get_names(wait=True))
+  - 같은 종목을 동시에 여러 번 요청해도 조회는 1번, Firestore는 get_all 한 번으로 묶어서 읽음
+  - 네이버는 동시 naver_workers건, 초당 naver_rate건(토큰 버킷)으로 병렬 조회 - 고정 sleep 없음
+  - 찾은 이름은 로컬 캐시에 한 번에 덧붙이고, 네이버에서 새로 찾은 이름은 Firestore에 배치 1번으로 기록
+- update_names_in_firestore: 포트폴리오/감시 종목의 빠진 이름을 한 번에 조회해 배치 1번으로 기록
+- StockMaster / SmartStockNameManager / StockNameManager / stock_name_database가 모두 이 인덱스를 공유
+"""
+
+import os
+import time
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, Future, wait as wait_futures
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import firebase_admin
+from firebase_admin import firestore
+from firestore_sync import commit_in_batches
+from name_cache import NameCache
+from master_snapshot import MasterSnapshot, open_snapshot, write_snapshot
+from rate_limiter import TokenBucket
+
+
+NAME_COLLECTION = 'stock_names'
+CACHE_FILE = "stock_names_cache.json"
+MASTER_FILE = "stock_master.bin"
+LEGACY_MASTER_FILE = "stock_master.json"  # 이전 형식 - 스냅샷이 없거나 오래됐으면 1회 변환
+
+
+def normalize_code(code) -> str:
+    """종목코드 정규화 - 숫자 코드는 6자리로 패딩"""
+    code = str(code).strip()
+    return code.zfill(6) if code.isdigit() else code
+
+
+def fetch_name_from_naver(stock_code: str, timeout: float = 3) -> Optional[str]:
+    """네이버 금융에서 종목명 조회 (실패 시 None)
+    - bs4는 여기서만 쓰므로 필요할 때 import (설치되지 않은 환경에서도 모듈 import는 가능)
+    """
+    try:
+        from bs4 import BeautifulSoup
+        url = f"https://finance.naver.com/item/main.naver?code={stock_code}"
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+        }
+
+        response = requests.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 200:
+            soup = BeautifulSoup(response.text, 'html.parser')
+
+            # 종목명 추출 시도 1: h2 태그
+            h2_tag = soup.select_one('div.wrap_company h2')
+            if h2_tag:
+                return h2_tag.text.strip()
+
+            # 종목명 추출 시도 2: title 태그
+            title = soup.find('title')
+            if title and ':' in title.text:
+                return title.text.split(':')[0].strip()
+
+    except Exception as e:
+        print(f"⚠️ 네이버 조회 실패 ({stock_code}): {e}")
+
+    return None
+
+
+def _default_db():
+    """Firebase가 초기화된 프로세스에서만 Firestore 사용 (인덱스가 직접 초기화하지 않음)"""
+    return firestore.client() if firebase_admin._apps else None
+
+
+class StockNameIndex:
+    """종목명 인덱스 - 조회는 메모리, 빠진 종목만 비동기로 하위 계층 조회"""
+
+    def __init__(self,
+                 db=None,
+                 fetcher: Callable[[str], Optional[str]] = fetch_name_from_naver,
+                 cache_file: str = CACHE_FILE,
+                 master_file: str = MASTER_FILE,
+                 legacy_master_file: Optional[str] = LEGACY_MASTER_FILE,
+                 miss_ttl: float = 3600,
+                 max_workers: int = 2,
+                 naver_workers: int = 8,
+                 naver_rate: Optional[float] = None):
+        self._db = db
+        self.fetcher = fetcher
+        self.miss_ttl = miss_ttl  # 못 찾은 종목은 이 시간 동안 다시 조회하지 않음
+
+        self._names: Dict[str, str] = {}
+        self._misses: Dict[str, float] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stock-name")
+        # 네이버 조회 전용 풀 + 예의상 초당 호출 제한 (NAVER_NAME_RATE, 기본 10건/초)
+        self._fetch_pool = ThreadPoolExecutor(max_workers=naver_workers, thread_name_prefix="naver-name")
+        naver_rate = naver_rate or float(os.getenv('NAVER_NAME_RATE', '10'))
+        self.naver_bucket = TokenBucket(naver_rate)
+        self.local_cache = NameCache(cache_file)
+
+        # 마스터 > 로컬 캐시 > 하드코딩 (뒤에 넣은 쪽이 우선, 마스터는 조회 시 먼저 확인)
+        from stock_name_database import STOCK_NAME_MAP
+        self.update(STOCK_NAME_MAP)
+        self.update(self.local_cache.names)
+        self.master_file = master_file
+        self.master: Optional[MasterSnapshot] = open_snapshot(master_file, legacy_master_file)
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = _default_db()
+        return self._db
+
+    def reload_master(self) -> Optional[MasterSnapshot]:
+        """다른 프로세스가 스냅샷을 새로 썼으면 다시 mmap"""
+        if not os.path.exists(self.master_file):
+            return self.master
+        if self.master is None or os.path.getmtime(self.master_file) != self.master.mtime:
+            self.master = open_snapshot(self.master_file)
+        return self.master
+
+    def set_master(self, names: Dict[str, str]):
+        """종목 마스터 교체 - 스냅샷 파일을 새로 쓰고 다시 mmap"""
+        write_snapshot(self.master_file, {normalize_code(code): name for code, name in names.items()})
+        self.master = open_snapshot(self.master_file)
+
+    def _lookup(self, code: str) -> Optional[str]:
+        master = self.master
+        if master is not None:
+            name = master.get(code)
+            if name:
+                return name
+        return self._names.get(code)
+
+    def update(self, names: Dict[str, str]):
+        """이름 여러 개 추가/갱신"""
+        normalized = {normalize_code(code): name for code, name in names.items() if name}
+        with self._lock:
+            self._names.update(normalized)
+            for code in normalized:
+                self._misses.pop(code, None)
+
+    def add(self, code: str, name: str):
+        """이름 1개 추가/갱신"""
+        self.update({code: name})
+
+    def get(self, code: str) -> Optional[str]:
+        """메모리 조회만 (없으면 None, 하위 계층 조회 없음)"""
+        return self._lookup(normalize_code(code))
+
+    def get_name(self, code: str, default: Optional[str] = None) -> str:
+        """종목명 조회 - 없으면 백그라운드 조회를 걸어 두고 default(기본: 코드) 반환"""
+        code = normalize_code(code)
+        name = self._lookup(code)
+        if name is not None:
+            return name
+        self.prefetch([code])
+        return default if default is not None else code
+
+    def get_names(self, codes: Iterable[str], wait: bool = False, timeout: float = 10) -> Dict[str, str]:
+        """여러 종목명 한 번에 조회 (코드 → 이름, 못 찾으면 코드 그대로)
+
+        wait=True면 메모리에 없는 종목의 하위 계층 조회를 timeout까지 기다린다.
+        """
+        codes = [normalize_code(code) for code in codes]
+        names = {code: self._lookup(code) for code in codes}
+        missing = [code for code, name in names.items() if name is None]
+        if missing:
+            futures = self.prefetch(missing)
+            if wait and futures:
+                wait_futures(futures, timeout=timeout)
+            names.update({code: self._lookup(code) for code in missing})
+        return {code: names[code] or code for code in codes}
+
+    def resolve_many(self, codes: Iterable[str], timeout: float = 60) -> Dict[str, Optional[str]]:
+        """여러 종목명 조회 - 하위 계층까지 한 번에 기다림 (못 찾은 종목은 None)"""
+        codes = [normalize_code(code) for code in codes]
+        self.get_names(codes, wait=True, timeout=timeout)
+        return {code: self._lookup(code) for code in codes}
+
+    def resolve(self, code: str, timeout: float = 10) -> Optional[str]:
+        """종목명 조회 - 하위 계층까지 기다림 (끝내 못 찾으면 None)"""
+        code = normalize_code(code)
+        self.get_names([code], wait=True, timeout=timeout)
+        return self._lookup(code)
+
+    def prefetch(self, codes: Iterable[str]) -> List[Future]:
+        """메모리에 없는 종목을 한 작업으로 묶어 백그라운드 조회 예약"""
+        now = time.time()
+        futures = []
+        batch = []
+        with self._lock:
+            for code in dict.fromkeys(normalize_code(code) for code in codes):
+                if self._lookup(code) is not None:
+                    continue
+                if code in self._inflight:
+                    futures.append(self._inflight[code])
+                elif now - self._misses.get(code, 0) >= self.miss_ttl:
+                    batch.append(code)
+
+            future = None
+            if batch:
+                future = self._executor.submit(self._resolve_batch, batch)
+                for code in batch:
+                    self._inflight[code] = future
+                futures.append(future)
+
+        # 이미 끝난 작업이면 콜백이 바로 실행되므로 잠금 밖에서 등록
+        if future is not None:
+            future.add_done_callback(lambda _: self._clear_inflight(batch))
+        return list(dict.fromkeys(futures))
+
+    def _clear_inflight(self, codes: List[str]):
+        with self._lock:
+            for code in codes:
+                self._inflight.pop(code, None)
+
+    def _resolve_batch(self, codes: List[str]) -> Dict[str, str]:
+        """Firestore(get_all 1회) → 네이버 순으로 조회, 찾은 이름은 로컬 캐시와 Firestore에 기록"""
+        found = self._read_firestore(codes)
+        fetched = self._fetch_many([code for code in codes if code not in found])
+
+        found.update(fetched)
+        self.update(found)
+        self.local_cache.put_many(found)
+        with self._lock:
+            now = time.time()
+            for code in codes:
+                if code not in found:
+                    self._misses[code] = now
+
+        if fetched:
+            self._write_firestore(fetched)
+        return found
+
+    def _fetch_one(self, code: str) -> Optional[str]:
+        self.naver_bucket.acquire()
+        return self.fetcher(code)
+
+    def _fetch_many(self, codes: List[str]) -> Dict[str, str]:
+        """네이버 병렬 조회 (동시 naver_workers건, 초당 naver_rate건)"""
+        fetched = {}
+        for code, name in zip(codes, self._fetch_pool.map(self._fetch_one, codes)):
+            if name:
+                fetched[code] = name
+                print(f"✅ 새 종목 발견: {code} → {name}")
+        return fetched
+
+    def _read_firestore(self, codes: List[str]) -> Dict[str, str]:
+        db = self.db
+        if db is None:
+            return {}
+        try:
+            collection = db.collection(NAME_COLLECTION)
+            snapshots = db.get_all([collection.document(code) for code in codes])
+            found = {}
+            for snapshot in snapshots:
+                if snapshot.exists:
+                    name = (snapshot.to_dict() or {}).get('name')
+                    if name:
+                        found[snapshot.id] = name
+            return found
+        except Exception as e:
+            print(f"⚠️ Firestore 종목명 조회 실패: {e}")
+            return {}
+
+    def _write_firestore(self, names: Dict[str, str]):
+        db = self.db
+        if db is None:
+            return
+        try:
+            collection = db.collection(NAME_COLLECTION)
+            commit_in_batches(db, [
+                ('set', collection.document(code), {
+                    'code': code,
+                    'name': name,
+                    'updated_at': firestore.SERVER_TIMESTAMP
+                }) for code, name in names.items()
+            ])
+        except Exception as e:
+            print(f"⚠️ Firestore 종목명 저장 실패: {e}")
+
+    def __contains__(self, code) -> bool:
+        return self._lookup(normalize_code(code)) is not None
+
+    def __len__(self) -> int:
+        return len(self._names) + (len(self.master) if self.master is not None else 0)
+
+
+def _needs_name(item: Dict, code: str) -> bool:
+    name = item.get('name')
+    return not name or name == code
+
+
+def update_names_in_firestore(db, index: Optional[StockNameIndex] = None,
+                              only_missing: bool = True, timeout: float = 120) -> List[Tuple[str, str]]:
+    """포트폴리오 / market_scan 종목명 일괄 갱신
+
+    1. 이름이 필요한 종목코드를 모두 모은 뒤
+    2. 인덱스로 한 번에 조회 (메모리 → Firestore get_all → 네이버 병렬)
+    3. 실제로 바뀌는 이름만 배치 커밋으로 기록
+
+    Args:
+        only_missing: True면 이름이 없거나 코드와 같은 종목만, False면 이름이 다른 종목 모두
+
+    Returns:
+        갱신한 (종목코드, 종목명) 목록
+    """
+    index = index or get_stock_name_index()
+
+    portfolio = {doc.id: doc.to_dict() or {} for doc in db.collection('portfolio').stream()}
+    scan_ref = db.collection('market_scan').document('latest')
+    scan_doc = scan_ref.get()
+    stocks = (scan_doc.to_dict() or {}).get('stocks', []) if scan_doc.exists else []
+
+    targets = [(code, data) for code, data in portfolio.items()
+               if not only_missing or _needs_name(data, code)]
+    scan_targets = [stock for stock in stocks
+                    if stock.get('code') and (not only_missing or _needs_name(stock, stock['code']))]
+    wanted = [code for code, _ in targets] + [stock['code'] for stock in scan_targets]
+    names = index.resolve_many(dict.fromkeys(wanted), timeout=timeout) if wanted else {}
+
+    updated = []
+    ops = []
+    for code, data in targets:
+        name = names.get(normalize_code(code))
+        if name and data.get('name') != name:
+            ops.append(('update', db.collection('portfolio').document(code), {'name': name}))
+            updated.append((code, name))
+
+    scan_changed = False
+    for stock in scan_targets:
+        name = names.get(normalize_code(stock['code']))
+        if name and stock.get('name') != name:
+            stock['name'] = name
+            scan_changed = True
+            updated.append((stock['code'], name))
+    if scan_changed:
+        ops.append(('update', scan_ref, {'stocks': stocks}))
+
+    if ops:
+        commit_in_batches(db, ops)
+    return updated
+
+
+_index: Optional[StockNameIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_stock_name_index() -> StockNameIndex:
+    """프로세스 내 공유 종목명 인덱스 반환 (최초 호출 시 1회 로드)"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = StockNameIndex()
+        return _index
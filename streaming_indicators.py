@@ -0,0 +1,396 @@
+"""
+증분(스트리밍) 기술적 지표
+- 새 봉/틱 하나를 O(1)로 반영하고 현재 지표값을 바로 제공
+- TechnicalAnalyzer와 같은 정의 (단순평균 RSI, adjust=True EMA 기반 MACD, 표본표준편차 볼린저, MFI)
+- snapshot()/restore()로 재시작 후에도 상태 유지
+"""
+
+import os
+import json
+from collections import deque
+from typing import Optional, Dict, Any
+
+import pandas as pd
+
+
+class RollingWindow:
+    """고정 길이 창의 합계/제곱합을 O(1)로 유지
+
+    값이 전부 0인 창을 정확히 0으로 판단하기 위해 0이 아닌 값의 개수도 함께 센다.
+    제곱합은 기준값(shift)을 뺀 값으로 누적해 큰 가격대에서의 자릿수 손실을 줄인다.
+    """
+
+    def __init__(self, size: int, shift: Optional[float] = None):
+        self.size = size
+        self.shift = shift
+        self.values = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.nonzero = 0
+
+    def _add(self, x: float, sign: int):
+        if self.shift is None:
+            self.shift = x
+        centered = x - self.shift
+        self.total += sign * centered
+        self.total_sq += sign * centered * centered
+        if x != 0:
+            self.nonzero += sign
+
+    def push(self, x: float):
+        """새 값 추가 (창이 가득 차면 가장 오래된 값 제거)"""
+        if len(self.values) == self.size:
+            self._add(self.values.popleft(), -1)
+        self.values.append(x)
+        self._add(x, 1)
+
+    def replace_last(self, x: float):
+        """마지막 값 교체 (진행 중인 봉의 틱 갱신)"""
+        self._add(self.values[-1], -1)
+        self.values[-1] = x
+        self._add(x, 1)
+
+    def full(self) -> bool:
+        return len(self.values) == self.size
+
+    def sum(self) -> float:
+        if self.nonzero == 0:
+            return 0.0
+        return self.total + self.shift * len(self.values)
+
+    def mean(self) -> float:
+        return self.sum() / len(self.values)
+
+    def sample_std(self) -> float:
+        n = len(self.values)
+        variance = (self.total_sq - self.total * self.total / n) / (n - 1)
+        return max(variance, 0.0) ** 0.5
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'size': self.size, 'shift': self.shift, 'values': list(self.values)}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> 'RollingWindow':
+        window = cls(data['size'], data['shift'])
+        for x in data['values']:
+            window.push(x)
+        return window
+
+
+class StreamingEMA:
+    """pandas ewm(span).mean() (adjust=True)과 같은 증분 EMA"""
+
+    def __init__(self, span: int):
+        self.span = span
+        self.decay = 1 - 2 / (span + 1)
+        self.numerator = 0.0
+        self.denominator = 0.0
+        self._prev = (0.0, 0.0)  # 마지막 봉 반영 전 상태 (틱 교체용)
+
+    def push(self, x: float):
+        self._prev = (self.numerator, self.denominator)
+        self.numerator = self.numerator * self.decay + x
+        self.denominator = self.denominator * self.decay + 1
+
+    def replace_last(self, x: float):
+        numerator, denominator = self._prev
+        self.numerator = numerator * self.decay + x
+        self.denominator = denominator * self.decay + 1
+
+    @property
+    def value(self) -> float:
+        return self.numerator / self.denominator if self.denominator else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'span': self.span, 'numerator': self.numerator,
+                'denominator': self.denominator, 'prev': list(self._prev)}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> 'StreamingEMA':
+        ema = cls(data['span'])
+        ema.numerator = data['numerator']
+        ema.denominator = data['denominator']
+        ema._prev = tuple(data['prev'])
+        return ema
+
+
+class StreamingRSI:
+    """RSI - 최근 period개 상승폭/하락폭의 단순평균"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.gains = RollingWindow(period, shift=0.0)
+        self.losses = RollingWindow(period, shift=0.0)
+        self.count = 0
+        self.last_close: Optional[float] = None
+        self.prev_close: Optional[float] = None  # 마지막 봉 직전 종가 (틱 교체용)
+
+    def _delta_parts(self, close: float):
+        delta = close - self.prev_close
+        return (delta if delta > 0 else 0.0), (-delta if delta < 0 else 0.0)
+
+    def update(self, close: float, new_bar: bool = True):
+        if new_bar:
+            self.count += 1
+            self.prev_close, self.last_close = self.last_close, close
+            if self.prev_close is not None:
+                gain, loss = self._delta_parts(close)
+                self.gains.push(gain)
+                self.losses.push(loss)
+        else:
+            self.last_close = close
+            if self.prev_close is not None:
+                gain, loss = self._delta_parts(close)
+                self.gains.replace_last(gain)
+                self.losses.replace_last(loss)
+
+    @property
+    def value(self) -> float:
+        if self.count < self.period + 1:
+            return 50.0
+        gain = self.gains.mean()
+        loss = self.losses.mean()
+        if loss == 0:
+            return 50.0 if gain == 0 else 100.0
+        return 100 - (100 / (1 + gain / loss))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'period': self.period, 'count': self.count,
+                'last_close': self.last_close, 'prev_close': self.prev_close,
+                'gains': self.gains.snapshot(), 'losses': self.losses.snapshot()}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> 'StreamingRSI':
+        rsi = cls(data['period'])
+        rsi.count = data['count']
+        rsi.last_close = data['last_close']
+        rsi.prev_close = data['prev_close']
+        rsi.gains = RollingWindow.restore(data['gains'])
+        rsi.losses = RollingWindow.restore(data['losses'])
+        return rsi
+
+
+class StreamingMACD:
+    """MACD (12/26 EMA, 시그널 9 EMA)"""
+
+    def __init__(self):
+        self.ema12 = StreamingEMA(12)
+        self.ema26 = StreamingEMA(26)
+        self.signal_ema = StreamingEMA(9)
+        self.count = 0
+
+    def update(self, close: float, new_bar: bool = True):
+        if new_bar:
+            self.count += 1
+            self.ema12.push(close)
+            self.ema26.push(close)
+            self.signal_ema.push(self.ema12.value - self.ema26.value)
+        else:
+            self.ema12.replace_last(close)
+            self.ema26.replace_last(close)
+            self.signal_ema.replace_last(self.ema12.value - self.ema26.value)
+
+    @property
+    def value(self) -> Dict[str, float]:
+        if self.count < 26:
+            return {'macd': 0, 'signal': 0, 'histogram': 0}
+        macd = self.ema12.value - self.ema26.value
+        signal = self.signal_ema.value
+        return {'macd': macd, 'signal': signal, 'histogram': macd - signal}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'count': self.count, 'ema12': self.ema12.snapshot(),
+                'ema26': self.ema26.snapshot(), 'signal': self.signal_ema.snapshot()}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> 'StreamingMACD':
+        macd = cls()
+        macd.count = data['count']
+        macd.ema12 = StreamingEMA.restore(data['ema12'])
+        macd.ema26 = StreamingEMA.restore(data['ema26'])
+        macd.signal_ema = StreamingEMA.restore(data['signal'])
+        return macd
+
+
+class StreamingBollinger:
+    """볼린저 밴드 (기간 이동평균 ± 2 × 표본표준편차)"""
+
+    def __init__(self, period: int = 20):
+        self.period = period
+        self.closes = RollingWindow(period)
+
+    def update(self, close: float, new_bar: bool = True):
+        if new_bar:
+            self.closes.push(close)
+        else:
+            self.closes.replace_last(close)
+
+    @property
+    def value(self) -> Dict[str, float]:
+        if not self.closes.full():
+            return {'upper': 0, 'middle': 0, 'lower': 0}
+        middle = self.closes.mean()
+        std = self.closes.sample_std()
+        return {'upper': middle + std * 2, 'middle': middle, 'lower': middle - std * 2}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'period': self.period, 'closes': self.closes.snapshot()}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> 'StreamingBollinger':
+        bollinger = cls(data['period'])
+        bollinger.closes = RollingWindow.restore(data['closes'])
+        return bollinger
+
+
+class StreamingMFI:
+    """MFI - 최근 period개 양/음 자금흐름 합계"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.positive = RollingWindow(period, shift=0.0)
+        self.negative = RollingWindow(period, shift=0.0)
+        self.count = 0
+        self.last_tp: Optional[float] = None
+        self.prev_tp: Optional[float] = None
+
+    def _flow_parts(self, typical_price: float, volume: float):
+        money_flow = typical_price * volume
+        if self.prev_tp is None:
+            return 0.0, 0.0
+        if typical_price > self.prev_tp:
+            return money_flow, 0.0
+        if typical_price < self.prev_tp:
+            return 0.0, money_flow
+        return 0.0, 0.0
+
+    def update(self, high: float, low: float, close: float, volume: float, new_bar: bool = True):
+        typical_price = (high + low + close) / 3
+        if new_bar:
+            self.count += 1
+            self.prev_tp, self.last_tp = self.last_tp, typical_price
+            positive, negative = self._flow_parts(typical_price, volume)
+            self.positive.push(positive)
+            self.negative.push(negative)
+        else:
+            self.last_tp = typical_price
+            positive, negative = self._flow_parts(typical_price, volume)
+            self.positive.replace_last(positive)
+            self.negative.replace_last(negative)
+
+    @property
+    def value(self) -> float:
+        if self.count < self.period + 1:
+            return 50.0
+        positive = self.positive.sum()
+        negative = self.negative.sum()
+        if negative == 0:
+            return 50.0 if positive == 0 else 100.0
+        return 100 - (100 / (1 + positive / negative))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'period': self.period, 'count': self.count,
+                'last_tp': self.last_tp, 'prev_tp': self.prev_tp,
+                'positive': self.positive.snapshot(), 'negative': self.negative.snapshot()}
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> 'StreamingMFI':
+        mfi = cls(data['period'])
+        mfi.count = data['count']
+        mfi.last_tp = data['last_tp']
+        mfi.prev_tp = data['prev_tp']
+        mfi.positive = RollingWindow.restore(data['positive'])
+        mfi.negative = RollingWindow.restore(data['negative'])
+        return mfi
+
+
+class IndicatorState:
+    """종목 하나의 RSI/MACD/볼린저/MFI 상태 묶음"""
+
+    def __init__(self):
+        self.rsi = StreamingRSI()
+        self.macd = StreamingMACD()
+        self.bollinger = StreamingBollinger()
+        self.mfi = StreamingMFI()
+        self.last_date: Optional[str] = None
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame) -> 'IndicatorState':
+        """일봉 이력(get_daily_price_history 결과)으로 초기 상태 구성"""
+        state = cls()
+        if df is not None:
+            for row in df.itertuples(index=False):
+                state.update(row.close, row.high, row.low, row.volume, date=str(row.date.date()))
+        return state
+
+    def update(self, close: float, high: float, low: float, volume: float,
+               date: Optional[str] = None, new_bar: Optional[bool] = None):
+        """봉/틱 반영 - new_bar 미지정 시 date가 마지막 봉과 같으면 틱(마지막 봉 교체)으로 처리
+        - 봉이 하나도 없으면 틱도 첫 봉으로 처리 (교체할 마지막 봉이 없음)
+        """
+        if new_bar is None:
+            new_bar = date is None or date != self.last_date
+        if self.rsi.count == 0:
+            new_bar = True
+        if date is not None:
+            self.last_date = date
+
+        self.rsi.update(close, new_bar)
+        self.macd.update(close, new_bar)
+        self.bollinger.update(close, new_bar)
+        self.mfi.update(high, low, close, volume, new_bar)
+
+    def values(self) -> Dict[str, float]:
+        """현재 지표값 (analyze_stock_with_indicators와 같은 키)"""
+        macd = self.macd.value
+        bollinger = self.bollinger.value
+        return {
+            'rsi': self.rsi.value,
+            'mfi': self.mfi.value,
+            'macd': macd['macd'],
+            'macd_signal': macd['signal'],
+            'macd_histogram': macd['histogram'],
+            'bollinger_upper': bollinger['upper'],
+            'bollinger_middle': bollinger['middle'],
+            'bollinger_lower': bollinger['lower']
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'last_date': self.last_date,
+            'rsi': self.rsi.snapshot(),
+            'macd': self.macd.snapshot(),
+            'bollinger': self.bollinger.snapshot(),
+            'mfi': self.mfi.snapshot()
+        }
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> 'IndicatorState':
+        state = cls()
+        state.last_date = data['last_date']
+        state.rsi = StreamingRSI.restore(data['rsi'])
+        state.macd = StreamingMACD.restore(data['macd'])
+        state.bollinger = StreamingBollinger.restore(data['bollinger'])
+        state.mfi = StreamingMFI.restore(data['mfi'])
+        return state
+
+
+def save_states(states: Dict[str, IndicatorState], path: str = "indicator_state.json"):
+    """종목별 상태 저장 (임시 파일 기록 후 rename)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({code: state.snapshot() for code, state in states.items()}, f)
+    os.replace(tmp_path, path)
+
+
+def load_states(path: str = "indicator_state.json") -> Dict[str, IndicatorState]:
+    """저장된 종목별 상태 복원 (파일이 없거나 깨졌으면 빈 dict)"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {code: IndicatorState.restore(snapshot) for code, snapshot in data.items()}
+    except Exception as e:
+        print(f"⚠️ 지표 상태 복원 실패: {e}")
+        return {}
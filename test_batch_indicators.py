@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""일괄 지표 계산(batch_indicators) 검증 - TechnicalAnalyzer 결과와 비교 (API 호출 없음)"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from main import TechnicalAnalyzer
+import batch_indicators
+
+
+def make_history(bars: int, seed: int) -> pd.DataFrame:
+    """랜덤 일봉 데이터 생성"""
+    rng = np.random.default_rng(seed)
+    close = np.round(10000 + rng.normal(0, 150, bars).cumsum(), -1)
+    spread = np.abs(rng.normal(0, 80, bars))
+    return pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=bars),
+        'close': close,
+        'high': close + spread,
+        'low': close - spread,
+        'volume': rng.integers(10000, 500000, bars).astype(float)
+    })
+
+
+def analyze_one(df: pd.DataFrame) -> dict:
+    """종목 1개를 기존 TechnicalAnalyzer로 계산"""
+    analyzer = TechnicalAnalyzer
+    macd = analyzer.calculate_macd(df)
+    bollinger = analyzer.calculate_bollinger_bands(df)
+    return {
+        'rsi': analyzer.calculate_rsi(df),
+        'mfi': analyzer.calculate_mfi(df),
+        'macd': macd['macd'],
+        'macd_signal': macd['signal'],
+        'macd_histogram': macd['histogram'],
+        'bollinger_upper': bollinger['upper'],
+        'bollinger_middle': bollinger['middle'],
+        'bollinger_lower': bollinger['lower']
+    }
+
+
+def test_batch_matches_technical_analyzer():
+    """길이가 서로 다른 종목들을 한 패널로 계산해도 종목별 계산과 같은 값"""
+    lengths = [0, 5, 14, 15, 20, 25, 26, 30, 60, 150]
+    histories = {f"{i:06d}": make_history(bars, i) if bars else None for i, bars in enumerate(lengths)}
+
+    batch = batch_indicators.calculate_for_histories(histories)
+
+    for code, df in histories.items():
+        expected = analyze_one(df)
+        for name, value in expected.items():
+            assert np.isclose(batch[code][name], value, rtol=1e-9, atol=1e-9), \
+                f"{code} {name}: batch={batch[code][name]!r} analyzer={value!r}"
+
+
+def benchmark_batch(symbols: int = 500, bars: int = 30):
+    """전 종목 스캔 규모 속도 비교"""
+    histories = {f"{i:06d}": make_history(bars, i) for i in range(symbols)}
+
+    start = time.perf_counter()
+    for df in histories.values():
+        analyze_one(df)
+    per_symbol = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_indicators.calculate_for_histories(histories)
+    batch = time.perf_counter() - start
+
+    print(f"⏱️ {symbols}종목 × {bars}봉: 종목별 {per_symbol * 1000:.1f}ms | 일괄 {batch * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    test_batch_matches_technical_analyzer()
+    print("✅ 일괄 계산 결과가 TechnicalAnalyzer와 일치")
+    benchmark_batch()
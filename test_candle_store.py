@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""일봉 로컬 저장소(candle_store) 검증 - 가짜 일봉 API로 조회 횟수/구간 확인 (API 호출 없음)"""
+
+import os
+import sys
+import json
+import tempfile
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from candle_store import CandleStore, KST
+
+
+class FakeDailyApi:
+    """영업일(평일)마다 봉이 있는 가짜 일봉 API - 당일 봉은 조회 시각에 따라 값이 바뀜"""
+
+    def __init__(self):
+        self.calls = []
+        self.now = None
+
+    def bar(self, day: pd.Timestamp) -> dict:
+        base = 10000 + day.dayofyear * 10
+        close = base + (self.now.hour * 7 if day.date() == self.now.date() else 0)
+        return {'date': day, 'close': float(close), 'high': close + 50.0,
+                'low': close - 50.0, 'volume': float(base * 3)}
+
+    def fetch(self, code: str, start: str, end: str) -> pd.DataFrame:
+        self.calls.append((start, end))
+        days = pd.bdate_range(start, min(pd.Timestamp(end), pd.Timestamp(self.now.date())))
+        if self.now.hour < 9:
+            days = days[days.date < self.now.date()]
+        return pd.DataFrame([self.bar(d) for d in days], columns=['date', 'close', 'high', 'low', 'volume'])
+
+    def full_history(self, days: int = 30) -> pd.DataFrame:
+        end = pd.Timestamp(self.now.date())
+        return self.fetch('', (end - pd.Timedelta(days=days)).strftime("%Y%m%d"), end.strftime("%Y%m%d"))
+
+
+def kst(*args) -> datetime:
+    return KST.localize(datetime(*args))
+
+
+def test_only_missing_tail_is_fetched():
+    api = FakeDailyApi()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CandleStore(tmp)
+
+        # 첫 조회: 30일 전체
+        api.now = kst(2025, 3, 4, 18, 0)
+        df = store.get_history('005930', 30, api.fetch, now=api.now)
+        assert api.calls == [('20250202', '20250304')]
+        expected = api.full_history()
+        api.calls.clear()
+        assert np.allclose(df[['close', 'high', 'low', 'volume']], expected[['close', 'high', 'low', 'volume']])
+
+        # 같은 날 장 마감 후 재조회: API 호출 없음
+        api.now = kst(2025, 3, 4, 20, 0)
+        store.get_history('005930', 30, api.fetch, now=api.now)
+        assert api.calls == []
+
+        # 다음 날 장 마감 후: 빠진 하루만 조회
+        api.now = kst(2025, 3, 5, 16, 0)
+        df = store.get_history('005930', 30, api.fetch, now=api.now)
+        assert api.calls == [('20250305', '20250305')]
+        assert df['date'].iloc[-1] == pd.Timestamp('2025-03-05')
+        assert list(df['date']) == list(api.full_history()['date'])
+
+
+def test_intraday_bar_from_live_quote():
+    api = FakeDailyApi()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CandleStore(tmp)
+        api.now = kst(2025, 3, 4, 18, 0)
+        store.get_history('005930', 30, api.fetch, now=api.now)
+        api.calls.clear()
+
+        # 다음 날 장중: 지난 봉은 전날 저녁에 받아 두었으므로 현재가로 당일 봉만 구성
+        api.now = kst(2025, 3, 5, 10, 0)
+        quote = {'current_price': 12345.0, 'high_price': 12400.0, 'low_price': 12000.0, 'volume': 777}
+        df = store.get_history('005930', 30, api.fetch, live_quote=quote, now=api.now)
+        assert api.calls == []
+        last = df.iloc[-1]
+        assert last['date'] == pd.Timestamp('2025-03-05') and last['close'] == 12345.0
+        assert (last['high'], last['low'], last['volume']) == (12400.0, 12000.0, 777.0)
+
+        # 시세가 없으면 당일분만 조회하고 저장하지 않음
+        df = store.get_history('005930', 30, api.fetch, now=api.now)
+        assert api.calls == [('20250305', '20250305')]
+        assert df['close'].iloc[-1] == api.bar(pd.Timestamp('2025-03-05'))['close']
+        assert store.load('005930')['date'][-1] == 20250304
+
+
+def test_holiday_and_restart():
+    """데이터가 없는 구간도 조회 시각을 기록하고, 새 인스턴스(재시작)도 디스크에서 제공"""
+    api = FakeDailyApi()
+    with tempfile.TemporaryDirectory() as tmp:
+        api.now = kst(2025, 3, 4, 18, 0)
+        CandleStore(tmp).get_history('005930', 30, api.fetch, now=api.now)
+
+        calls = []
+
+        def holiday_fetch(code, start, end):
+            calls.append((start, end))
+            return pd.DataFrame(columns=['date', 'close', 'high', 'low', 'volume'])
+
+        store = CandleStore(tmp)
+        store.get_history('005930', 30, holiday_fetch, now=kst(2025, 3, 5, 16, 0))
+        df = store.get_history('005930', 30, holiday_fetch, now=kst(2025, 3, 5, 17, 0))
+        assert calls == [('20250305', '20250305')]  # 휴일 구간 1회 조회(빈 결과) 이후 재조회 없음
+        assert df['date'].iloc[-1] == pd.Timestamp('2025-03-04')
+
+
+def test_coverage_merged_across_processes():
+    """두 인스턴스(프로세스)가 따로 기록해도 coverage.json에 양쪽 종목이 모두 남음"""
+    api = FakeDailyApi()
+    with tempfile.TemporaryDirectory() as tmp:
+        api.now = kst(2025, 3, 4, 18, 0)
+        first, second = CandleStore(tmp), CandleStore(tmp)
+        first.get_history('005930', 30, api.fetch, now=api.now)
+        second.get_history('000660', 30, api.fetch, now=api.now)
+
+        with open(os.path.join(tmp, 'coverage.json')) as f:
+            assert set(json.load(f)) == {'005930', '000660'}
+        assert not [name for name in os.listdir(tmp) if name.endswith('.tmp')]
+
+        api.calls.clear()
+        restarted = CandleStore(tmp)
+        for code in ('005930', '000660'):
+            restarted.get_history(code, 30, api.fetch, now=kst(2025, 3, 4, 19, 0))
+        assert api.calls == []
+
+
+if __name__ == "__main__":
+    test_only_missing_tail_is_fetched()
+    test_intraday_bar_from_live_quote()
+    test_holiday_and_restart()
+    test_coverage_merged_across_processes()
+    print("✅ 일봉 저장소: 빠진 구간만 조회")
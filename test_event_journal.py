@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""이벤트 저널(event_journal) 검증 - 기록/조회/요약 및 로거 연동 (슬랙 전송 없음)"""
+
+import io
+import os
+import sys
+import time
+import tempfile
+import contextlib
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from event_journal import EventJournal, kst
+from logger_system import UnifiedLogger
+
+
+def test_query_by_level_code_and_time():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = EventJournal(os.path.join(tmp, 'events.db'))
+        base = kst.localize(datetime(2025, 3, 4, 9, 0))
+        journal.record_many([
+            (base.timestamp(), 'TRADE', '매수 완료: 삼성전자',
+             {'code': '005930', 'quantity': 7, 'price': 71000, 'signal': ['RSI 과매도', '거래량 급증']}),
+            ((base + timedelta(hours=1)).timestamp(), 'TRADE', '매도 완료: 카카오',
+             {'stock_code': '035720', 'quantity': 3, 'current_price': 40000.0, 'reason': '익절 (5.10%)'}),
+            ((base + timedelta(days=1)).timestamp(), 'ERROR', '매매 실행 중 오류', None),
+        ])
+
+        trades = journal.query(level='TRADE')
+        assert [t['code'] for t in trades] == ['035720', '005930']  # 최신순
+        assert trades[1]['reason'] == 'RSI 과매도, 거래량 급증' and trades[1]['price'] == 71000.0
+
+        assert [e['message'] for e in journal.query(code='005930')] == ['매수 완료: 삼성전자']
+        same_day = journal.query(start=base, end=base + timedelta(hours=12))
+        assert len(same_day) == 2
+
+        assert journal.level_counts('20250304') == {'TRADE': 2}
+        assert journal.level_counts('20250305') == {'ERROR': 1}
+        assert [e['message'] for e in journal.recent('20250304')] == ['매수 완료: 삼성전자', '매도 완료: 카카오']
+
+
+def test_logger_summary_from_journal_after_restart():
+    """재시작 후에도 JSON 로그를 다시 읽지 않고 저널에서 당일 요약"""
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            logger = UnifiedLogger(log_dir=tmp, slack_enabled=False)
+            for i in range(5):
+                logger.trade(f"매수 완료 {i}", {'code': f"00000{i}", 'quantity': i + 1, 'price': 1000 * (i + 1)})
+            logger.close()
+
+            os.remove(logger.json_log_file)  # 요약은 저널만으로 계산돼야 함
+            restarted = UnifiedLogger(log_dir=tmp, slack_enabled=False)
+            summary = restarted.get_logs_summary()
+            restarted.close()
+
+        assert summary['level_counts'] == {'INFO': 2, 'TRADE': 5}
+        assert summary['recent_logs'][-1]['message'] == '통합 로깅 시스템 초기화 완료'
+        assert summary['recent_logs'][-2]['data']['code'] == '000004'
+
+
+def test_logger_summary_includes_other_processes():
+    """같은 저널을 쓰는 다른 프로세스(로거)의 로그도 요약에 반영"""
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = UnifiedLogger(log_dir=tmp, slack_enabled=False)
+            second = UnifiedLogger(log_dir=tmp, slack_enabled=False)
+            first.get_logs_summary()  # 당일 상태를 먼저 읽어 둔 뒤
+            second.trade("매도 완료: 카카오", {'code': '035720'})
+            second.flush()
+            summary = first.get_logs_summary()
+            first.close()
+            second.close()
+
+        assert summary['level_counts'] == {'INFO': 2, 'TRADE': 1} and summary['total_logs'] == 3
+        assert summary['recent_logs'][-1]['message'] == '매도 완료: 카카오'
+
+
+def benchmark_journal(events: int = 100000):
+    """대량 기록 후 종목별 조회 속도"""
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = EventJournal(os.path.join(tmp, 'events.db'))
+        start_ts = kst.localize(datetime(2025, 1, 2, 9, 0)).timestamp()
+        journal.record_many(
+            (start_ts + i * 60, 'TRADE' if i % 5 == 0 else 'INFO', f"이벤트 {i}",
+             {'code': f"{i % 500:06d}", 'price': 1000 + i, 'quantity': 1})
+            for i in range(events))
+
+        start = time.perf_counter()
+        rows = journal.query(level='TRADE', code='000100', limit=1000)
+        elapsed = time.perf_counter() - start
+        print(f"⏱️ {events}건 중 종목+레벨 조회 {len(rows)}건: {elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    test_query_by_level_code_and_time()
+    test_logger_summary_from_journal_after_restart()
+    test_logger_summary_includes_other_processes()
+    print("✅ 이벤트 저널 기록/조회 정상")
+    benchmark_journal()
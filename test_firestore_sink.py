@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Firestore 쓰기 모음 전송(firestore_sink) 검증 - 메모리 가짜 Firestore 사용 (Firebase 접속 없음)"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from firestore_sink import FirestoreWriteSink
+from test_firestore_sync import FakeDB
+
+
+def test_repeated_updates_are_merged():
+    """같은 문서의 반복 갱신은 필드 병합 후 1건으로 기록"""
+    db = FakeDB()
+    db.data['portfolio'] = {'005930': {'name': '삼성전자', 'current_price': 1}}
+    sink = FirestoreWriteSink(db, flush_interval=60)
+    ref = db.collection('portfolio').document('005930')
+
+    for price in range(100, 110):
+        sink.update(ref, {'current_price': price, 'profit_rate': price / 100})
+    sink.update(ref, {'volume': 5})
+    sink.set(db.collection('system').document('status'), {'status': 'running'}, merge=True)
+
+    assert sink.flush() == 2 and db.writes == 2 and db.commits == 1
+    assert db.data['portfolio']['005930'] == {'name': '삼성전자', 'current_price': 109,
+                                              'profit_rate': 1.09, 'volume': 5}
+    assert db.data['system']['status'] == {'status': 'running'}
+    sink.close()
+
+
+def test_size_threshold_and_failed_doc():
+    """대기 문서가 한도를 넘으면 바로 전송, 삭제된 문서 update 실패가 다른 문서를 막지 않음"""
+    db = FakeDB()
+    db.data['watchlist'] = {f"{i:06d}": {} for i in range(1, 10)}
+    sink = FirestoreWriteSink(db, flush_interval=60, max_pending=10)
+
+    sink.update(db.collection('watchlist').document('999999'), {'current_price': 1})  # 없는 문서
+    for i in range(1, 10):
+        sink.update(db.collection('watchlist').document(f"{i:06d}"), {'current_price': i})
+
+    deadline = time.time() + 2
+    while sink.stats['written'] + sink.stats['failed'] < 10 and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert sink.stats['written'] == 9 and sink.stats['failed'] == 1
+    assert all(doc['current_price'] == int(code) for code, doc in db.data['watchlist'].items())
+    sink.close()
+
+
+if __name__ == "__main__":
+    test_repeated_updates_are_merged()
+    test_size_threshold_and_failed_doc()
+    print("✅ 쓰기 모음 전송: 문서별 병합 후 배치 커밋")
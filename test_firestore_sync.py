@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Firestore 차분 동기화(firestore_sync) 검증 - 메모리 가짜 Firestore로 쓰기 건수 확인 (Firebase 접속 없음)"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from firebase_admin import firestore
+from firestore_sync import FirestoreDiffSync
+
+
+class FakeDoc:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeRef:
+    def __init__(self, store, doc_id, collection=''):
+        self.store = store
+        self.id = doc_id
+        self.path = f"{collection}/{doc_id}"
+
+
+class FakeCollection:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+        self.store = db.data.setdefault(name, {})
+
+    def stream(self):
+        self.db.reads += 1
+        return [FakeDoc(doc_id, data) for doc_id, data in self.store.items()]
+
+    def document(self, doc_id):
+        return FakeRef(self.store, doc_id, self.name)
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self.db = db
+        self.ops = []
+
+    def set(self, ref, data, merge=False):
+        if merge:
+            self.ops.append(lambda: ref.store.setdefault(ref.id, {}).update(data))
+        else:
+            self.ops.append(lambda: ref.store.__setitem__(ref.id, dict(data)))
+
+    def update(self, ref, data):
+        def apply():
+            if ref.id not in ref.store:
+                raise KeyError(f"No document to update: {ref.path}")
+            doc = ref.store[ref.id]
+            for key, value in data.items():
+                if value is firestore.DELETE_FIELD:
+                    doc.pop(key, None)
+                else:
+                    doc[key] = value
+        self.ops.append(apply)
+
+    def delete(self, ref):
+        self.ops.append(lambda: ref.store.pop(ref.id, None))
+
+    def commit(self):
+        assert len(self.ops) <= 500
+        # 원자적 커밋 흉내 - 하나라도 실패하면 아무것도 반영하지 않음
+        snapshot = {name: {k: dict(v) for k, v in docs.items()} for name, docs in self.db.data.items()}
+        try:
+            for op in self.ops:
+                op()
+        except Exception:
+            for name, docs in snapshot.items():
+                self.db.data[name].clear()
+                self.db.data[name].update(docs)
+            raise
+        self.db.commits += 1
+        self.db.writes += len(self.ops)
+
+
+class FakeDB:
+    def __init__(self):
+        self.data = {}
+        self.reads = self.writes = self.commits = 0
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def batch(self):
+        return FakeBatch(self)
+
+
+def holding(code, price):
+    return {'code': code, 'name': f"종목{code}", 'quantity': 10, 'current_price': price}
+
+
+def test_only_changes_are_written():
+    db = FakeDB()
+    db.data['portfolio'] = {'000001': holding('000001', 100), '000009': holding('000009', 900)}
+    sync = FirestoreDiffSync(db, 'portfolio')
+
+    docs = {code: holding(code, 100) for code in ('000001', '000002', '000003')}
+    counts = sync.sync(docs, touch={'last_updated': 'ts'})
+    assert (counts['created'], counts['updated'], counts['deleted'], counts['unchanged']) == (2, 0, 1, 1)
+    assert counts['writes'] == 3 and '000009' not in db.data['portfolio']
+
+    # 같은 상태 재동기화: 쓰기/조회 없음
+    counts = sync.sync(docs, touch={'last_updated': 'ts2'})
+    assert counts['writes'] == 0 and db.reads == 1
+
+    # 가격 하나만 변경: 해당 필드만 update
+    docs['000002'] = holding('000002', 120)
+    db.writes = 0
+    counts = sync.sync(docs, touch={'last_updated': 'ts3'})
+    assert counts['updated'] == 1 and db.writes == 1
+    assert db.data['portfolio']['000002'] == {**holding('000002', 120), 'last_updated': 'ts3'}
+    assert db.data['portfolio']['000003']['last_updated'] == 'ts'
+    assert 'last_updated' not in db.data['portfolio']['000001']  # 바뀐 적 없는 문서는 건드리지 않음
+
+
+def test_removed_fields_are_deleted():
+    db = FakeDB()
+    db.data['watchlist'] = {'000001': {**holding('000001', 100), 'signal': 'BUY', 'last_updated': 'ts0'}}
+    sync = FirestoreDiffSync(db, 'watchlist')
+
+    # 이전 스냅샷에만 있는 필드(signal)는 삭제, touch 필드는 유지
+    counts = sync.sync({'000001': holding('000001', 100)}, touch={'last_updated': 'ts1'})
+    assert counts['updated'] == 1
+    assert db.data['watchlist']['000001'] == {**holding('000001', 100), 'last_updated': 'ts1'}
+
+    # 직접 기록한 필드도 다음 sync에서 빠지면 삭제
+    sync.sync({'000001': {**holding('000001', 100), 'rsi': 28.5}})
+    sync.sync({'000001': holding('000001', 100)})
+    assert 'rsi' not in db.data['watchlist']['000001']
+    assert sync.sync({'000001': holding('000001', 100)})['writes'] == 0
+
+
+def test_large_sync_is_chunked():
+    db = FakeDB()
+    sync = FirestoreDiffSync(db, 'watchlist')
+    counts = sync.sync({f"{i:06d}": holding(f"{i:06d}", i) for i in range(1200)})
+    assert counts['writes'] == 1200 and db.commits == 3
+
+
+def test_resync_after_failure():
+    db = FakeDB()
+    sync = FirestoreDiffSync(db, 'portfolio')
+    sync.sync({'000001': holding('000001', 100)})
+
+    original_batch = db.batch
+    db.batch = lambda: (_ for _ in ()).throw(RuntimeError("network"))
+    try:
+        sync.sync({'000001': holding('000001', 200)})
+    except RuntimeError:
+        pass
+    db.batch = original_batch
+
+    sync.sync({'000001': holding('000001', 200)})
+    assert db.reads == 2 and db.data['portfolio']['000001']['current_price'] == 200
+
+
+if __name__ == "__main__":
+    test_only_changes_are_written()
+    test_removed_fields_are_deleted()
+    test_large_sync_is_chunked()
+    test_resync_after_failure()
+    print("✅ 차분 동기화: 변경분만 기록")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""프로세스 내 작업 스케줄러(job_scheduler) 검증 - 중복 실행 방지, 놓친 회차 정책, jitter, 코루틴/일반 함수"""
+
+import io
+import os
+import sys
+import time
+import asyncio
+import threading
+import contextlib
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from job_scheduler import JobScheduler
+
+
+def run_for(scheduler: JobScheduler, seconds: float):
+    threading.Timer(seconds, scheduler.stop).start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        scheduler.run_forever()
+
+
+class Recorder:
+    """실행 기록 + 동시 실행 수 측정, 실행마다 duration초"""
+
+    def __init__(self, duration=0.0, fail=False):
+        self.duration = duration
+        self.fail = fail
+        self.starts = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.starts.append(time.monotonic())
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.duration)
+        with self.lock:
+            self.active -= 1
+        if self.fail:
+            raise RuntimeError("실패")
+
+
+def test_slow_job_never_overlaps_and_skips_missed_runs():
+    scheduler = JobScheduler()
+    slow = Recorder(duration=0.25)
+    job = scheduler.add_job('slow', slow, 0.1, run_immediately=True)
+    run_for(scheduler, 0.9)
+
+    assert slow.max_active == 1
+    # 0.25초 실행 동안 예정 시각 2번을 놓침 → 버리고 다음 예정 시각(0.3초 간격)에 실행
+    gaps = [b - a for a, b in zip(slow.starts, slow.starts[1:])]
+    assert len(slow.starts) >= 2 and all(gap >= 0.28 for gap in gaps)
+    assert job.stats['missed'] >= 2 and job.stats['runs'] == len(slow.starts)
+
+
+def test_run_once_and_catch_up_policies():
+    scheduler = JobScheduler()
+    once = Recorder(duration=0.25)
+    catch = Recorder(duration=0.25)
+    scheduler.add_job('once', once, 0.1, misfire='run_once', run_immediately=True)
+    catch_job = scheduler.add_job('catch', catch, 0.1, misfire='catch_up', max_catch_up=1, run_immediately=True)
+    failing = scheduler.add_job('failing', Recorder(fail=True), 0.1, run_immediately=True)
+    run_for(scheduler, 0.9)
+
+    # run_once: 끝나자마자 한 번 더 (놓친 회차를 합쳐서)
+    assert all(b - a < 0.3 for a, b in zip(once.starts, once.starts[1:]))
+    assert len(once.starts) >= 3
+    # catch_up: 쉬지 않고 연달아, max_catch_up 넘는 회차는 버림
+    assert catch.max_active == 1 and len(catch.starts) >= 3 and catch_job.stats['missed'] >= 1
+    # 실패해도 다음 회차는 계속
+    assert failing.stats['failures'] >= 5 and failing.stats['runs'] == 0
+
+
+def test_jitter_and_coroutine_jobs():
+    scheduler = JobScheduler()
+    starts = []
+
+    async def tick():
+        starts.append(time.monotonic())
+        await asyncio.sleep(0)
+
+    scheduler.add_job('tick', tick, 0.1, jitter=0.05)
+    began = time.monotonic()
+    run_for(scheduler, 0.75)
+
+    # 예정 시각(0.1초 간격)은 jitter만큼만 늦어지고 밀려 쌓이지 않음
+    assert 5 <= len(starts) <= 7
+    for n, start in enumerate(starts, 1):
+        assert began + n * 0.1 - 0.01 <= start <= began + n * 0.1 + 0.08
+
+    try:
+        scheduler.add_job('bad', tick, 0.1, jitter=0.2)
+        assert False, "jitter >= interval은 거부"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_slow_job_never_overlaps_and_skips_missed_runs()
+    test_run_once_and_catch_up_policies()
+    test_jitter_and_coroutine_jobs()
+    print("✅ 작업 스케줄러 정상")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""KRX 거래 달력(krx_calendar) 검증 - 시간대 구분, 휴장일, 개장 지연일, 다음 장까지 남은 시간"""
+
+import io
+import os
+import sys
+import contextlib
+from datetime import datetime, date
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import krx_calendar
+from krx_calendar import (KST, market_phase, is_session_open, last_closed_session,
+                          next_window, seconds_until, seconds_until_close, is_trading_day)
+from job_scheduler import JobScheduler
+
+
+def kst(*args):
+    return KST.localize(datetime(*args))
+
+
+def test_phases_on_regular_day():
+    # 2025-03-04 (화)
+    assert market_phase(kst(2025, 3, 4, 8, 10)) == 'closed'
+    assert market_phase(kst(2025, 3, 4, 8, 40)) == 'pre_market'
+    assert market_phase(kst(2025, 3, 4, 9, 0)) == 'regular'
+    assert market_phase(kst(2025, 3, 4, 15, 25)) == 'closing_auction'
+    assert is_session_open(kst(2025, 3, 4, 15, 25)) and not is_session_open(kst(2025, 3, 4, 15, 30))
+    assert market_phase(kst(2025, 3, 4, 15, 35)) == 'closed'
+    assert market_phase(kst(2025, 3, 4, 17, 0)) == 'after_hours'
+    assert market_phase(datetime(2025, 3, 4, 10, 0)) == 'regular'  # naive는 한국 시간으로 간주
+
+
+def test_holidays_and_special_sessions():
+    assert not is_trading_day(date(2025, 1, 28))       # 설날
+    assert not is_trading_day(date(2025, 12, 31))      # 연말 휴장
+    assert not is_trading_day(date(2026, 9, 25))       # 추석
+    assert not is_session_open(kst(2025, 5, 6, 10, 0))  # 대체공휴일
+    assert not is_session_open(kst(2025, 3, 8, 10, 0))  # 토요일
+
+    # 수능일: 10시 개장, 16시 30분 폐장 (장전도 함께 이동)
+    assert market_phase(kst(2025, 11, 13, 9, 15)) == 'closed'
+    assert market_phase(kst(2025, 11, 13, 9, 45)) == 'pre_market'
+    assert market_phase(kst(2025, 11, 13, 16, 0)) == 'regular'
+    assert is_session_open(kst(2025, 11, 13, 16, 25))
+
+    # 임시 휴장 추가 (처음 사용할 때 환경변수를 읽음, 잘못된 항목은 건너뜀)
+    previous = os.environ.get('KRX_EXTRA_HOLIDAYS')
+    os.environ['KRX_EXTRA_HOLIDAYS'] = '20250305, 2025-03-06,'
+    krx_calendar._extra_holidays_cache = None
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert not is_trading_day(date(2025, 3, 5))
+        assert is_trading_day(date(2025, 3, 6))
+    finally:
+        if previous is None:
+            os.environ.pop('KRX_EXTRA_HOLIDAYS', None)
+        else:
+            os.environ['KRX_EXTRA_HOLIDAYS'] = previous
+        krx_calendar._extra_holidays_cache = None
+
+
+def test_warns_once_past_covered_year():
+    krx_calendar._coverage_warned = False
+    out = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(out):
+            assert is_trading_day(date(krx_calendar.COVERED_YEAR, 12, 30))
+            assert out.getvalue() == ''
+            assert is_trading_day(date(krx_calendar.COVERED_YEAR + 1, 3, 3))
+            is_trading_day(date(krx_calendar.COVERED_YEAR + 1, 3, 4))
+        assert out.getvalue().count('⚠️') == 1
+    finally:
+        krx_calendar._coverage_warned = False
+
+
+def test_last_closed_and_next_session():
+    # 설 연휴 전후
+    assert last_closed_session(kst(2025, 1, 31, 10, 0)) == date(2025, 1, 24)
+    assert last_closed_session(kst(2025, 1, 31, 15, 30)) == date(2025, 1, 31)
+    # 연말 휴장 → 신정 → 1월 2일 10시 개장
+    start, end = next_window(kst(2025, 12, 30, 16, 0))
+    assert start == kst(2026, 1, 2, 10, 0) and end == kst(2026, 1, 2, 15, 30)
+    # 금요일 장 마감 후 → 월요일 9시
+    assert seconds_until('regular', kst(2025, 3, 7, 15, 30)) == (2 * 24 + 17.5) * 3600
+    assert seconds_until('regular', kst(2025, 3, 7, 10, 0)) == 0
+    assert seconds_until('pre_market', kst(2025, 3, 10, 8, 0)) == 30 * 60
+    assert seconds_until('continuous', kst(2025, 3, 7, 15, 25)) > 0  # 종가 동시호가 중
+    assert seconds_until_close('regular', kst(2025, 3, 7, 15, 0)) == 30 * 60
+    assert seconds_until_close('regular', kst(2025, 3, 8, 10, 0)) == 0
+
+
+def test_scheduler_skips_inactive_runs():
+    import threading
+
+    scheduler = JobScheduler()
+    calls = []
+    job = scheduler.add_job('prices', lambda: calls.append(1), 0.05, active=lambda: False)
+    threading.Timer(0.3, scheduler.stop).start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        scheduler.run_forever()
+    assert calls == [] and job.stats['inactive'] >= 3
+
+
+if __name__ == "__main__":
+    test_phases_on_regular_day()
+    test_holidays_and_special_sessions()
+    test_warns_once_past_covered_year()
+    test_last_closed_and_next_session()
+    test_scheduler_skips_inactive_runs()
+    print("✅ KRX 거래 달력 정상")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""통합 로거(logger_system) 파일 교체/보관/요약 검증 (슬랙은 기록용 가짜 알림으로 대체)"""
+
+import io
+import os
+import sys
+import gzip
+import json
+import tempfile
+import contextlib
+import pytz
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from logger_system import UnifiedLogger
+
+
+def make_logger(log_dir: str, **kwargs) -> UnifiedLogger:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return UnifiedLogger(log_dir=log_dir, slack_enabled=False, **kwargs)
+
+
+def kst_day(offset: int = 0) -> datetime:
+    return datetime.now(pytz.timezone('Asia/Seoul')) + timedelta(days=offset)
+
+
+def log_at(logger: UnifiedLogger, timestamp: str, level: str, message: str, data=None):
+    """지정한 시각으로 기록 (날짜 경계 재현용)"""
+    logger._get_timestamp = lambda: timestamp
+    with contextlib.redirect_stdout(io.StringIO()):
+        logger.log(level, message, data)
+
+
+def test_rotates_at_kst_midnight():
+    with tempfile.TemporaryDirectory() as tmp:
+        today, tomorrow = kst_day(), kst_day(1)
+        logger = make_logger(tmp)
+        log_at(logger, today.strftime('[%Y-%m-%d 23:59:59 KST]'), 'TRADE', '매수 완료', {'code': '005930'})
+        log_at(logger, tomorrow.strftime('[%Y-%m-%d 00:00:01 KST]'), 'INFO', '새 날')
+        logger.flush()
+
+        assert logger.get_log_file_path().endswith(tomorrow.strftime('kis_bot_%Y%m%d.log'))
+        with gzip.open(os.path.join(tmp, today.strftime('kis_bot_%Y%m%d.json.gz')), 'rt', encoding='utf-8') as f:
+            assert json.loads(f.readlines()[-1])['message'] == '매수 완료'
+
+        summary = logger.get_logs_summary()
+        assert summary['total_logs'] == 1 and summary['level_counts'] == {'INFO': 1}
+        logger.close()
+
+
+def test_size_cap_and_tail_summary():
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = make_logger(tmp, max_bytes=4096, compress=False)
+        for i in range(200):
+            # 현재 시각으로 기록 - 최근 로그는 저널에서 시각순으로 조회 (초기화 로그보다 앞서지 않도록)
+            log_at(logger, kst_day().strftime('[%Y-%m-%d %H:%M:%S KST]'), 'TRADE' if i % 2 else 'INFO', f"로그 {i}", {'i': i})
+        logger.flush()
+
+        parts = sorted(name for name in os.listdir(tmp) if '.1.' in name or '.2.' in name)
+        assert parts and os.path.getsize(logger.json_log_file) < 4096 + 1024
+
+        summary = logger.get_logs_summary()
+        assert [entry['message'] for entry in summary['recent_logs']] == [f"로그 {i}" for i in range(190, 200)]
+        assert summary['level_counts']['TRADE'] >= 100 and summary['total_logs'] >= 200
+        logger.close()
+
+
+def read_all_messages(log_dir: str) -> list:
+    """압축/미압축 JSON 로그 전체의 메시지"""
+    messages = []
+    for name in os.listdir(log_dir):
+        path = os.path.join(log_dir, name)
+        if name.endswith('.json.gz'):
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                messages += [json.loads(line)['message'] for line in f]
+        elif name.endswith('.json'):
+            with open(path, encoding='utf-8') as f:
+                messages += [json.loads(line)['message'] for line in f]
+    return messages
+
+
+def test_shared_day_file_keeps_other_process_lines():
+    # 두 로거(각자 파일을 따로 엶 = 두 프로세스)가 같은 날짜 파일에 기록하면서 번갈아 교체
+    with tempfile.TemporaryDirectory() as tmp:
+        first = make_logger(tmp, max_bytes=2048, journal_enabled=False)
+        second = make_logger(tmp, max_bytes=2048, journal_enabled=False)
+        timestamp = kst_day().strftime('[%Y-%m-%d 10:00:00 KST]')
+        for i in range(150):
+            for name, logger in (('A', first), ('B', second)):
+                log_at(logger, timestamp, 'INFO', f"{name}-{i}", {'i': i})
+                logger.flush()
+        first.close()
+        second.close()
+
+        messages = read_all_messages(tmp)
+        for name in ('A', 'B'):
+            assert sorted(m for m in messages if m.startswith(f"{name}-")) == sorted(f"{name}-{i}" for i in range(150))
+        assert any(name.endswith('.json.gz') for name in os.listdir(tmp))
+
+
+class RecordingNotifier:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, title, message, priority="normal", **kwargs):
+        self.sent.append((message, priority))
+        return True
+
+    def close(self, timeout=None):
+        pass
+
+
+def test_slack_records_go_straight_to_notifier():
+    # 로거 쪽 대기열 없이 SlackNotifier 대기열로 - 몰려도 매매/오류 로그는 생략되지 않음
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = make_logger(tmp, journal_enabled=False)
+        logger.slack, logger.slack_enabled = RecordingNotifier(), True
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(1500):
+                logger.error(f"주문 실패 {i}")
+            logger.info("슬랙 제외")
+        assert len(logger.slack.sent) == 1500
+        assert {priority for _, priority in logger.slack.sent} == {'high'}
+        logger.close()
+
+
+def test_retention_removes_old_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ('kis_bot_20000101.log', 'kis_bot_20000101.json.gz', 'other.txt'):
+            open(os.path.join(tmp, name), 'w').close()
+        logger = make_logger(tmp, retention_days=7)
+        logger.flush()
+        remaining = sorted(name for name in os.listdir(tmp) if not name.startswith('events.db'))
+        assert remaining == sorted(['other.txt', os.path.basename(logger.log_file),
+                                    os.path.basename(logger.json_log_file)])
+        logger.close()
+
+
+if __name__ == "__main__":
+    test_rotates_at_kst_midnight()
+    test_size_cap_and_tail_summary()
+    test_shared_day_file_keeps_other_process_lines()
+    test_slack_records_go_straight_to_notifier()
+    test_retention_removes_old_files()
+    print("✅ 로그 파일 교체/보관/요약 정상")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""시세 공유 서비스(market_data_service) 검증 - 종목별 1회 조회, 구독자 배포, 재연결 (KIS 호출 없음)"""
+
+import io
+import os
+import sys
+import time
+import tempfile
+import threading
+import contextlib
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from market_data_service import MarketDataService, MarketDataClient
+
+
+class FakeQuotes:
+    """KIS 대신 - 조회 요청 기록"""
+
+    def __init__(self):
+        self.requests = []
+        self.price = 1000.0
+        self.lock = threading.Lock()
+
+    def __call__(self, codes):
+        with self.lock:
+            self.requests.append(list(codes))
+        return {code: {'code': code, 'current_price': self.price, 'change_rate': 1.5, 'volume': 100} for code in codes}
+
+
+def wait_until(predicate, timeout: float = 3.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def start_service(tmp, fetch, universe=None):
+    service = MarketDataService(fetch, universe=universe, socket_path=os.path.join(tmp, 'md.sock'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        service.start()
+    return service
+
+
+def test_union_polled_once_and_fanned_out():
+    with tempfile.TemporaryDirectory() as tmp:
+        fetch = FakeQuotes()
+        service = start_service(tmp, fetch, universe=lambda: ['005930', '000660'])
+        socket_path = service.socket_path
+
+        # 같은 종목을 구독하는 세 프로세스
+        clients = [MarketDataClient(socket_path, reconnect_interval=0.05) for _ in range(3)]
+        for client in clients:
+            client.subscribe(['035720', '005930'])
+        assert wait_until(lambda: len(service.wanted_codes()) == 3)
+
+        service.poll_once()
+        assert fetch.requests == [['000660', '005930', '035720']]  # 구독자 수와 무관하게 종목별 1번
+        assert all(wait_until(lambda c=client: c.get_quote('035720') is not None) for client in clients)
+        quote = clients[0].get_quote('005930')
+        assert quote['current_price'] == 1000.0 and 'ts' not in quote
+
+        # 오래된 시세는 None → 호출하는 쪽이 직접 조회
+        assert clients[0].get_quote('005930', max_age=0) is None
+        assert clients[0].get_quotes(['005930', '999999']).keys() == {'005930'}
+
+        for client in clients:
+            client.close()
+        assert wait_until(lambda: service.wanted_codes() == ['000660', '005930'])
+        service.stop()
+
+
+def test_client_reconnects_when_service_starts_later():
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, 'md.sock')
+        client = MarketDataClient(socket_path, reconnect_interval=0.05)
+        client.subscribe(['035720'])
+        time.sleep(0.1)
+        assert not client.connected and client.get_quote('035720') is None
+
+        fetch = FakeQuotes()
+        service = start_service(tmp, fetch)
+        # 연결되면 구독 목록을 다시 보내므로 서비스가 해당 종목을 조회
+        assert wait_until(lambda: service.wanted_codes() == ['035720'])
+        service.poll_once()
+        assert wait_until(lambda: client.get_quote('035720') is not None)
+
+        # 새 구독자는 다음 주기를 기다리지 않고 가지고 있는 최신 시세를 바로 받음
+        late = MarketDataClient(socket_path, reconnect_interval=0.05)
+        late.subscribe(['035720'])
+        assert wait_until(lambda: late.get_quote('035720') is not None)
+        assert len(fetch.requests) == 1
+
+        client.close()
+        late.close()
+        service.stop()
+
+
+if __name__ == "__main__":
+    test_union_polled_once_and_fanned_out()
+    test_client_reconnects_when_service_starts_later()
+    print("✅ 시세 공유 서비스 정상")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""종목 마스터 바이너리 스냅샷(master_snapshot) 검증 - 조회/변환/교체 및 시작 비용 비교"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from master_snapshot import MasterSnapshot, open_snapshot, write_snapshot
+
+
+def make_names(count: int):
+    names = {f"{i:06d}": f"종목{i}" for i in range(count)}
+    names.update({'005930': '삼성전자', '0000J0': 'ETN 예시', '035420': 'NAVER'})
+    return names
+
+
+def test_lookup_matches_dict():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'master.bin')
+        names = make_names(3000)
+        write_snapshot(path, names)
+
+        snapshot = MasterSnapshot(path)
+        assert len(snapshot) == len(names)
+        assert all(snapshot.get(code) == name for code, name in names.items())
+        assert snapshot.get('999999') is None and snapshot.get('TOOLONGCODE') is None
+        assert snapshot.get('삼성') is None
+        assert dict(snapshot.items()) == names
+
+
+def test_converts_legacy_json_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'master.bin')
+        legacy = os.path.join(tmp, 'master.json')
+        with open(legacy, 'w', encoding='utf-8') as f:
+            json.dump({'005930': '삼성전자'}, f, ensure_ascii=False)
+
+        snapshot = open_snapshot(path, legacy)
+        assert snapshot.get('005930') == '삼성전자'
+        # 변환본은 JSON과 같은 mtime (7일 유효기간 판단 유지), 다시 열 때는 변환하지 않음
+        assert os.path.getmtime(path) == os.path.getmtime(legacy)
+        converted_at = os.stat(path).st_ino
+        assert open_snapshot(path, legacy).get('005930') == '삼성전자'
+        assert os.stat(path).st_ino == converted_at
+
+        assert open_snapshot(os.path.join(tmp, 'missing.bin')) is None
+
+
+def benchmark_startup(count: int = 4000):
+    """JSON 전체 로드 vs 스냅샷 mmap 후 조회 1건"""
+    with tempfile.TemporaryDirectory() as tmp:
+        names = make_names(count)
+        legacy = os.path.join(tmp, 'master.json')
+        with open(legacy, 'w', encoding='utf-8') as f:
+            json.dump(names, f, ensure_ascii=False, indent=2)
+        path = os.path.join(tmp, 'master.bin')
+        write_snapshot(path, names)
+
+        start = time.perf_counter()
+        with open(legacy, 'r', encoding='utf-8') as f:
+            json.load(f)['005930']
+        json_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        MasterSnapshot(path).get('005930')
+        mmap_elapsed = time.perf_counter() - start
+        print(f"⏱️ 종목 {count}개 마스터 시작: JSON {json_elapsed * 1000:.2f}ms / mmap {mmap_elapsed * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    test_lookup_matches_dict()
+    test_converts_legacy_json_once()
+    print("✅ 종목 마스터 스냅샷 정상")
+    benchmark_startup()
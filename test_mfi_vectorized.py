@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""MFI 벡터화 검증 + 마이크로 벤치마크 (API 호출 없음)"""
+
+import os
+import sys
+import timeit
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from main import TechnicalAnalyzer
+
+
+def calculate_mfi_loop(df: pd.DataFrame, period: int = 14) -> float:
+    """기존 for 루프 + .iloc 대입 방식 (비교 기준)"""
+    if df is None or len(df) < period + 1:
+        return 50.0
+
+    typical_price = (df['high'] + df['low'] + df['close']) / 3
+    money_flow = typical_price * df['volume']
+
+    positive_flow = pd.Series(0.0, index=df.index)
+    negative_flow = pd.Series(0.0, index=df.index)
+
+    for i in range(1, len(df)):
+        if typical_price.iloc[i] > typical_price.iloc[i-1]:
+            positive_flow.iloc[i] = money_flow.iloc[i]
+        elif typical_price.iloc[i] < typical_price.iloc[i-1]:
+            negative_flow.iloc[i] = money_flow.iloc[i]
+
+    positive_mf = positive_flow.rolling(window=period).sum()
+    negative_mf = negative_flow.rolling(window=period).sum()
+
+    mfi_ratio = positive_mf / negative_mf
+    mfi = 100 - (100 / (1 + mfi_ratio))
+
+    return float(mfi.iloc[-1]) if not pd.isna(mfi.iloc[-1]) else 50.0
+
+
+def make_history(bars: int, seed: int = 0) -> pd.DataFrame:
+    """랜덤 일봉 데이터 생성 (보합 구간 포함)"""
+    rng = np.random.default_rng(seed)
+    close = np.round(10000 + rng.normal(0, 150, bars).cumsum(), -1)
+    close[rng.random(bars) < 0.1] = np.nan
+    close = pd.Series(close).ffill().bfill().to_numpy()  # 약 10%는 전일 종가 유지 (보합)
+    spread = np.abs(rng.normal(0, 80, bars))
+    return pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=bars),
+        'close': close,
+        'high': close + spread,
+        'low': close - spread,
+        'volume': rng.integers(10000, 500000, bars).astype(float)
+    })
+
+
+def test_mfi_matches_loop():
+    """벡터화 결과가 기존 루프 결과와 비트 단위로 같은지 확인"""
+    for bars in [10, 15, 30, 150, 1000]:
+        for seed in range(20):
+            df = make_history(bars, seed)
+            expected = calculate_mfi_loop(df)
+            actual = TechnicalAnalyzer.calculate_mfi(df)
+            assert np.float64(expected).tobytes() == np.float64(actual).tobytes(), \
+                f"{bars}봉 seed={seed}: {expected!r} != {actual!r}"
+
+    # 보합만 있는 경우 (0/0 → 기본값 50)
+    flat = make_history(30)
+    flat[['close', 'high', 'low']] = 10000.0
+    assert TechnicalAnalyzer.calculate_mfi(flat) == calculate_mfi_loop(flat) == 50.0
+
+
+def benchmark_mfi():
+    """30/150/1000봉 기준 속도 비교"""
+    print("⏱️ MFI 벤치마크 (호출 1회당 평균)")
+    print("-" * 50)
+    for bars in [30, 150, 1000]:
+        df = make_history(bars)
+        number = 20 if bars >= 1000 else 100
+        loop_time = timeit.timeit(lambda: calculate_mfi_loop(df), number=number) / number
+        vec_time = timeit.timeit(lambda: TechnicalAnalyzer.calculate_mfi(df), number=number) / number
+        print(f"  {bars:>5}봉: 루프 {loop_time * 1000:8.3f}ms | 벡터화 {vec_time * 1000:7.3f}ms | "
+              f"{loop_time / vec_time:6.1f}배")
+
+
+if __name__ == "__main__":
+    test_mfi_matches_loop()
+    print("✅ 벡터화 MFI 결과 일치 확인")
+    print()
+    benchmark_mfi()
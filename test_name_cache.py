@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""종목명 로컬 캐시(name_cache) 검증 - 추가 전용 로그, 끊긴 줄 복구, 스냅샷 합치기"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from name_cache import NameCache
+
+
+def test_appends_without_rewriting_snapshot():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'005930': '삼성전자'}, f, ensure_ascii=False)
+        snapshot_mtime = os.path.getmtime(path)
+
+        cache = NameCache(path)
+        cache.put('035720', '카카오')
+        cache.put_many({'000660': 'SK하이닉스', '005930': '삼성전자'})  # 같은 이름은 다시 쓰지 않음
+        assert os.path.getmtime(path) == snapshot_mtime
+        with open(cache.log_path, encoding='utf-8') as f:
+            assert len(f.readlines()) == 2
+
+        assert NameCache(path).names == {'005930': '삼성전자', '035720': '카카오', '000660': 'SK하이닉스'}
+
+
+def test_torn_last_line_is_ignored():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.json')
+        cache = NameCache(path)
+        cache.put('035720', '카카오')
+        with open(cache.log_path, 'a', encoding='utf-8') as f:
+            f.write('{"code": "000660", "na')  # 기록 중 종료
+
+        reopened = NameCache(path)
+        assert reopened.names == {'035720': '카카오'}
+        reopened.put('005380', '현대차')
+        assert NameCache(path).names == {'035720': '카카오', '005380': '현대차'}
+
+
+def test_compaction_folds_log_into_snapshot():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.json')
+        cache = NameCache(path, compact_threshold=10)
+        for i in range(25):
+            cache.put(f"{i:06d}", f"종목{i}")
+
+        with open(path, encoding='utf-8') as f:
+            assert len(json.load(f)) == 20
+        with open(cache.log_path, encoding='utf-8') as f:
+            assert len(f.readlines()) == 5
+        assert len(NameCache(path)) == 25
+
+
+def benchmark_name_cache(count: int = 2000):
+    """이름 N개를 1개씩 저장 - 기존 방식(매번 전체 재작성)과 비교"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = NameCache(os.path.join(tmp, 'cache.json'))
+        start = time.perf_counter()
+        for i in range(count):
+            cache.put(f"{i:06d}", f"종목{i}")
+        appended = time.perf_counter() - start
+
+        names = {}
+        legacy_path = os.path.join(tmp, 'legacy.json')
+        start = time.perf_counter()
+        for i in range(count):
+            names[f"{i:06d}"] = f"종목{i}"
+            with open(legacy_path, 'w', encoding='utf-8') as f:
+                json.dump(names, f, ensure_ascii=False, indent=2)
+        rewritten = time.perf_counter() - start
+        print(f"⏱️ 종목명 {count}개 저장: 덧붙이기 {appended:.2f}s / 전체 재작성 {rewritten:.2f}s")
+
+
+if __name__ == "__main__":
+    test_appends_without_rewriting_snapshot()
+    test_torn_last_line_is_ignored()
+    test_compaction_folds_log_into_snapshot()
+    print("✅ 종목명 로컬 캐시 정상")
+    benchmark_name_cache()
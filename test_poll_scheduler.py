@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""종목별 조회 주기(poll_scheduler) 검증 - 손절/익절 근접 종목 우선, 변동성 반영, 호출 예산 유지"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from poll_scheduler import PollScheduler
+
+
+def make_scheduler(**kwargs):
+    options = dict(stop_loss_rate=-3.0, take_profit_rate=5.0, budget=2.0)
+    options.update(kwargs)
+    return PollScheduler(**options)
+
+
+def run_risky_scenario(budget):
+    """보유 9종목 (1종목은 손절 기준 0.1%p 앞) + 감시 30종목"""
+    scheduler = make_scheduler(budget=budget)
+    quiet = [f"{100000 + i}" for i in range(8)]
+    watch = [f"{200000 + i}" for i in range(30)]
+    held = {code: 10000 for code in quiet}
+    held['900001'] = 10000
+    scheduler.set_symbols(held, watch)
+
+    # 처음에는 전 종목 바로 조회 대상
+    assert len(scheduler.due(now=0.0)) == 39
+    for code in quiet + watch:
+        scheduler.record(code, 10000, now=0.0)
+    scheduler.record('900001', 9710, now=0.0)  # -2.9%
+    return scheduler, quiet, watch
+
+
+def test_risky_position_gets_budget_quiet_symbols_stretch():
+    # 기존 방식(보유 10초 + 감시 1분)과 같은 초당 1.4건 안에서 위험 종목은 10초 → 약 1초
+    scheduler, quiet, watch = run_risky_scenario(budget=1.4)
+    assert scheduler.interval('900001') < 1.5
+    assert scheduler.interval(quiet[0]) == scheduler.held_max_interval
+    assert scheduler.interval(watch[0]) == scheduler.watch_max_interval
+    assert scheduler.calls_per_second() <= 1.4 + 1e-9
+
+    # 기본 예산(초당 2건)이면 1초 미만
+    scheduler, quiet, watch = run_risky_scenario(budget=2.0)
+    assert scheduler.interval('900001') < 1.0
+    assert scheduler.due(now=1.0) == ['900001']  # 1초 뒤에는 위험 종목만 다시 조회
+    assert 0 < scheduler.seconds_until_next(now=0.0) < 1.0
+
+    # 기준을 넘은 종목은 남은 예산을 모두 받음 (다른 종목은 최대 주기 그대로)
+    scheduler.record('900001', 9600, now=1.0)
+    spare = 2.0 - (8 / scheduler.held_max_interval + 30 / scheduler.watch_max_interval)
+    assert abs(scheduler.interval('900001') - 1 / spare) < 1e-9
+
+    # 예산이 넉넉하면 최소 주기
+    scheduler, _, _ = run_risky_scenario(budget=100)
+    scheduler.record('900001', 9600, now=1.0)
+    assert scheduler.interval('900001') == scheduler.min_interval
+
+
+def test_volatility_shortens_interval():
+    scheduler = make_scheduler(budget=100)
+    scheduler.set_symbols({'000001': 10000, '000002': 10000}, ['000003', '000004'])
+    # 같은 수익률(-2%)이라도 출렁이는 종목이 더 자주
+    for t in range(0, 30, 3):
+        scheduler.record('000001', 9800, now=t)
+        scheduler.record('000002', 9800 if t % 2 else 9900, now=t)
+        scheduler.record('000003', 10000, now=t)
+        scheduler.record('000004', 10000 if t % 2 else 10300, now=t)
+    assert scheduler.interval('000002') < scheduler.interval('000001')
+    assert scheduler.interval('000004') < scheduler.interval('000003') == scheduler.watch_max_interval
+
+
+def test_budget_shortfall_stretches_quiet_symbols_first():
+    scheduler = make_scheduler(budget=0.5)
+    held = {f"{100000 + i}": 10000 for i in range(3)}
+    scheduler.set_symbols(held, [f"{200000 + i}" for i in range(6)])
+    for code in held:
+        scheduler.record(code, 10000, now=0.0)
+    scheduler.record('100000', 9705, now=0.0)
+    # 최대 주기만으로도 예산 초과 → 전 종목을 같은 비율로 늘려 예산 유지
+    assert abs(scheduler.calls_per_second() - 0.5) < 1e-9
+
+    # 목록에서 빠진 종목은 제거, 남은 종목의 이력은 유지
+    scheduler.set_symbols({'100000': 10000}, [])
+    assert len(scheduler) == 1 and scheduler.interval('100000') == 2.0  # 예산(0.5건/초)이 허용하는 최단
+    assert scheduler.due(now=1.0) == [] and scheduler.due(now=2.0) == ['100000']
+
+
+if __name__ == "__main__":
+    test_risky_position_gets_budget_quiet_symbols_stretch()
+    test_volatility_shortens_interval()
+    test_budget_shortfall_stretches_quiet_symbols_first()
+    print("✅ 조회 주기 스케줄러 정상")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""공유 시세 테이블(quote_table) 검증 - 기록/조회, seqlock (반쯤 쓰인 행 없음), 재생성 후 다시 열기"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from quote_table import QuoteTable, QuoteTableReader
+from market_data_service import MarketDataService, MarketDataClient
+
+
+def test_round_trip_and_max_age():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'quotes')
+        writer = QuoteTable.create(path, capacity=16)
+        writer.put_many({
+            '005930': {'current_price': 71000, 'change_rate': 1.2, 'volume': 1000, 'high_price': 72000, 'low_price': 70000},
+            '000660': {'current_price': 180000, 'change_rate': -0.5, 'volume': 500},
+        })
+        writer.put('035720', 50000, ts=time.time() - 120)
+
+        reader = QuoteTable.open(path)
+        quote = reader.get('005930')
+        assert quote['current_price'] == 71000 and quote['volume'] == 1000 and quote['high_price'] == 72000
+        assert len(reader) == 3
+        assert reader.get('999999') is None
+        assert reader.get('035720')['current_price'] == 50000
+        assert reader.get('035720', max_age=60) is None  # 오래된 시세
+        assert reader.get_many(['005930', '000660', '035720'], max_age=60).keys() == {'005930', '000660'}
+
+        # 같은 크기로 다시 열면 기존 파일을 이어 씀 → 읽는 쪽 mmap 그대로 유효
+        writer.close()
+        writer = QuoteTable.create(path, capacity=16)
+        writer.put('005930', 71500)
+        assert len(reader) == 3
+        assert not reader.is_stale_file() and reader.get('005930')['current_price'] == 71500
+        writer.close()
+        reader.close()
+
+
+def test_reader_never_sees_torn_rows():
+    """기록 스레드가 price == volume == high == low인 행을 계속 덮어쓰는 동안 읽기"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'quotes')
+        writer = QuoteTable.create(path, capacity=64)
+        codes = [f"{900000 + i}" for i in range(20)]
+        for code in codes:
+            writer.put(code, 0, volume=0)
+        stop = threading.Event()
+
+        def write():
+            n = 1
+            while not stop.is_set():
+                for code in codes:
+                    writer.put(code, n, change_rate=n, volume=n, high=n, low=n, ts=n)
+                n += 1
+
+        thread = threading.Thread(target=write, daemon=True)
+        thread.start()
+        reader = QuoteTable.open(path)
+        reads = 0
+        deadline = time.time() + 0.5
+        while time.time() < deadline:
+            for code in codes:
+                quote = reader.get(code)
+                if quote is None:
+                    continue
+                value = quote['current_price']
+                assert quote['volume'] == value and quote['high_price'] == value
+                assert quote['low_price'] == value and quote['ts'] == value
+                reads += 1
+        stop.set()
+        thread.join()
+        assert reads > 0
+
+
+def test_recreated_table_is_reopened_and_used_by_client():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'quotes')
+        reader = QuoteTableReader(path, check_interval=0)
+        assert reader.get('005930') is None  # 아직 파일 없음
+
+        QuoteTable.create(path, capacity=16).put('005930', 70000)
+        assert reader.get('005930')['current_price'] == 70000
+
+        # 크기가 다르면 새 파일로 교체 → inode가 바뀐 것을 보고 다시 엶
+        QuoteTable.create(path, capacity=32).put('005930', 71000)
+        assert reader.get('005930')['current_price'] == 71000
+
+        # 서비스가 조회 결과를 테이블에 기록 → 구독하지 않은 종목도 소켓 없이 조회
+        service = MarketDataService(lambda codes: {c: {'code': c, 'name': '카카오', 'current_price': 50000.0}
+                                                   for c in codes},
+                                    universe=lambda: ['035720'], socket_path=os.path.join(tmp, 'md.sock'),
+                                    quote_table=QuoteTable.create(path, capacity=32))
+        service.poll_once()
+        client = MarketDataClient(os.path.join(tmp, 'md.sock'), quote_table=reader)
+        quote = client.get_quote('035720')
+        assert quote['current_price'] == 50000.0 and 'ts' not in quote and quote['name'] == '035720'
+        client.close()
+        service.stop()
+
+
+if __name__ == "__main__":
+    test_round_trip_and_max_age()
+    test_reader_never_sees_torn_rows()
+    test_recreated_table_is_reopened_and_used_by_client()
+    print("✅ 공유 시세 테이블 정상")
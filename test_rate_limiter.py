@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""KIS 호출 유량 제어(rate_limiter) 검증 - 가짜 시계로 1초 구간별 호출 수 확인 (API 호출 없음)"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from rate_limiter import PUBLISHED_LIMITS, KISRateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def drain(limiter: KISRateLimiter, clock: FakeClock, duration: float) -> dict:
+    """시세/주문을 허용되는 대로 최대한 호출 → 종류별 호출 시각"""
+    calls = {'quotation': [], 'order': []}
+    while clock.now < duration:
+        waits = []
+        for kind, bucket in limiter.buckets.items():
+            wait = bucket.try_acquire()
+            if wait <= 0:
+                calls[kind].append(clock.now)
+            else:
+                waits.append(wait)
+        if len(waits) == len(limiter.buckets):
+            clock.now += max(min(waits), 1e-9)  # 부동소수 오차로 남은 아주 작은 대기도 시계를 진행
+    return calls
+
+
+def max_per_window(times: list) -> int:
+    """가장 많이 몰린 1초 구간 [t, t+1)의 호출 수 (부동소수 오차 1e-9 허용)"""
+    times = sorted(times)
+    return max((sum(1 for u in times if t <= u < t + 1 - 1e-9) for t in times), default=0)
+
+
+def test_no_window_exceeds_published_limits():
+    for env, limits in PUBLISHED_LIMITS.items():
+        clock = FakeClock()
+        limiter = KISRateLimiter(limits['quotation'], limits['order'], clock=clock)
+        calls = drain(limiter, clock, 5.0)
+
+        assert max_per_window(calls['quotation']) <= limits['quotation'], env
+        assert max_per_window(calls['order']) <= limits['order'], env
+        assert max_per_window(calls['quotation'] + calls['order']) <= sum(limits.values()), env
+        # 한도는 다 씀 (5초 동안 초당 한도만큼)
+        assert len(calls['quotation']) >= 5 * limits['quotation'] - 1, env
+
+
+def test_classify_by_tr_id():
+    assert KISRateLimiter.classify('VTTC0802U') == 'order'
+    assert KISRateLimiter.classify('FHKST01010100') == 'quotation'
+    assert KISRateLimiter.classify(None) == 'quotation'
+
+
+if __name__ == "__main__":
+    test_no_window_exceeds_published_limits()
+    test_classify_by_tr_id()
+    print("✅ 호출 유량 제어: 1초 구간별 한도 준수")
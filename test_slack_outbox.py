@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Slack 대기열(outbox) 검증 - 채널별 묶음 전송, Retry-After 준수, 밀림 시 low 생략 (실제 전송 없음)"""
+
+import io
+import os
+import sys
+import json
+import time
+import contextlib
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from slack_notifier import SlackNotifier
+
+
+class FakeResponse:
+    def __init__(self, status_code: int = 200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return {'ok': self.status_code == 200}
+
+
+class FakeSession:
+    """요청 바디만 기록, responses에 넣은 응답을 순서대로 반환"""
+
+    def __init__(self, responses=None, delay: float = 0):
+        self.posts = []
+        self.times = []
+        self.responses = list(responses or [])
+        self.delay = delay
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        time.sleep(self.delay)
+        self.posts.append(json.loads(data))
+        self.times.append(time.time())
+        return self.responses.pop(0) if self.responses else FakeResponse()
+
+    def close(self):
+        pass
+
+
+def make_notifier(session: FakeSession, **kwargs) -> SlackNotifier:
+    os.environ.pop('SLACK_BOT_TOKEN', None)
+    os.environ['SLACK_WEBHOOK_URL'] = 'https://hooks.slack.invalid/test'
+    with contextlib.redirect_stdout(io.StringIO()):
+        notifier = SlackNotifier(**kwargs)
+    notifier.session = session
+    return notifier
+
+
+def run_quietly(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def test_burst_is_coalesced_per_channel():
+    session = FakeSession()
+    notifier = make_notifier(session, coalesce_window=0.2)
+
+    start = time.perf_counter()
+    for i in range(30):
+        notifier.send_message(f"매수 {i}", "체결", channel='#kis-bot-trading')
+    notifier.send_message("오류", "확인 필요", channel='#kis-bot-errors', priority='high')
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.05  # 호출 스레드는 전송을 기다리지 않음
+
+    assert run_quietly(notifier.flush, 5)
+    by_channel = {}
+    for post in session.posts:
+        by_channel.setdefault(post['channel'], []).append(len(post['attachments']))
+    # 30건 → 첨부 20개 + 10개 두 번, 오류 채널은 1건
+    assert by_channel == {'#kis-bot-trading': [20, 10], '#kis-bot-errors': [1]}
+    run_quietly(notifier.close)
+
+
+def test_honors_retry_after():
+    session = FakeSession([FakeResponse(429, {'Retry-After': '0.3'})])
+    notifier = make_notifier(session, coalesce_window=0)
+
+    notifier.send_message("매도", "체결")
+    assert run_quietly(notifier.flush, 5)
+    assert len(session.posts) == 2
+    assert session.times[1] - session.times[0] >= 0.3
+    run_quietly(notifier.close)
+
+
+def test_backlog_sheds_low_priority():
+    session = FakeSession(delay=0.2)
+    notifier = make_notifier(session, coalesce_window=0, max_backlog=5)
+
+    notifier.send_message("첫 알림", "전송 중")
+    time.sleep(0.05)  # 전송 스레드가 첫 알림을 붙잡고 있는 동안 쌓임
+    for i in range(4):
+        notifier.send_message(f"스캔 {i}", "낮음", priority='low')
+    notifier.send_message("보유 알림", "보통")
+    assert notifier.send_message("오류", "높음", priority='high')
+
+    assert run_quietly(notifier.flush, 5)
+    titles = [a.get('title') for post in session.posts for a in post['attachments']]
+    summaries = [a['text'] for post in session.posts for a in post['attachments'] if not a.get('title')]
+    assert titles[0] == "첫 알림" and "보유 알림" in titles and "오류" in titles
+    assert not any(t and t.startswith("스캔") for t in titles)
+    assert summaries and '생략' in summaries[0]
+    run_quietly(notifier.close)
+
+
+def test_flush_skips_coalesce_window():
+    session = FakeSession()
+    notifier = make_notifier(session, coalesce_window=30)
+    notifier.send_message(title="체결", message="삼성전자 10주", priority="high")
+    started = time.time()
+    assert run_quietly(notifier.flush, 5)
+    assert time.time() - started < 2 and len(session.posts) == 1
+    run_quietly(notifier.close)
+
+
+if __name__ == "__main__":
+    test_burst_is_coalesced_per_channel()
+    test_honors_retry_after()
+    test_backlog_sheds_low_priority()
+    test_flush_skips_coalesce_window()
+    print("✅ Slack 묶음 전송/Retry-After/우선순위 생략 정상")
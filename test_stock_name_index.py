@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""공용 종목명 인덱스(stock_name_index) 검증 - 계층 로드, 비동기 하위 계층 조회, 중복 조회 방지 (네트워크 없음)"""
+
+import io
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+import contextlib
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from stock_name_index import StockNameIndex, update_names_in_firestore
+from test_firestore_sync import FakeDB as BaseFakeDB, FakeRef
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data) if self._data else None
+
+
+def fake_ref_get(ref):
+    return FakeSnapshot(ref.id, ref.store.get(ref.id))
+
+
+FakeRef.get = fake_ref_get
+
+
+class FakeDB(BaseFakeDB):
+    def __init__(self):
+        super().__init__()
+        self.get_all_calls = 0
+
+    def get_all(self, refs):
+        self.get_all_calls += 1
+        return [ref.get() for ref in refs]
+
+
+class SlowFetcher:
+    """네이버 대신 - 호출 기록, 조회마다 delay초"""
+
+    def __init__(self, names, delay=0.0):
+        self.names = names
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, code):
+        with self.lock:
+            self.calls.append(code)
+        time.sleep(self.delay)
+        return self.names.get(code)
+
+
+def make_index(tmp, db=None, fetcher=None, **kwargs):
+    return StockNameIndex(db=db, fetcher=fetcher or SlowFetcher({}),
+                          cache_file=os.path.join(tmp, 'cache.json'),
+                          master_file=os.path.join(tmp, 'master.bin'),
+                          legacy_master_file=os.path.join(tmp, 'master.json'), **kwargs)
+
+
+def test_tiers_loaded_once_master_wins():
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, 'cache.json'), 'w', encoding='utf-8') as f:
+            json.dump({'900001': '캐시종목', '005930': '옛이름'}, f, ensure_ascii=False)
+        with open(os.path.join(tmp, 'master.json'), 'w', encoding='utf-8') as f:
+            json.dump({'005930': '삼성전자', '900002': '마스터종목'}, f, ensure_ascii=False)
+
+        fetcher = SlowFetcher({})
+        index = make_index(tmp, fetcher=fetcher)
+        assert index.get_names(['5930', '900001', '900002', '035720']) == {
+            '005930': '삼성전자', '900001': '캐시종목', '900002': '마스터종목', '035720': '카카오'}
+        assert fetcher.calls == []
+
+        # JSON 마스터는 바이너리 스냅샷으로 1회 변환, 새 마스터로 교체 가능
+        assert os.path.exists(os.path.join(tmp, 'master.bin')) and len(index.master) == 2
+        index.set_master({'900003': '새마스터종목'})
+        assert index.get('900003') == '새마스터종목' and index.get('900002') is None
+
+
+def test_misses_resolve_in_background_as_one_batch():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = FakeDB()
+        db.data['stock_names'] = {'900010': {'code': '900010', 'name': '파이어스토어종목'}}
+        fetcher = SlowFetcher({'900011': '네이버종목'}, delay=0.2)
+        index = make_index(tmp, db=db, fetcher=fetcher)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            assert index.get_name('900011') == '900011'  # 기다리지 않고 코드 반환
+            assert time.perf_counter() - start < 0.1
+
+            names = index.get_names(['900010', '900011', '900012', '900011'], wait=True)
+        assert names == {'900010': '파이어스토어종목', '900011': '네이버종목', '900012': '900012'}
+        # 900011은 진행 중인 조회를 공유 → 네이버 호출 1번
+        assert sorted(fetcher.calls) == ['900011', '900012']
+        assert db.data['stock_names']['900011']['name'] == '네이버종목'
+
+        # 못 찾은 종목은 miss_ttl 동안 다시 조회하지 않음
+        assert index.resolve('900012') is None
+        assert sorted(fetcher.calls) == ['900011', '900012']
+
+
+def test_bulk_update_is_parallel_and_batched():
+    """종목 40개 (네이버 1건 0.1초) - 순차 + sleep(0.5)였다면 24초"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = FakeDB()
+        codes = [f"{900100 + i}" for i in range(40)]
+        db.data['portfolio'] = {code: {'code': code, 'name': code, 'quantity': 1} for code in codes[:30]}
+        db.data['portfolio']['005930'] = {'code': '005930', 'name': '삼성전자', 'quantity': 1}
+        db.data['market_scan'] = {'latest': {'stocks': [{'code': code} for code in codes[25:]]}}
+        fetcher = SlowFetcher({code: f"종목{code}" for code in codes[:-1]}, delay=0.1)
+        index = make_index(tmp, db=db, fetcher=fetcher, naver_workers=8, naver_rate=100)
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            updated = update_names_in_firestore(db, index)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 2.0
+        assert sorted(fetcher.calls) == codes  # 종목마다 1번 (포트폴리오와 감시 종목이 겹쳐도)
+        # stock_names 캐시 기록 1번 + 포트폴리오/감시 종목 갱신 1번
+        assert db.commits == 2 and db.get_all_calls == 1
+        assert len(updated) == 30 + 14
+        assert db.data['portfolio'][codes[0]]['name'] == f"종목{codes[0]}"
+        scan = db.data['market_scan']['latest']['stocks']
+        assert scan[0]['name'] == f"종목{codes[25]}" and 'name' not in scan[-1]
+        # 로컬 캐시에도 한 번에 기록
+        assert index.local_cache.get(codes[0]) == f"종목{codes[0]}"
+
+
+if __name__ == "__main__":
+    test_tiers_loaded_once_master_wins()
+    test_misses_resolve_in_background_as_one_batch()
+    test_bulk_update_is_parallel_and_batched()
+    print("✅ 공용 종목명 인덱스 정상")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""증분 지표(streaming_indicators) 검증 - 매 봉마다 TechnicalAnalyzer 재계산 결과와 비교 (API 호출 없음)"""
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from streaming_indicators import IndicatorState, save_states, load_states
+from test_batch_indicators import make_history, analyze_one
+
+
+def assert_same(actual: dict, expected: dict, label: str):
+    for name, value in expected.items():
+        assert np.isclose(actual[name], value, rtol=1e-9, atol=1e-6), \
+            f"{label} {name}: streaming={actual[name]!r} analyzer={value!r}"
+
+
+def test_streaming_matches_technical_analyzer():
+    """봉을 하나씩 넣어도 매 시점 전체 재계산과 같은 값"""
+    df = make_history(120, 7)
+    state = IndicatorState()
+    for i, row in enumerate(df.itertuples(index=False)):
+        state.update(row.close, row.high, row.low, row.volume, date=str(row.date.date()))
+        assert_same(state.values(), analyze_one(df.iloc[:i + 1]), f"bar {i}")
+
+
+def test_tick_replaces_last_bar():
+    """같은 날짜의 틱은 마지막 봉을 교체 - 최종 틱 기준 일봉으로 계산한 값과 같음"""
+    df = make_history(40, 11)
+    state = IndicatorState.from_history(df.iloc[:-1])
+    last = df.iloc[-1]
+    date = str(last['date'].date())
+
+    for close in (last['close'] - 300, last['close'] + 200, last['close']):
+        state.update(close, max(close, last['high']), min(close, last['low']), last['volume'], date=date)
+
+    assert_same(state.values(), analyze_one(df), "tick")
+
+
+def test_tick_on_empty_state_starts_first_bar():
+    """이력 없이 틱부터 들어와도 오류 없이 첫 봉으로 처리"""
+    df = make_history(5, 2)
+    tick, bar = IndicatorState(), IndicatorState()
+    for i, row in enumerate(df.itertuples(index=False)):
+        tick.update(row.close, row.high, row.low, row.volume, new_bar=i > 0)
+        bar.update(row.close, row.high, row.low, row.volume)
+    assert tick.values() == bar.values()
+
+
+def test_flat_prices_keep_neutral_rsi():
+    """가격 변화가 없으면 누적 오차 없이 RSI/MFI 50"""
+    df = make_history(30, 3)
+    state = IndicatorState.from_history(df)
+    for _ in range(20):
+        state.update(10000.0, 10000.0, 10000.0, 1000.0)
+    values = state.values()
+    assert values['rsi'] == 50.0 and values['mfi'] == 50.0
+
+
+def test_snapshot_restore_roundtrip():
+    """저장 후 복원한 상태가 이어서 같은 값을 계산"""
+    df = make_history(60, 5)
+    state = IndicatorState.from_history(df.iloc[:50])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "indicator_state.json")
+        save_states({'005930': state}, path)
+        restored = load_states(path)['005930']
+
+    for row in df.iloc[50:].itertuples(index=False):
+        for s in (state, restored):
+            s.update(row.close, row.high, row.low, row.volume, date=str(row.date.date()))
+        assert restored.values() == state.values()
+
+
+def benchmark_streaming(bars: int = 30, updates: int = 1000):
+    """새 봉 1개 반영 시간 비교 (전체 재계산 vs 증분)"""
+    df = make_history(bars + updates, 1)
+
+    start = time.perf_counter()
+    for i in range(bars, bars + updates):
+        analyze_one(df.iloc[i - bars + 1:i + 1])
+    full = time.perf_counter() - start
+
+    state = IndicatorState.from_history(df.iloc[:bars])
+    start = time.perf_counter()
+    for row in df.iloc[bars:].itertuples(index=False):
+        state.update(row.close, row.high, row.low, row.volume)
+        state.values()
+    incremental = time.perf_counter() - start
+
+    print(f"⏱️ 봉 {updates}개 반영: 전체 재계산 {full / updates * 1e6:.0f}µs/봉 | "
+          f"증분 {incremental / updates * 1e6:.1f}µs/봉")
+
+
+if __name__ == "__main__":
+    test_streaming_matches_technical_analyzer()
+    test_tick_replaces_last_bar()
+    test_tick_on_empty_state_starts_first_bar()
+    test_flat_prices_keep_neutral_rsi()
+    test_snapshot_restore_roundtrip()
+    print("✅ 증분 지표가 TechnicalAnalyzer와 일치")
+    benchmark_streaming()
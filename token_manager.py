@@ -1,21 +1,42 @@
 """
 KIS API 토큰 관리자 - 파일 기반 토큰 재사용
+- 메모리 캐시 (파일 mtime이 바뀔 때만 다시 읽음)
+- 만료 전 백그라운드 갱신
+- 프로세스 간 파일 잠금(kis_token.lock): 한 프로세스만 발급, 나머지는 대기 후 새 토큰 사용
 """
 
 import os
 import json
 import time
+import fcntl
+import threading
 import requests
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, Callable
 
 class TokenManager:
-    def __init__(self, app_key: str, app_secret: str):
+    def __init__(self, app_key: str, app_secret: str, auto_refresh: bool = True):
         self.app_key = app_key
         self.app_secret = app_secret
         self.base_url = "https://openapivts.koreainvestment.com:29443"
         self.token_file = "kis_token.json"
         self.token_lock_file = "kis_token.lock"
+        self.last_request_file = ".last_token_request"  # get_saved_token.py와 공유
+        self.min_request_interval = 60  # EGW00133: 토큰 발급은 1분에 1회
+        self.request_timeout = 10  # 발급 요청은 파일 잠금을 쥔 채 실행 - 응답이 없어도 다른 프로세스를 무한정 막지 않도록
+
+        # 메모리 캐시 (토큰 데이터 + 읽을 당시 파일 mtime)
+        self._cached_token: Optional[Dict] = None
+        self._cached_mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+        # 백그라운드 갱신: 유효성 기준(만료 1시간 전)보다 먼저 갱신해서 요청이 발급을 기다리지 않게 함
+        self.auto_refresh = auto_refresh
+        self.refresh_ahead = 2 * 3600
+        self.refresh_retry_interval = 70  # EGW00133 (1분 1회 발급 제한) 회피
+        self._refresher: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
 
     def _read_token_from_file(self) -> Optional[Dict]:
         """파일에서 토큰 정보 읽기"""
@@ -28,14 +49,82 @@ class TokenManager:
         return None
 
     def _write_token_to_file(self, token: str, expires_at: float):
-        """파일에 토큰 정보 저장"""
+        """파일에 토큰 정보 저장 (임시 파일 기록 후 rename - 읽는 쪽은 잠금 없이도 깨진 파일을 보지 않음)"""
         data = {
             "token": token,
             "expires_at": expires_at,
             "created_at": time.time()
         }
-        with open(self.token_file, 'w') as f:
+        tmp_file = f"{self.token_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w') as f:
             json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.token_file)
+
+        self._cached_token = data
+        self._cached_mtime = self._get_file_mtime()
+
+    def _get_file_mtime(self) -> Optional[float]:
+        """토큰 파일 수정 시각 (없으면 None)"""
+        try:
+            return os.path.getmtime(self.token_file)
+        except OSError:
+            return None
+
+    def _load_cached_token(self) -> Optional[Dict]:
+        """메모리 캐시 반환 - 파일이 바뀐 경우에만 다시 읽음"""
+        mtime = self._get_file_mtime()
+        if mtime != self._cached_mtime:
+            self._cached_token = self._read_token_from_file()
+            self._cached_mtime = mtime
+            created_at = (self._cached_token or {}).get("created_at")
+            if isinstance(created_at, (int, float)):
+                created_time = datetime.fromtimestamp(created_at)
+                print(f"♻️ 토큰 파일 로드 (생성시간: {created_time.strftime('%Y-%m-%d %H:%M:%S')})")
+        return self._cached_token
+
+    @contextmanager
+    def _file_lock(self):
+        """프로세스 간 토큰 발급 잠금 (kis_token.lock에 flock)"""
+        with open(self.token_lock_file, 'a') as lock_f:
+            fcntl.flock(lock_f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_f.fileno(), fcntl.LOCK_UN)
+
+    def _seconds_since_last_request(self) -> float:
+        """마지막 발급 요청 이후 경과 시간 (모든 프로세스 공통)"""
+        try:
+            with open(self.last_request_file, 'r') as f:
+                return time.time() - float(f.read())
+        except (OSError, ValueError):
+            return float('inf')
+
+    def _mark_request(self):
+        """발급 요청 시각 기록"""
+        with open(self.last_request_file, 'w') as f:
+            f.write(str(time.time()))
+
+    def _refresh_token(self, needs_refresh: Callable[[Optional[Dict]], bool]) -> Optional[str]:
+        """잠금 하에 토큰 갱신 - 잠금을 얻은 뒤 다른 프로세스가 이미 갱신했으면 그 토큰을 사용"""
+        with self._lock, self._file_lock():
+            token_data = self._load_cached_token()
+            if not needs_refresh(token_data):
+                return token_data.get("token")
+
+            # 1분 1회 발급 제한: 쓸 수 있는 토큰이 있으면 기다리지 않고 포기, 없으면 제한이 풀릴 때까지 대기
+            wait = self.min_request_interval - self._seconds_since_last_request()
+            if wait > 0:
+                if token_data and time.time() < token_data.get("expires_at", 0):
+                    print(f"⏳ 토큰 발급 1분 제한 - {wait:.0f}초 후 재시도 가능")
+                    return None
+                print(f"⏳ 토큰 발급 1분 제한 - {wait:.0f}초 대기")
+                time.sleep(wait)
+
+            self._mark_request()
+            return self._request_new_token()
 
     def _is_token_valid(self, token_data: Dict) -> bool:
         """토큰 유효성 검증"""
@@ -59,7 +148,7 @@ class TokenManager:
         }
 
         try:
-            response = requests.post(url, headers=headers, data=json.dumps(body))
+            response = requests.post(url, headers=headers, data=json.dumps(body), timeout=self.request_timeout)
 
             if response.status_code == 200:
                 token_data = response.json()
@@ -89,30 +178,71 @@ class TokenManager:
         return None
 
     def get_token(self) -> Optional[str]:
-        """토큰 획득 (파일 캐시 우선 사용)"""
+        """토큰 획득 (메모리 캐시 우선 사용)"""
 
-        # 1. 파일에서 토큰 읽기 시도
-        token_data = self._read_token_from_file()
-
-        # 2. 토큰이 유효하면 재사용
+        # 1. 캐시된 토큰이 유효하면 바로 반환 (파일은 mtime이 바뀐 경우에만 재조회)
+        token_data = self._load_cached_token()
         if self._is_token_valid(token_data):
-            created_time = datetime.fromtimestamp(token_data.get("created_at", 0))
-            print(f"♻️ 기존 토큰 재사용 (생성시간: {created_time.strftime('%Y-%m-%d %H:%M:%S')})")
+            self._ensure_refresher()
             return token_data.get("token")
 
-        # 3. 토큰이 없거나 만료되었으면 새로 발급
+        # 2. 토큰이 없거나 만료되었으면 잠금 후 새로 발급 (대기 중 다른 스레드/프로세스가 갱신했으면 그 토큰 사용)
         print("🔄 토큰 갱신 필요 - 새 토큰 발급 시도")
-        new_token = self._request_new_token()
+        new_token = self._refresh_token(lambda data: not self._is_token_valid(data))
 
-        # 4. 새 토큰 발급 실패 시 기존 토큰이라도 사용
+        # 3. 새 토큰 발급 실패 시 기존 토큰이라도 사용
         if not new_token and token_data:
             print("⚠️ 새 토큰 발급 실패 - 기존 토큰 재사용")
             return token_data.get("token")
 
+        if new_token:
+            self._ensure_refresher()
         return new_token
 
+    def _ensure_refresher(self):
+        """백그라운드 갱신 스레드 시작 (최초 1회)"""
+        if not self.auto_refresh or (self._refresher and self._refresher.is_alive()):
+            return
+        with self._lock:
+            if self._refresher and self._refresher.is_alive():
+                return
+            self._stop_event.clear()
+            self._refresher = threading.Thread(target=self._refresh_loop, name="kis-token-refresher", daemon=True)
+            self._refresher.start()
+
+    def _refresh_loop(self):
+        """만료 refresh_ahead초 전에 미리 새 토큰 발급"""
+        while not self._stop_event.is_set():
+            token_data = self._load_cached_token() or {}
+            refresh_at = token_data.get("expires_at", 0) - self.refresh_ahead
+            wait = refresh_at - time.time()
+            if wait > 0:
+                # 다른 프로세스가 파일을 바꿀 수 있으므로 최대 1분 간격으로 재확인
+                self._stop_event.wait(min(wait, 60))
+                continue
+
+            # 잠금 획득 후 재확인 - 다른 스레드/프로세스가 이미 갱신했으면 발급하지 않음
+            print("🔄 토큰 만료 임박 - 백그라운드 갱신")
+            self._refresh_token(
+                lambda data: time.time() >= (data or {}).get("expires_at", 0) - self.refresh_ahead)
+
+            # 발급 제한 등으로 실패(기존 토큰 그대로)하면 잠시 후 재시도
+            token_data = self._load_cached_token() or {}
+            if time.time() >= token_data.get("expires_at", 0) - self.refresh_ahead:
+                self._stop_event.wait(self.refresh_retry_interval)
+
+    def force_refresh(self) -> Optional[str]:
+        """유효성과 관계없이 새 토큰 발급 (잠금/1분 제한은 동일하게 적용)"""
+        return self._refresh_token(lambda data: True)
+
+    def stop_auto_refresh(self):
+        """백그라운드 갱신 중지"""
+        self._stop_event.set()
+
     def clear_token(self):
         """토큰 파일 삭제"""
         if os.path.exists(self.token_file):
             os.remove(self.token_file)
-            print("🗑️ 토큰 파일 삭제됨")
\ No newline at end of file
+            print("🗑️ 토큰 파일 삭제됨")
+        self._cached_token = None
+        self._cached_mtime = None
\ No newline at end of file